@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from wexample_helpers.classes.docker_build_context import DockerBuildContext
+
+FILES_COUNT = 50_000
+
+
+def _make_context(root: Path) -> Path:
+    """Build a context with FILES_COUNT small files spread over 500 folders."""
+    for index in range(FILES_COUNT):
+        path = root / f"src/module{index % 500}/file{index}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"VALUE = {index}\n" * 20)
+    (root / ".dockerignore").write_text("**/__pycache__\n*.log\n")
+    (root / "Dockerfile").write_text("FROM python:3.12\nCOPY . /app\n")
+    # Old enough for the index to trust their mtime
+    for path in root.rglob("*"):
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return root / "Dockerfile"
+
+
+def _digest_ms(dockerfile: Path, cache_dir: Path) -> tuple[float, int]:
+    context = DockerBuildContext(dockerfile, cache_dir=cache_dir)
+    start = time.perf_counter()
+    context.digest()
+    return (time.perf_counter() - start) * 1e3, context.files_hashed
+
+
+def demo_docker_build_context() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        dockerfile = _make_context(Path(directory) / "context")
+        cache_dir = Path(directory) / "cache"
+
+        print(f"{FILES_COUNT} files")
+        for label in ("cold index", "unchanged", "unchanged"):
+            duration, hashed = _digest_ms(dockerfile, cache_dir)
+            print(f"{label:<12}{duration:>9.0f} ms {hashed:>7} hashed")
+
+
+if __name__ == "__main__":
+    demo_docker_build_context()
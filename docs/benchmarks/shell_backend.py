@@ -0,0 +1,36 @@
+import resource
+import time
+
+from wexample_helpers.enums.shell_backend import ShellBackend
+from wexample_helpers.helpers.shell import shell_run
+
+COMMAND = ["true"]
+
+
+def _rss_mb() -> float:
+    # Peak RSS, which only grows here, in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _spawn_us(backend: ShellBackend, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        shell_run(COMMAND, backend=backend)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def demo_shell_backend(heap_sizes_mb=(0, 512, 2048), number: int = 300) -> None:
+    # Filled with non-zero bytes so that every page is really mapped
+    heap = []
+
+    print(f"{'parent RSS':<14}" + "".join(f"{backend.value:>16}" for backend in ShellBackend))
+    for size_mb in heap_sizes_mb:
+        heap.append(b"\x01" * (size_mb * 1024 * 1024 - sum(map(len, heap))))
+        timings = "".join(
+            f"{_spawn_us(backend, number):>13.0f} us" for backend in ShellBackend
+        )
+        print(f"{_rss_mb():>9.0f} MiB {timings}")
+
+
+if __name__ == "__main__":
+    demo_shell_backend()
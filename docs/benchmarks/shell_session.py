@@ -0,0 +1,50 @@
+import time
+
+from wexample_helpers.classes.shell_session import ShellSession
+from wexample_helpers.classes.shell_session_pool import ShellSessionPool
+from wexample_helpers.helpers.shell import shell_run
+
+COMMAND = ["test", "-d", "/"]
+EXTERNAL_COMMAND = ["stat", "/"]
+
+
+def _seconds(callback) -> float:
+    start = time.perf_counter()
+    callback()
+    return time.perf_counter() - start
+
+
+def demo_shell_session(count: int = 10_000, pool_size: int = 4) -> None:
+    for command in (COMMAND, EXTERNAL_COMMAND):
+
+        def _shell_run() -> None:
+            for _ in range(count):
+                shell_run(command)
+
+        def _session() -> None:
+            with ShellSession() as session:
+                for _ in range(count):
+                    session.run(command)
+
+        def _shared_session() -> None:
+            with ShellSession(isolated=False) as session:
+                for _ in range(count):
+                    session.run(command)
+
+        def _pool() -> None:
+            with ShellSessionPool(size=pool_size) as pool:
+                pool.map(command for _ in range(count))
+
+        print(f"{count} x {' '.join(command)}")
+        for label, callback in (
+            ("shell_run", _shell_run),
+            ("ShellSession", _session),
+            ("ShellSession(isolated=False)", _shared_session),
+            (f"ShellSessionPool({pool_size})", _pool),
+        ):
+            seconds = _seconds(callback)
+            print(f"{label:<30}{seconds:>8.2f} s{seconds / count * 1e6:>10.0f} us")
+
+
+if __name__ == "__main__":
+    demo_shell_session()
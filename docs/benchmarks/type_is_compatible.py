@@ -0,0 +1,59 @@
+import time
+from collections.abc import Callable, Mapping, Sequence
+from typing import Optional
+
+from wexample_helpers.helpers import type as type_helpers
+
+PAIRS_COUNT = 1_000
+
+PLUGIN_CLASSES = tuple(type(f"BenchmarkPlugin{index}", (), {}) for index in range(50))
+
+
+def _signature_pairs() -> list[tuple[object, object]]:
+    """Build the (provided, expected) annotations a plugin registry wires at startup."""
+    pairs = []
+    for index in range(PAIRS_COUNT):
+        plugin = PLUGIN_CLASSES[index % len(PLUGIN_CLASSES)]
+        other = PLUGIN_CLASSES[(index * 7) % len(PLUGIN_CLASSES)]
+        provided = [
+            Callable[[plugin], dict[str, list[plugin]]],
+            plugin | None,
+            tuple[plugin, ...],
+            type[plugin],
+            frozenset[plugin],
+        ][index % 5]
+        expected = [
+            Callable[[plugin], Mapping[str, Sequence[plugin | other]]],
+            Optional[plugin],
+            Sequence[plugin],
+            type[plugin] | type[other],
+            frozenset[other],
+        ][index % 5]
+        pairs.append((provided, expected))
+    return pairs
+
+
+def _wire(pairs: list[tuple[object, object]]) -> tuple[float, int]:
+    start = time.perf_counter()
+    compatible = sum(
+        type_helpers.type_is_compatible(provided, expected)
+        for provided, expected in pairs
+    )
+    return time.perf_counter() - start, compatible
+
+
+def demo_type_is_compatible() -> None:
+    pairs = _signature_pairs()
+    cache_clear = getattr(type_helpers, "type_validator_cache_clear", None)
+    if cache_clear is not None:
+        cache_clear()
+
+    cold, compatible = _wire(pairs)
+    warm, _ = _wire(pairs)
+    print(f"{len(pairs)} pairs, {compatible} compatible")
+    print(f"{'first wiring':<16}{cold * 1e3:>9.2f} ms")
+    print(f"{'next wirings':<16}{warm * 1e3:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    demo_type_is_compatible()
@@ -0,0 +1,63 @@
+import timeit
+from collections.abc import Callable
+from typing import TypedDict, Union
+
+from wexample_helpers.helpers import type as type_helpers
+
+
+class BenchmarkClassA:
+    pass
+
+
+class BenchmarkClassB:
+    pass
+
+
+WIDE_UNION_CLASSES = tuple(
+    type(f"BenchmarkWideClass{index}", (), {}) for index in range(12)
+)
+
+
+class BenchmarkService:
+    # String annotations, as written by "from __future__ import annotations"
+    def handle(self, name: "str") -> "BenchmarkClassA":
+        return BenchmarkClassA()
+
+
+class BenchmarkTypedDict(TypedDict):
+    name: str
+    count: int
+
+
+CASES = [
+    ("int", 123, int),
+    ("dict[str, list[int]]", {"a": [1, 2, 3], "b": [4, 5]}, dict[str, list[int]]),
+    ("A | B | None", BenchmarkClassB(), BenchmarkClassA | BenchmarkClassB | None),
+    ("TypedDict", {"name": "lorem", "count": 3}, BenchmarkTypedDict),
+    ("Union[12 classes]", WIDE_UNION_CLASSES[-1](), Union[WIDE_UNION_CLASSES]),
+    ("Union[12 classes] | str", "lorem", Union[WIDE_UNION_CLASSES + (list[int], str)]),
+    ("Callable[..., A] method", BenchmarkService().handle, Callable[..., BenchmarkClassA]),
+]
+
+
+def _per_call_ns(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def demo_type_validate(number: int = 100_000) -> None:
+    compile_validator = getattr(type_helpers, "type_compile_validator", None)
+
+    print(f"{'annotation':<24}{'validate_or_fail':>20}{'compiled':>14}")
+    for label, value, allowed_type in CASES:
+        validate_ns = _per_call_ns(
+            lambda: type_helpers.type_validate_or_fail(value, allowed_type), number
+        )
+        compiled_ns = "-"
+        if compile_validator is not None:
+            validator = compile_validator(allowed_type)
+            compiled_ns = f"{_per_call_ns(lambda: validator(value), number):.0f} ns"
+        print(f"{label:<24}{validate_ns:>17.0f} ns{compiled_ns:>14}")
+
+
+if __name__ == "__main__":
+    demo_type_validate()
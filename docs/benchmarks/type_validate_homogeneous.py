@@ -0,0 +1,30 @@
+import timeit
+
+from wexample_helpers.helpers.type import type_generic_value_is_valid
+
+SIZE = 1_000_000
+
+CASES = [
+    ("list[int]", list(range(SIZE)), list[int]),
+    ("list[str]", [str(i) for i in range(SIZE)], list[str]),
+    ("list[object]", [object() for _ in range(SIZE)], list[object]),
+    ("dict[str, str]", {str(i): str(i) for i in range(SIZE)}, dict[str, str]),
+    ("set[int]", set(range(SIZE)), set[int]),
+]
+
+
+def demo_type_validate_homogeneous() -> None:
+    print(f"{'annotation':<26}{'per call':>12}{'per item':>12}")
+    for label, value, allowed_type in CASES:
+        seconds = min(
+            timeit.repeat(
+                lambda: type_generic_value_is_valid(value, allowed_type),
+                number=1,
+                repeat=5,
+            )
+        )
+        print(f"{label:<26}{seconds * 1e3:>9.1f} ms{seconds / SIZE * 1e9:>9.1f} ns")
+
+
+if __name__ == "__main__":
+    demo_type_validate_homogeneous()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import stat
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class DockerBuildContext:
+    """Content digest of a docker build context: its Dockerfile and every file sent.
+
+    Files excluded by the .dockerignore (or <Dockerfile>.dockerignore, which takes
+    precedence, like BuildKit does) are left out. File hashes are kept in an index file
+    under cache_dir with their size and mtime, so only new or changed files are read
+    again, by max_workers threads at once.
+    """
+
+    def __init__(
+        self,
+        dockerfile_path: Path,
+        context_path: Path | None = None,
+        *,
+        cache_dir: Path | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        self.dockerfile_path = Path(dockerfile_path)
+        self.context_path = Path(context_path or self.dockerfile_path.parent).resolve()
+        self.cache_dir = cache_dir or self.default_cache_dir()
+        self.files_hashed = 0
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+        self._patterns = [
+            self._compile_pattern(line) for line in self._read_ignore_lines()
+        ]
+        self._has_exceptions = any(exception for _, exception in self._patterns)
+
+    @staticmethod
+    def default_cache_dir() -> Path:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home) / "wexample-helpers" / "docker-build-context"
+
+    def digest(self) -> str:
+        """Return the context digest, hashing only files changed since the last call.
+
+        files_hashed then tells how many files had to be read.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Entries modified this recently may change again within the mtime granularity
+        racy_after = time.time_ns() - 2_000_000_000
+        index = self._index_load()
+        files = sorted(self.iter_files())
+
+        entries: dict[str, list] = {}
+        stale = []
+        for relative_path, file_stat in files:
+            entry = index.get(relative_path)
+            if (
+                entry is not None
+                and entry[0] == file_stat.st_size
+                and entry[1] == file_stat.st_mtime_ns
+            ):
+                entries[relative_path] = entry
+            else:
+                stale.append((relative_path, file_stat))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for (relative_path, file_stat), file_hash in zip(
+                stale,
+                executor.map(
+                    lambda item: self._hash_file(self.context_path / item[0], item[1]),
+                    stale,
+                ),
+            ):
+                entries[relative_path] = [
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    file_hash,
+                ]
+        self.files_hashed = len(stale)
+
+        dockerfile_hash = self._hash_file(
+            self.dockerfile_path, self.dockerfile_path.stat()
+        )
+        digest = hashlib.sha256(f"dockerfile\0{dockerfile_hash}".encode())
+        for relative_path, file_stat in files:
+            digest.update(
+                f"\n{relative_path}\0{stat.S_IMODE(file_stat.st_mode):o}\0"
+                f"{entries[relative_path][2]}".encode()
+            )
+
+        if stale or len(index) != len(entries):
+            self._index_save(
+                {
+                    relative_path: entry
+                    for relative_path, entry in entries.items()
+                    if entry[1] < racy_after
+                }
+            )
+        return digest.hexdigest()
+
+    def is_ignored(self, relative_path: str) -> bool:
+        """Tell if the .dockerignore excludes a context relative path, using slashes."""
+        parents = relative_path.split("/")
+        candidates = ["/".join(parents[: length + 1]) for length in range(len(parents))]
+
+        ignored = False
+        # The last matching pattern wins, a pattern also matches the paths under it;
+        # patterns that would not change the outcome are not matched at all
+        for pattern, exception in self._patterns:
+            if ignored == exception and any(
+                pattern.fullmatch(candidate) for candidate in candidates
+            ):
+                ignored = not exception
+        return ignored
+
+    def iter_files(self) -> Iterator[tuple[str, os.stat_result]]:
+        """Yield every file and symlink of the context not ignored, with its lstat."""
+        pending = [""]
+        while pending:
+            directory = pending.pop()
+            with os.scandir(self.context_path / directory) as entries:
+                for entry in entries:
+                    relative_path = f"{directory}{entry.name}"
+                    ignored = self.is_ignored(relative_path)
+                    if entry.is_dir(follow_symlinks=False):
+                        # Exception patterns may bring back files under ignored ones
+                        if not ignored or self._has_exceptions:
+                            pending.append(f"{relative_path}/")
+                    elif not ignored:
+                        yield relative_path, entry.stat(follow_symlinks=False)
+
+    def _index_load(self) -> dict[str, list]:
+        import json
+
+        try:
+            return json.loads(self._index_path().read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _index_path(self) -> Path:
+        key = hashlib.sha256(str(self.context_path).encode()).hexdigest()[:32]
+        return self.cache_dir / f"{key}.json"
+
+    def _index_save(self, index: dict[str, list]) -> None:
+        import json
+
+        path = self._index_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary_path.write_text(json.dumps(index, separators=(",", ":")))
+            temporary_path.replace(path)
+        except OSError:
+            # Only the next digest gets slower
+            pass
+
+    def _read_ignore_lines(self) -> list[str]:
+        for path in (
+            self.dockerfile_path.with_name(f"{self.dockerfile_path.name}.dockerignore"),
+            self.context_path / ".dockerignore",
+        ):
+            if path.is_file():
+                return [
+                    line.strip()
+                    for line in path.read_text().splitlines()
+                    if line.strip() and not line.lstrip().startswith("#")
+                ]
+        return []
+
+    @staticmethod
+    def _compile_pattern(line: str) -> tuple[re.Pattern[str], bool]:
+        """Translate a .dockerignore line, with Go filepath.Match syntax and **."""
+        exception = line.startswith("!")
+        pattern = os.path.normpath(line[1:].strip() if exception else line).strip("/")
+
+        regex = ""
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if pattern.startswith("**", index):
+                index += 2
+                if pattern.startswith("/", index):
+                    index += 1
+                    regex += "(?:.*/)?"
+                else:
+                    regex += ".*"
+                continue
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "[":
+                end = pattern.find("]", index + 1)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    content = pattern[index + 1 : end]
+                    if content.startswith(("!", "^")):
+                        content = "^" + content[1:]
+                    regex += f"[{content}]"
+                    index = end
+            elif char == "\\" and index + 1 < len(pattern):
+                index += 1
+                regex += re.escape(pattern[index])
+            else:
+                regex += re.escape(char)
+            index += 1
+        return re.compile(regex), exception
+
+    @staticmethod
+    def _hash_file(path: Path, file_stat: os.stat_result) -> str:
+        if stat.S_ISLNK(file_stat.st_mode):
+            target = os.fsencode(os.readlink(path))
+            return hashlib.sha256(b"symlink\0" + target).hexdigest()
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()
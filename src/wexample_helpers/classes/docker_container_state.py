@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(frozen=True)
+class DockerContainerState:
+    """A container as listed by docker ps, running or not."""
+
+    id: str
+    image: str
+    name: str
+    state: str
+    labels: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> DockerContainerState:
+        """Build from an Engine API /containers/json item."""
+        return cls(
+            id=data["Id"],
+            image=data["Image"],
+            name=data["Names"][0].lstrip("/"),
+            state=data["State"],
+            labels=data.get("Labels") or {},
+        )
+
+    @classmethod
+    def from_cli(cls, data: dict[str, Any]) -> DockerContainerState:
+        """Build from a docker ps --format '{{json .}}' line."""
+        labels = {}
+        # The CLI joins labels with commas, so values holding one cannot be told apart
+        for label in data.get("Labels", "").split(","):
+            if label:
+                key, _, value = label.partition("=")
+                labels[key] = value
+        return cls(
+            id=data["ID"],
+            image=data["Image"],
+            name=data["Names"].split(",")[0],
+            state=data["State"],
+            labels=labels,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self.state == "running"
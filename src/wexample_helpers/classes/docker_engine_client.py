@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class DockerEngineClient:
+    """Docker Engine HTTP API client over a unix socket, keeping connections alive.
+
+    Idle connections are kept, up to max_connections, and reused by the next requests,
+    so a query costs a request/response round trip instead of a docker CLI process. A
+    kept connection found closed by the daemon is replaced before sending; if it only
+    fails once sent, GET and HEAD requests are sent again, others never run twice.
+
+    timeout limits each socket read, None (default) waits like the docker CLI does,
+    e.g. for a silent docker exec command or a long pull; connect_timeout only limits
+    connecting to the socket.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = "/var/run/docker.sock",
+        *,
+        max_connections: int = 4,
+        timeout: float | None = None,
+        connect_timeout: float | None = 10.0,
+    ) -> None:
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> DockerEngineClient:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the idle connections, new ones are opened by the next requests."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        query: Mapping[str, Any] | None = None,
+        body: Any = None,
+    ) -> tuple[int, bytes]:
+        """Send a request and return the status and the whole response body.
+
+        Query values that are not strings are JSON encoded, like the API filters, and so
+        is the body. Raises DockerEngineException on error statuses.
+        """
+        from urllib.parse import urlencode
+
+        from wexample_helpers.exception.docker_engine_exception import (
+            DockerEngineException,
+        )
+
+        if query:
+            path += "?" + urlencode(
+                {
+                    key: value if isinstance(value, str) else json.dumps(value)
+                    for key, value in query.items()
+                }
+            )
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {"Host": "docker"}
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+
+        status, data = self._send(method, path, payload, headers)
+        if status >= 400:
+            try:
+                message = json.loads(data).get("message")
+            except (ValueError, AttributeError):
+                message = data.decode(errors="replace")
+            raise DockerEngineException(method, path, status, message)
+        return status, data
+
+    def request_json(
+        self,
+        method: str,
+        path: str,
+        *,
+        query: Mapping[str, Any] | None = None,
+        body: Any = None,
+    ) -> Any:
+        """Send a request and return its decoded JSON response, None when empty."""
+        _, data = self.request(method, path, query=query, body=body)
+        return json.loads(data) if data else None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection = _DockerUnixConnection(
+            self.socket_path, timeout=self.timeout, connect_timeout=self.connect_timeout
+        )
+        connection.connect()
+        return connection
+
+    def _exchange(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        payload: bytes | None,
+        headers: dict[str, str],
+    ) -> tuple[int, bytes]:
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+
+        if not response.will_close:
+            with self._lock:
+                if len(self._idle) < self.max_connections:
+                    self._idle.append(connection)
+                    return response.status, data
+        connection.close()
+        return response.status, data
+
+    @staticmethod
+    def _is_stale(connection: http.client.HTTPConnection) -> bool:
+        """Tell if an idle connection was closed by the daemon, or got unexpected data."""
+        import select
+
+        if connection.sock is None:
+            return True
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+        return bool(readable)
+
+    def _send(
+        self, method: str, path: str, payload: bytes | None, headers: dict[str, str]
+    ) -> tuple[int, bytes]:
+        connection = None
+        with self._lock:
+            while self._idle and connection is None:
+                connection = self._idle.pop()
+                if self._is_stale(connection):
+                    connection.close()
+                    connection = None
+
+        if connection is not None:
+            try:
+                return self._exchange(connection, method, path, payload, headers)
+            except (
+                BrokenPipeError,
+                ConnectionResetError,
+                http.client.RemoteDisconnected,
+            ):
+                # Closed by the daemon meanwhile, the request may have run already
+                if method not in ("GET", "HEAD"):
+                    raise
+        return self._exchange(self._connect(), method, path, payload, headers)
+
+
+class _DockerUnixConnection(http.client.HTTPConnection):
+    def __init__(
+        self, socket_path: str, timeout: float | None, connect_timeout: float | None
+    ) -> None:
+        super().__init__("docker", timeout=timeout)
+        self.connect_timeout = connect_timeout
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.connect_timeout)
+        self.sock.connect(self.socket_path)
+        self.sock.settimeout(self.timeout)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from wexample_helpers.classes.shell_session import ShellSession
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from wexample_helpers.const.types import PathOrString
+
+
+class DockerExecSession(ShellSession):
+    """A shell running inside a container through one docker exec, see ShellSession.
+
+    Commands are delimited and isolated the same way, so many of them cost one docker
+    exec instead of one each. cwd and env apply inside the container, for the session
+    or per command. A timeout kills the docker exec client, the shell inside the
+    container then exits once its stdin is closed, after the running command.
+    """
+
+    def __init__(
+        self,
+        container_name: str,
+        *,
+        user: str | None = None,
+        cwd: PathOrString | None = None,
+        env: Mapping[str, str] | None = None,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        executable: str = "sh",
+        isolated: bool = True,
+    ) -> None:
+        # The docker client itself runs from here, with the current environment
+        super().__init__(
+            encoding=encoding, errors=errors, executable=executable, isolated=isolated
+        )
+        self.container_cwd = cwd
+        self.container_env = env
+        self.container_name = container_name
+        self.user = user
+
+    def _command(self) -> list[str]:
+        cmd = ["docker", "exec", "-i"]
+        if self.user:
+            cmd += ["--user", self.user]
+        if self.container_cwd is not None:
+            cmd += ["--workdir", str(self.container_cwd)]
+        for key, value in (self.container_env or {}).items():
+            cmd += ["--env", f"{key}={value}"]
+        return cmd + [self.container_name, self.executable]
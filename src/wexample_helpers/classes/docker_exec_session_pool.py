@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any
+
+from wexample_helpers.classes.docker_exec_session import DockerExecSession
+from wexample_helpers.classes.shell_session_pool import ShellSessionPool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from wexample_helpers.classes.shell_result import ShellResult
+
+
+class DockerExecSessionPool:
+    """DockerExecSession pools keyed by container name, safe to share between threads.
+
+    Each container gets its own pool of size sessions on first use, each session being
+    started by its first command. Discard a container pool once it is removed.
+    """
+
+    def __init__(self, size: int = 2, **session_kwargs: Any) -> None:
+        if size < 1:
+            raise ValueError("A docker exec session pool needs at least one session")
+
+        self.session_kwargs = session_kwargs
+        self.size = size
+        self._lock = threading.Lock()
+        self._pools: dict[str, ShellSessionPool] = {}
+
+    def __enter__(self) -> DockerExecSessionPool:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def discard(self, container_name: str) -> None:
+        """Stop the sessions of a container, e.g. once it was stopped or removed."""
+        with self._lock:
+            pool = self._pools.pop(container_name, None)
+        if pool is not None:
+            pool.close()
+
+    def map(
+        self,
+        container_name: str,
+        cmds: Iterable[str | Sequence[str]],
+        **run_kwargs: Any,
+    ) -> list[ShellResult]:
+        """Run commands across the container sessions, results in the given order."""
+        return self.pool(container_name).map(cmds, **run_kwargs)
+
+    def pool(self, container_name: str) -> ShellSessionPool:
+        """Return the sessions pool of a container, created on first use."""
+        with self._lock:
+            pool = self._pools.get(container_name)
+            if pool is None:
+                pool = self._pools[container_name] = ShellSessionPool(
+                    self.size,
+                    session_class=DockerExecSession,
+                    container_name=container_name,
+                    **self.session_kwargs,
+                )
+            return pool
+
+    def run(
+        self, container_name: str, cmd: str | Sequence[str], **run_kwargs: Any
+    ) -> ShellResult:
+        """Run a command on a free session of the container, see ShellSession.run()."""
+        return self.pool(container_name).run(cmd, **run_kwargs)
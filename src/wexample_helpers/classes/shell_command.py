@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from wexample_helpers.const.types import PathOrString
+
+
+@dataclass(frozen=True)
+class ShellCommand:
+    """A command with its own working directory and environment, for batch runs."""
+
+    cmd: str | list[str]
+    cwd: PathOrString | None = None
+    env: Mapping[str, str] | None = None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import BinaryIO
+
+
+class ShellOutputCapture:
+    """Bounded-memory sink for a command output stream.
+
+    - tail_bytes: only the last bytes are kept in memory, older output is dropped.
+    - spool_bytes: output is kept in memory up to this size, then moved to a temporary
+      file that receives the rest; the file is removed with the capture or by close().
+
+    With both, the whole output is spooled and the tail is read back from the file.
+    """
+
+    def __init__(
+        self,
+        *,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        spool_bytes: int | None = None,
+        tail_bytes: int | None = None,
+    ) -> None:
+        self.encoding = encoding
+        self.errors = errors
+        self.size = 0
+        self.spool_bytes = spool_bytes
+        self.tail_bytes = tail_bytes
+        self._buffer = bytearray()
+        self._file: BinaryIO | None = None
+        self._finalizer: weakref.finalize | None = None
+        self._path: Path | None = None
+
+    @property
+    def path(self) -> Path | None:
+        """Temporary file holding the whole output, once spooled."""
+        return self._path
+
+    @property
+    def tail(self) -> bytes:
+        """Last tail_bytes of the output, or all the output kept when not limited.
+
+        Spooled output is only read back up to tail_bytes, or spool_bytes without it,
+        the rest stays in the file.
+        """
+        if self._path is None:
+            if self.tail_bytes is not None:
+                return bytes(self._buffer[max(len(self._buffer) - self.tail_bytes, 0) :])
+            return bytes(self._buffer)
+
+        if self._file is not None:
+            self._file.flush()
+        limit = self.tail_bytes if self.tail_bytes is not None else self.spool_bytes
+        with open(self._path, "rb") as file:
+            if limit is not None and self.size > limit:
+                file.seek(-limit, os.SEEK_END)
+            return file.read()
+
+    @property
+    def truncated(self) -> bool:
+        """Tell if the beginning of the output was dropped."""
+        return self._path is None and self.size > len(self._buffer)
+
+    def close(self) -> None:
+        """Finish writing, and remove the spool file if any."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._file = None
+        self._path = None
+
+    def finish(self) -> None:
+        """Close the spool file for writing, keeping it for readers."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield decoded lines, from the spool file when there is one, without loading it."""
+        if self._path is None:
+            yield from self._buffer.decode(self.encoding, self.errors).splitlines(True)
+            return
+
+        if self._file is not None:
+            self._file.flush()
+        with open(
+            self._path, encoding=self.encoding, errors=self.errors, newline=""
+        ) as file:
+            yield from file
+
+    def tail_text(self) -> str:
+        return self.tail.decode(self.encoding, self.errors)
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+
+        self._buffer += chunk
+        if self.spool_bytes is not None:
+            if len(self._buffer) > self.spool_bytes:
+                self._spool()
+        elif self.tail_bytes is not None and len(self._buffer) > self.tail_bytes:
+            # Keep the ring at tail_bytes
+            del self._buffer[: len(self._buffer) - self.tail_bytes]
+
+    def _spool(self) -> None:
+        descriptor, path = tempfile.mkstemp(prefix="shell-output-")
+        self._file = os.fdopen(descriptor, "wb")
+        self._path = Path(path)
+        self._finalizer = weakref.finalize(
+            self, ShellOutputCapture._remove, self._file, path
+        )
+        self._file.write(self._buffer)
+        self._buffer = bytearray()
+
+    @staticmethod
+    def _remove(file: BinaryIO, path: str) -> None:
+        file.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class ShellResourceUsage:
+    """CPU time, peak memory and context switches of a finished command.
+
+    Read from os.wait4() for synchronous runs. Asynchronous runs measure the
+    RUSAGE_CHILDREN difference around the command, and only know the peak memory when it
+    exceeds every previous child. They get no usage when other runs of the shell helpers
+    reap children meanwhile, but children reaped by other code are still counted.
+    """
+
+    cpu_system: float
+    cpu_user: float
+    involuntary_context_switches: int
+    max_rss_bytes: int | None
+    voluntary_context_switches: int
+
+    @classmethod
+    def from_rusage(cls, rusage: Any) -> ShellResourceUsage:
+        return cls(
+            cpu_system=rusage.ru_stime,
+            cpu_user=rusage.ru_utime,
+            involuntary_context_switches=rusage.ru_nivcsw,
+            max_rss_bytes=cls._rss_bytes(rusage.ru_maxrss),
+            voluntary_context_switches=rusage.ru_nvcsw,
+        )
+
+    @classmethod
+    def from_rusage_delta(cls, before: Any, after: Any) -> ShellResourceUsage:
+        return cls(
+            cpu_system=after.ru_stime - before.ru_stime,
+            cpu_user=after.ru_utime - before.ru_utime,
+            involuntary_context_switches=after.ru_nivcsw - before.ru_nivcsw,
+            max_rss_bytes=(
+                cls._rss_bytes(after.ru_maxrss)
+                if after.ru_maxrss > before.ru_maxrss
+                else None
+            ),
+            voluntary_context_switches=after.ru_nvcsw - before.ru_nvcsw,
+        )
+
+    @property
+    def cpu_total(self) -> float:
+        return self.cpu_system + self.cpu_user
+
+    @staticmethod
+    def _rss_bytes(max_rss: int) -> int:
+        # Linux reports kibibytes, macOS bytes
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
@@ -2,11 +2,22 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from wexample_helpers.classes.shell_output_capture import ShellOutputCapture
+    from wexample_helpers.classes.shell_resource_usage import ShellResourceUsage
 
 
 @dataclass
 class ShellResult:
-    """Structured result for shell command execution."""
+    """Structured result for shell command execution.
+
+    When captured with a bounded memory mode, stdout and stderr are None and the
+    output is read through the tail, path and line accessors.
+    """
 
     args: str | list[str]
     cwd: Path | None
@@ -16,3 +27,44 @@ class ShellResult:
     start_time: float
     stderr: str | None
     stdout: str | None
+    stderr_capture: ShellOutputCapture | None = None
+    stdout_capture: ShellOutputCapture | None = None
+    # Output went over the max bytes allowed and was cut
+    truncated: bool = False
+    usage: ShellResourceUsage | None = None
+
+    @property
+    def stderr_path(self) -> Path | None:
+        return self.stderr_capture.path if self.stderr_capture else None
+
+    @property
+    def stderr_tail(self) -> str | None:
+        if self.stderr_capture is None:
+            return self.stderr
+        return self.stderr_capture.tail_text()
+
+    @property
+    def stdout_path(self) -> Path | None:
+        """Temporary file holding the whole stdout, when spooled."""
+        return self.stdout_capture.path if self.stdout_capture else None
+
+    @property
+    def stdout_tail(self) -> str | None:
+        """End of stdout kept by the capture, or the whole stdout when captured eagerly."""
+        if self.stdout_capture is None:
+            return self.stdout
+        return self.stdout_capture.tail_text()
+
+    def iter_stderr_lines(self) -> Iterator[str]:
+        return self._iter_lines(self.stderr, self.stderr_capture)
+
+    def iter_stdout_lines(self) -> Iterator[str]:
+        """Yield stdout lines, streaming them from the spool file when there is one."""
+        return self._iter_lines(self.stdout, self.stdout_capture)
+
+    def _iter_lines(
+        self, output: str | None, capture: ShellOutputCapture | None
+    ) -> Iterator[str]:
+        if capture is not None:
+            return capture.iter_lines()
+        return iter(output.splitlines(True) if output else ())
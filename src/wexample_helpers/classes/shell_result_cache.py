@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from wexample_helpers.classes.shell_result import ShellResult
+
+
+class ShellResultCache:
+    """LRU of command results with a TTL each, optionally persisted to a directory.
+
+    Keys are built by shell_run_cached from the argv, cwd and selected environment
+    variables. Entries are invalidated by argv prefix, e.g. ["docker", "ps"], once a
+    command changed what they report. Expiry uses the wall clock, so entries stored on
+    disk stay valid across processes.
+    """
+
+    def __init__(self, max_entries: int = 256, path: Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: OrderedDict[str, tuple[float, ShellResult]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "disk_hits": 0,
+            "evictions": 0,
+            "hits": 0,
+            "invalidations": 0,
+            "misses": 0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+        for file in self._disk_files():
+            file.unlink(missing_ok=True)
+
+    def get(self, key: str) -> ShellResult | None:
+        """Return a copy of the result stored for a key, unless missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return self._copy(entry[1])
+                del self._entries[key]
+
+        entry = self._disk_read(key, now)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._store(key, *entry)
+        return self._copy(entry[1])
+
+    def info(self) -> dict[str, Any]:
+        """Return hit, miss, disk hit, eviction and invalidation counters, and the size."""
+        with self._lock:
+            return {
+                **self._stats,
+                "currsize": len(self._entries),
+                "maxsize": self.max_entries,
+            }
+
+    def invalidate(self, prefix: Sequence[str] = ()) -> int:
+        """Drop every entry whose command starts with these arguments, all when empty.
+
+        Returns how many entries were dropped from memory.
+        """
+        prefix = list(prefix)
+        with self._lock:
+            keys = [
+                key
+                for key, (_, result) in self._entries.items()
+                if self._matches(result, prefix)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(keys)
+
+        if self.path is not None:
+            for file in self._disk_files():
+                entry = self._disk_load(file)
+                if entry is None or self._matches(entry[1], prefix):
+                    file.unlink(missing_ok=True)
+        return len(keys)
+
+    def set(self, key: str, result: ShellResult, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        with self._lock:
+            # Callers may change the result they keep, hits must not see it
+            self._store(key, expires_at, self._copy(result))
+        self._disk_write(key, expires_at, result)
+
+    @staticmethod
+    def _copy(result: ShellResult) -> ShellResult:
+        from dataclasses import replace
+
+        return replace(
+            result, args=result.args if isinstance(result.args, str) else list(result.args)
+        )
+
+    def _disk_file(self, key: str) -> Path:
+        import hashlib
+
+        return self.path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _disk_files(self) -> list[Path]:
+        if self.path is None or not self.path.is_dir():
+            return []
+        return list(self.path.glob("*.json"))
+
+    def _disk_load(self, file: Path) -> tuple[float, ShellResult] | None:
+        import json
+
+        from wexample_helpers.classes.shell_result import ShellResult
+
+        try:
+            data = json.loads(file.read_text())
+            result = data["result"]
+            return data["expires_at"], ShellResult(
+                args=result["args"],
+                cwd=Path(result["cwd"]) if result["cwd"] else None,
+                duration=result["duration"],
+                end_time=result["end_time"],
+                returncode=result["returncode"],
+                start_time=result["start_time"],
+                stderr=result["stderr"],
+                stdout=result["stdout"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, partially written or from another version
+            return None
+
+    def _disk_read(self, key: str, now: float) -> tuple[float, ShellResult] | None:
+        if self.path is None:
+            return None
+        file = self._disk_file(key)
+        entry = self._disk_load(file)
+        if entry is not None and entry[0] <= now:
+            file.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _disk_write(self, key: str, expires_at: float, result: ShellResult) -> None:
+        import json
+        import os
+        import tempfile
+
+        if self.path is None:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        file = self._disk_file(key)
+        data = json.dumps(
+            {
+                "expires_at": expires_at,
+                "result": {
+                    "args": result.args,
+                    "cwd": str(result.cwd) if result.cwd else None,
+                    "duration": result.duration,
+                    "end_time": result.end_time,
+                    "returncode": result.returncode,
+                    "start_time": result.start_time,
+                    "stderr": result.stderr,
+                    "stdout": result.stdout,
+                },
+            }
+        )
+        # Unique per writer, readers never see a partially written entry
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.path, prefix=f"{file.stem}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w") as temporary_file:
+                temporary_file.write(data)
+            os.replace(temporary_path, file)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+
+    def _matches(self, result: ShellResult, prefix: list[str]) -> bool:
+        import shlex
+
+        args = result.args if isinstance(result.args, list) else shlex.split(result.args)
+        return args[: len(prefix)] == prefix
+
+    def _store(self, key: str, expires_at: float, result: ShellResult) -> None:
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
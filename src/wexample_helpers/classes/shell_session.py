@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import os
+import re
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from wexample_helpers.classes.shell_result import ShellResult
+    from wexample_helpers.const.types import PathOrString
+
+
+class ShellSession:
+    """A long-lived bash co-process running many small commands without a fork/exec each.
+
+    Commands are written to bash stdin, each one in a subshell so that cd, exports or exit
+    never leak to the next one. Its output is delimited on stdout and stderr by a random
+    sentinel line carrying the exit code. One command runs at a time per session, use a
+    ShellSessionPool for parallelism.
+
+    With isolated=False, commands without cwd or env run in the session shell itself,
+    saving the subshell fork: builtins then cost no process at all, external commands a
+    single one, but shell state changes persist, and an exit ends the co-process with a
+    RuntimeError (it is started again by the next command).
+    """
+
+    def __init__(
+        self,
+        *,
+        cwd: PathOrString | None = None,
+        env: Mapping[str, str] | None = None,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        executable: str = "bash",
+        isolated: bool = True,
+    ) -> None:
+        self.cwd = cwd
+        self.encoding = encoding
+        self.env = env
+        self.errors = errors
+        self.executable = executable
+        self.isolated = isolated
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._sentinel = f"__SHELL_SESSION_{uuid.uuid4().hex}__".encode()
+
+    def __enter__(self) -> ShellSession:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def close(self) -> None:
+        """Stop the co-process, it is started again by the next command."""
+        with self._lock:
+            self._stop()
+
+    def run(
+        self,
+        cmd: str | Sequence[str],
+        *,
+        cwd: PathOrString | None = None,
+        env: Mapping[str, str] | None = None,
+        check: bool = True,
+        timeout: float | None = None,
+    ) -> ShellResult:
+        """Run a command in the session and return a ShellResult, like shell_run.
+
+        - cmd: A str is run as a shell command line, a list is quoted first.
+        - cwd: Directory to run the command from, for this command only.
+        - env: Variables exported for this command only, on top of the session ones;
+          ValueError is raised for names that are not valid shell identifiers.
+        - timeout: Seconds before the session is killed and TimeoutExpired raised; the
+          co-process is started again by the next command.
+        """
+        from pathlib import Path
+
+        from wexample_helpers.classes.shell_result import ShellResult
+
+        command = cmd if isinstance(cmd, str) else shlex.join(cmd)
+
+        script = self._build_script(command, cwd=cwd, env=env)
+
+        with self._lock:
+            start = time.monotonic()
+            process = self._ensure_process()
+            try:
+                process.stdin.write(script)
+                process.stdin.flush()
+                stdout, stderr, returncode = self._read_until_sentinels(
+                    process, None if timeout is None else start + timeout
+                )
+            except subprocess.TimeoutExpired:
+                self._stop()
+                raise subprocess.TimeoutExpired(command, timeout)  # type: ignore[arg-type]
+            except BaseException:
+                # Output left in the pipes would be read as the next command one
+                self._stop()
+                raise
+            end = time.monotonic()
+
+        stdout_text = stdout.decode(self.encoding, self.errors)
+        stderr_text = stderr.decode(self.encoding, self.errors)
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, command, output=stdout_text, stderr=stderr_text
+            )
+
+        return ShellResult(
+            args=command,
+            returncode=returncode,
+            stdout=stdout_text,
+            stderr=stderr_text,
+            cwd=Path(cwd) if cwd else None,
+            duration=end - start,
+            start_time=start,
+            end_time=end,
+        )
+
+    def _build_script(
+        self,
+        command: str,
+        *,
+        cwd: PathOrString | None,
+        env: Mapping[str, str] | None,
+    ) -> bytes:
+        setup = ""
+        if cwd is not None:
+            setup += f"cd {shlex.quote(str(cwd))} || exit $?\n"
+        for key, value in (env or {}).items():
+            # Keys are not quoted, anything else would run as shell code
+            if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", key):
+                raise ValueError(f"Invalid environment variable name: {key!r}")
+            setup += f"export {key}={shlex.quote(value)}\n"
+
+        sentinel = self._sentinel.decode()
+        group = "({}\n)" if self.isolated or setup else "{{ {}\n}}"
+        # Evaluated from a quoted string, so that a syntax error, e.g. an unbalanced
+        # quote, fails the command instead of swallowing the sentinels below. These
+        # start with a newline in case the output does not end with one
+        return (
+            group.format(f"\n{setup}eval {shlex.quote(command)}") + " </dev/null\n"
+            f"printf '\\n{sentinel} %d\\n' $?\n"
+            f"printf '\\n{sentinel}\\n' >&2\n"
+        ).encode(self.encoding)
+
+    def _command(self) -> list[str]:
+        """Arguments starting the co-process shell, reading commands from stdin."""
+        return [self.executable, "--noprofile", "--norc"]
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                self._command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.cwd,
+                env=dict(self.env) if self.env is not None else None,
+                # Own process group, so a timeout can also kill running commands
+                start_new_session=True,
+            )
+        return self._process
+
+    def _read_until_sentinels(
+        self, process: subprocess.Popen, deadline: float | None
+    ) -> tuple[bytes, bytes, int]:
+        import selectors
+
+        stdout_end = b"\n" + self._sentinel + b" "
+        stderr_end = b"\n" + self._sentinel + b"\n"
+        buffers = {process.stdout.fileno(): bytearray(), process.stderr.fileno(): bytearray()}
+        stdout_buffer, stderr_buffer = buffers.values()
+        returncode: int | None = None
+        stderr_done = False
+
+        with selectors.DefaultSelector() as selector:
+            for fd in buffers:
+                selector.register(fd, selectors.EVENT_READ)
+
+            while returncode is None or not stderr_done:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise subprocess.TimeoutExpired("", 0)
+
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        self._stop()
+                        raise RuntimeError("Shell session ended unexpectedly")
+                    buffer = buffers[key.fd]
+                    buffer += chunk
+
+                    if buffer is stdout_buffer and buffer.endswith(b"\n"):
+                        # Only the last line may hold the sentinel, with an exit code
+                        position = buffer.rfind(
+                            stdout_end, max(len(buffer) - len(stdout_end) - 12, 0)
+                        )
+                        if position != -1:
+                            returncode = int(buffer[position + len(stdout_end) : -1])
+                            del buffer[position:]
+                            selector.unregister(key.fd)
+                    elif buffer is stderr_buffer and buffer.endswith(stderr_end):
+                        del buffer[-len(stderr_end) :]
+                        stderr_done = True
+                        selector.unregister(key.fd)
+
+        return bytes(stdout_buffer), bytes(stderr_buffer), returncode
+
+    def _stop(self) -> None:
+        process = self._process
+        self._process = None
+        if process is None:
+            return
+
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        process.wait()
+        for stream in (process.stdin, process.stdout, process.stderr):
+            stream.close()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import queue
+from typing import TYPE_CHECKING, Any
+
+from wexample_helpers.classes.shell_session import ShellSession
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from wexample_helpers.classes.shell_result import ShellResult
+
+
+class ShellSessionPool:
+    """A fixed set of ShellSession, each command borrowing a free one.
+
+    Sessions are started on first use, so an idle pool costs no process.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        session_class: type[ShellSession] = ShellSession,
+        **session_kwargs: Any,
+    ) -> None:
+        if size < 1:
+            raise ValueError("A shell session pool needs at least one session")
+
+        self.size = size
+        self.sessions = [session_class(**session_kwargs) for _ in range(size)]
+        self._idle: queue.SimpleQueue[ShellSession] = queue.SimpleQueue()
+        for session in self.sessions:
+            self._idle.put(session)
+
+    def __enter__(self) -> ShellSessionPool:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for session in self.sessions:
+            session.close()
+
+    def map(
+        self, cmds: Iterable[str | Sequence[str]], **run_kwargs: Any
+    ) -> list[ShellResult]:
+        """Run commands across every session and return their results in the given order."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(lambda cmd: self.run(cmd, **run_kwargs), cmds))
+
+    def run(self, cmd: str | Sequence[str], **run_kwargs: Any) -> ShellResult:
+        """Run a command on the first free session, see ShellSession.run()."""
+        session = self._idle.get()
+        try:
+            return session.run(cmd, **run_kwargs)
+        finally:
+            self._idle.put(session)
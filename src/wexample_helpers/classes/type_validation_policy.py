@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from wexample_helpers.enums.type_validation_mode import TypeValidationMode
+
+
+@dataclass(frozen=True)
+class TypeValidationPolicy:
+    """How deep and how wide type validation inspects dict, list and set values.
+
+    - mode FULL checks every item, FIRST checks the first `size` items,
+      SAMPLE checks `size` items picked at random.
+    - max_depth limits how many nested dict/list/set/tuple levels get their items
+      inspected, 0 only checks the outer container type.
+    """
+
+    max_depth: int | None = None
+    mode: TypeValidationMode = TypeValidationMode.FULL
+    size: int = 0
+
+    @classmethod
+    def bounded_depth(cls, max_depth: int) -> TypeValidationPolicy:
+        return cls(max_depth=max_depth)
+
+    @classmethod
+    def first(cls, size: int, max_depth: int | None = None) -> TypeValidationPolicy:
+        return cls(max_depth=max_depth, mode=TypeValidationMode.FIRST, size=size)
+
+    @classmethod
+    def full(cls) -> TypeValidationPolicy:
+        return cls()
+
+    @classmethod
+    def sample(cls, size: int, max_depth: int | None = None) -> TypeValidationPolicy:
+        return cls(max_depth=max_depth, mode=TypeValidationMode.SAMPLE, size=size)
+
+    def is_full(self) -> bool:
+        return self.mode is TypeValidationMode.FULL and self.max_depth is None
+
+    def is_sampled(self, length: int) -> bool:
+        """Tell if a container of the given length is only partially checked."""
+        return self.mode is not TypeValidationMode.FULL and length > self.size
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class TypeValidationReport:
+    """Outcome of validating many values against a single annotation."""
+
+    allowed_type: Any
+    checked: int = 0
+    # Index of each invalid value, with a short reason
+    failures: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def failed_indexes(self) -> list[int]:
+        return [index for index, _ in self.failures]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.failures
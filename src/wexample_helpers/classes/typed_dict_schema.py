@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class TypedDictSchema:
+    """Precompiled description of a TypedDict, built once per class for type validation."""
+
+    allowed_keys: frozenset[str]
+    annotations: dict[str, Any]
+    optional_keys: frozenset[str]
+    required_keys: frozenset[str]
+    total: bool
+    typed_dict_type: Any
+    # Compiled (key, boolean test) pairs, per validation policy
+    tests: dict[Any, tuple[tuple[str, Callable[[Any], bool]], ...]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # Compiled (key, validator) pairs, per validation policy
+    validators: dict[Any, tuple[tuple[str, Callable[[Any], None]], ...]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
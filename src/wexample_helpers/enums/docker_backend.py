@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class DockerBackend(Enum):
+    CLI = "cli"
+    ENGINE_API = "engine_api"
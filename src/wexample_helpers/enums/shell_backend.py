@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class ShellBackend(Enum):
+    POSIX_SPAWN = "posix_spawn"
+    SUBPROCESS = "subprocess"
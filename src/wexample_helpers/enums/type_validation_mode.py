@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class TypeValidationMode(Enum):
+    FIRST = "first"
+    FULL = "full"
+    SAMPLE = "sample"
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any
+
+from wexample_helpers.exception.undefined_exception import UndefinedException
+
+
+class DockerBatchException(UndefinedException):
+    """Raised once a batch of containers went through, for those that failed.
+
+    errors maps each failed container name to its own exception.
+    """
+
+    error_code: str = "DOCKER_BATCH_ERROR"
+
+    def __init__(self, action: str, errors: dict[str, Exception]) -> None:
+        self.action = action
+        self.errors = errors
+        super().__init__(message=None)
+
+    def _build_data(self) -> dict[str, Any]:
+        return {
+            "action": self.action,
+            "errors": {name: str(error) for name, error in self.errors.items()},
+        }
+
+    def _build_message(self) -> str:
+        details = "; ".join(
+            f"{name}: {str(error).strip() or type(error).__name__}"
+            for name, error in self.errors.items()
+        )
+        return f"Could not {self.action} {len(self.errors)} container(s): {details}"
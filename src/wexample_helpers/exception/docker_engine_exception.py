@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from wexample_helpers.exception.undefined_exception import UndefinedException
+
+
+class DockerEngineException(UndefinedException):
+    error_code: str = "DOCKER_ENGINE_ERROR"
+
+    def __init__(
+        self, method: str, path: str, status: int, message: str | None = None
+    ) -> None:
+        self.status = status
+        super().__init__(
+            f"Docker Engine API {method} {path} failed with {status}: {message or ''}",
+            data={"method": method, "path": path, "status": status},
+        )
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from wexample_helpers.exception.mixin.not_allowed_item_mixin import NotAllowedItemMixin
 from wexample_helpers.exception.undefined_exception import UndefinedException
 
+if TYPE_CHECKING:
+    from wexample_helpers.exception.model.not_allowed_item_data import (
+        NotAllowedItemData,
+    )
+
 
 class NotAllowedItemException(UndefinedException, NotAllowedItemMixin):
     """Base exception for cases where an item is not allowed or not provided.
@@ -23,29 +30,33 @@ class NotAllowedItemException(UndefinedException, NotAllowedItemMixin):
         previous: Exception | None = None,
         message: str | None = None,
     ) -> None:
-        from wexample_helpers.exception.model.not_allowed_item_data import (
-            NotAllowedItemData,
-        )
-
         if allowed_values is None:
             allowed_values = []
 
-        # Create structured data using TypedDict
-        data: NotAllowedItemData = {
-            "item_type": item_type,
-            "item_value": item_value,
-            "allowed_values": allowed_values,
-            "is_missing": item_value is None,
-        }
-
-        # Generate message using the mixin method
-        message = message or self.format_not_allowed_item_message(
-            item_type=item_type, item_value=item_value, allowed_values=allowed_values
-        )
+        self._item_type = item_type
+        self._item_value = item_value
+        self._allowed_values = allowed_values
 
+        # Data and message are generated on first access
         super().__init__(
             message=message,
-            data=data,
             cause=cause,
             previous=previous,
         )
+
+    def _build_data(self) -> NotAllowedItemData:
+        # Create structured data using TypedDict
+        return {
+            "item_type": self._item_type,
+            "item_value": self._item_value,
+            "allowed_values": self._allowed_values,
+            "is_missing": self._item_value is None,
+        }
+
+    def _build_message(self) -> str:
+        # Generate message using the mixin method
+        return self.format_not_allowed_item_message(
+            item_type=self._item_type,
+            item_value=self._item_value,
+            allowed_values=self._allowed_values,
+        )
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from wexample_helpers.exception.not_allowed_item_exception import (
     NotAllowedItemException,
 )
 
+if TYPE_CHECKING:
+    from wexample_helpers.exception.model.not_allowed_item_data import (
+        NotAllowedItemData,
+    )
+
 
 class NotAllowedVariableTypeException(NotAllowedItemException):
-    """A specific exception for bad variables types"""
+    """A specific exception for bad variables types
+
+    Type names and the truncated value are only computed when the message
+    or data is read, as many of these exceptions are caught and discarded.
+    """
 
     error_code: str = "NOT_ALLOWED_VARIABLE_TYPE"
 
@@ -21,26 +30,52 @@ class NotAllowedVariableTypeException(NotAllowedItemException):
         previous: Exception | None = None,
         message: str | None = None,
     ) -> None:
+        self._variable_type = variable_type
+        self._variable_value = variable_value
+        self._allowed_types = allowed_types or []
+        self._message_prefix = message
+        self._allowed_type_names: list[str] | None = None
+
+        super().__init__(
+            item_type="type",
+            cause=cause,
+            previous=previous,
+        )
+
+    @property
+    def variable_value_repr(self) -> str:
+        """Truncated representation of the invalid value, as shown in the message."""
         from wexample_helpers.helpers.string import string_truncate
+
+        return repr(string_truncate(str(self._variable_value), 1000))
+
+    def _build_data(self) -> NotAllowedItemData:
         from wexample_helpers.helpers.type import type_to_name
 
-        # Normalize variable_type for display
-        var_type_name = type_to_name(variable_type)
+        return self.get_not_allowed_item_data(
+            item_type="type",
+            item_value=type_to_name(self._variable_type),
+            allowed_values=self._get_allowed_type_names(),
+        )
 
-        # Normalize allowed types for message and payload
-        allowed_types = allowed_types or []
-        allowed_type_names = [type_to_name(t) for t in allowed_types]
+    def _build_message(self) -> str:
+        from wexample_helpers.helpers.type import type_to_name
+
+        # Normalize variable_type for display
+        var_type_name = type_to_name(self._variable_type)
+        allowed_type_names = self._get_allowed_type_names()
         types_str = ", ".join(allowed_type_names) if allowed_type_names else "<none>"
 
-        super().__init__(
-            item_type="type",
-            item_value=var_type_name,
-            allowed_values=allowed_type_names,
-            cause=cause,
-            previous=previous,
-            message=(
-                f"{message or ''}Invalid variable type '{var_type_name}' for value "
-                f"{string_truncate(str(variable_value), 1000)!r}. "
-                f"Allowed types: {types_str}."
-            ),
+        return (
+            f"{self._message_prefix or ''}Invalid variable type '{var_type_name}' for value "
+            f"{self.variable_value_repr}. "
+            f"Allowed types: {types_str}."
         )
+
+    def _get_allowed_type_names(self) -> list[str]:
+        from wexample_helpers.helpers.type import type_to_name
+
+        # Normalize allowed types for message and payload
+        if self._allowed_type_names is None:
+            self._allowed_type_names = [type_to_name(t) for t in self._allowed_types]
+        return self._allowed_type_names
@@ -12,6 +12,10 @@ class UndefinedException(Exception):
     - Structured error data using TypedDict
     - Error chaining (cause/previous)
     - Serialization support
+
+    Message, data and exception_id are built on first access, so exceptions
+    caught and discarded along the way stay cheap to raise; args still holds the
+    message, built when read.
     """
 
     # Class-level error code, should be overridden by subclasses
@@ -19,17 +23,21 @@ class UndefinedException(Exception):
 
     def __init__(
         self,
-        message: str,
+        message: str | None,
         data: dict[str, Any] | None = None,
         cause: Exception | None = None,
         previous: Exception | None = None,
     ) -> None:
-        self.message = message
-        self.data = data or {}
+        self._message = message
+        self._data = data
+        self._exception_id: str | None = None
         self.cause = cause
         self.previous = previous
-        self.exception_id = str(uuid.uuid4())
-        super().__init__(self.message)
+        # A None message is built by _build_message() when needed
+        if message is None:
+            super().__init__()
+        else:
+            super().__init__(message)
 
     def __repr__(self) -> str:
         """Return a detailed string representation of the exception."""
@@ -48,6 +56,49 @@ class UndefinedException(Exception):
         parts.append(")")
         return "\n".join(parts)
 
+    def __str__(self) -> str:
+        return self.message
+
+    @property
+    def args(self) -> tuple[Any, ...]:
+        # Like before messages were built lazily, the message comes first
+        args = BaseException.args.__get__(self)
+        return args if args else (self.message,)
+
+    @args.setter
+    def args(self, value: tuple[Any, ...]) -> None:
+        BaseException.args.__set__(self, value)
+
+    @property
+    def data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = self._build_data()
+        return self._data
+
+    @data.setter
+    def data(self, value: dict[str, Any]) -> None:
+        self._data = value
+
+    @property
+    def exception_id(self) -> str:
+        if self._exception_id is None:
+            self._exception_id = str(uuid.uuid4())
+        return self._exception_id
+
+    @exception_id.setter
+    def exception_id(self, value: str) -> None:
+        self._exception_id = value
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._build_message()
+        return self._message
+
+    @message.setter
+    def message(self, value: str) -> None:
+        self._message = value
+
     def to_dict(self) -> dict[str, Any]:
         """Convert exception to dictionary for serialization."""
         result = {
@@ -68,3 +119,9 @@ class UndefinedException(Exception):
         """Add additional data to the exception."""
         self.data.update(kwargs)
         return self
+
+    def _build_data(self) -> dict[str, Any]:
+        return {}
+
+    def _build_message(self) -> str:
+        return ""
@@ -1,27 +1,94 @@
 # docker_helpers.py
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from wexample_helpers.helpers.shell import shell_run
+from wexample_helpers.helpers.shell import (
+    shell_run,
+    shell_run_async,
+    shell_run_cache_invalidate,
+    shell_run_cached,
+)
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
 
-def docker_build_image(image_name: str, dockerfile_path: Path) -> None:
-    """Build a Docker image."""
-    build_context = dockerfile_path.parent
+    from wexample_helpers.classes.docker_container_state import DockerContainerState
+    from wexample_helpers.classes.docker_engine_client import DockerEngineClient
+    from wexample_helpers.classes.shell_result import ShellResult
+    from wexample_helpers.enums.docker_backend import DockerBackend
+
+# Image label holding the build context digest, see docker_build_image()
+DOCKER_BUILD_CONTEXT_LABEL = "com.wexample.build-context-digest"
+
+# Engine API client used by every helper once selected, None for the docker CLI
+_docker_engine_client: DockerEngineClient | None = None
+
+
+def docker_build_context_digest(
+    dockerfile_path: Path, cache_dir: Path | None = None
+) -> str:
+    """Return the digest of a Dockerfile and its build context, the Dockerfile folder.
+
+    Files excluded by the .dockerignore are left out. File hashes are kept in cache_dir
+    (under XDG_CACHE_HOME by default), so only files whose size or mtime changed are
+    read again, see DockerBuildContext.
+    """
+    from wexample_helpers.classes.docker_build_context import DockerBuildContext
+
+    return DockerBuildContext(dockerfile_path, cache_dir=cache_dir).digest()
+
+
+def docker_build_image(
+    image_name: str, dockerfile_path: Path, skip_unchanged: bool = True
+) -> bool:
+    """Build a Docker image, unless skip_unchanged and its build context did not change.
+
+    With skip_unchanged (default), the Dockerfile and context digest is computed, which
+    walks the context and updates an index under the cache directory, see
+    docker_build_context_digest(). The build is skipped when the image already carries
+    it as a label, otherwise the image is built with that label. Without it, the image
+    is always built, unlabelled, so the next skip_unchanged call builds it again.
+
+    Returns True when built and False when skipped; it used to return None, callers
+    ignoring the result are unaffected.
+    """
+    labels: dict[str, str] = {}
+    if skip_unchanged:
+        labels[DOCKER_BUILD_CONTEXT_LABEL] = docker_build_context_digest(
+            dockerfile_path
+        )
+        if docker_image_exists(image_name, labels=labels):
+            return False
 
     shell_run(
-        cmd=[
-            "docker",
-            "build",
-            "-t",
-            image_name,
-            "-f",
-            str(dockerfile_path),
-            str(build_context),
-        ],
-        inherit_stdio=True,
+        cmd=_docker_build_cmd(image_name, dockerfile_path, labels), inherit_stdio=True
     )
+    shell_run_cache_invalidate(["docker", "images"])
+    return True
+
+
+async def docker_build_image_async(
+    image_name: str, dockerfile_path: Path, skip_unchanged: bool = True
+) -> bool:
+    """Build a Docker image, see docker_build_image().
+
+    The build output is captured rather than printed, as concurrent builds would mix
+    it, and carried by the CalledProcessError on failure.
+    """
+    labels: dict[str, str] = {}
+    if skip_unchanged:
+        labels[DOCKER_BUILD_CONTEXT_LABEL] = await asyncio.to_thread(
+            docker_build_context_digest, dockerfile_path
+        )
+        if await docker_image_exists_async(image_name, labels=labels):
+            return False
+
+    await shell_run_async(_docker_build_cmd(image_name, dockerfile_path, labels))
+    shell_run_cache_invalidate(["docker", "images"])
+    return True
 
 
 def docker_build_name_from_path(
@@ -46,20 +113,99 @@ def docker_build_name_from_path(
     return f"{prefix}-{image_name}-{path_hash}"
 
 
-def docker_container_exists(container_name: str) -> bool:
-    """Check if a Docker container exists (running or stopped)."""
-    result = shell_run(
-        cmd=["docker", "ps", "-a", "-q", "-f", f"name={container_name}"], capture=True
+def docker_container_exists(
+    container_name: str,
+    cache_ttl: float | None = None,
+    snapshot: Mapping[str, DockerContainerState] | None = None,
+) -> bool:
+    """Check if a Docker container exists (running or stopped), by its exact name.
+
+    With cache_ttl, the answer is reused for that many seconds, or until a container is
+    run, started, stopped or removed through these helpers. With a snapshot from
+    docker_containers_snapshot(), the answer is read from it without querying Docker.
+    """
+    if snapshot is not None:
+        return container_name in snapshot
+    return _docker_container_listed(
+        container_name, include_stopped=True, cache_ttl=cache_ttl
     )
-    return bool(result.stdout.strip())
 
 
-def docker_container_is_running(container_name: str) -> bool:
-    """Check if a Docker container is currently running."""
-    result = shell_run(
-        cmd=["docker", "ps", "-q", "-f", f"name={container_name}"], capture=True
+async def docker_container_exists_async(
+    container_name: str,
+    cache_ttl: float | None = None,
+    snapshot: Mapping[str, DockerContainerState] | None = None,
+) -> bool:
+    """Check if a Docker container exists, see docker_container_exists()."""
+    if snapshot is not None:
+        return docker_container_exists(container_name, snapshot=snapshot)
+    return await asyncio.to_thread(docker_container_exists, container_name, cache_ttl)
+
+
+def docker_container_is_running(
+    container_name: str,
+    cache_ttl: float | None = None,
+    snapshot: Mapping[str, DockerContainerState] | None = None,
+) -> bool:
+    """Check if a Docker container is running, see docker_container_exists()."""
+    if snapshot is not None:
+        state = snapshot.get(container_name)
+        return state is not None and state.is_running
+    return _docker_container_listed(
+        container_name, include_stopped=False, cache_ttl=cache_ttl
     )
-    return bool(result.stdout.strip())
+
+
+async def docker_container_is_running_async(
+    container_name: str,
+    cache_ttl: float | None = None,
+    snapshot: Mapping[str, DockerContainerState] | None = None,
+) -> bool:
+    """Check if a Docker container is running, see docker_container_exists()."""
+    if snapshot is not None:
+        return docker_container_is_running(container_name, snapshot=snapshot)
+    return await asyncio.to_thread(
+        docker_container_is_running, container_name, cache_ttl
+    )
+
+
+def docker_containers_snapshot(
+    cache_ttl: float | None = None,
+) -> dict[str, DockerContainerState]:
+    """List every container at once, indexed by name, with its state, image and labels.
+
+    Costs a single docker ps, or Engine API request, to answer many existence or state
+    checks; see docker_container_exists() for cache_ttl.
+    """
+    import json
+
+    from wexample_helpers.classes.docker_container_state import DockerContainerState
+
+    engine = _docker_engine_client
+    if engine is not None:
+        containers = [
+            DockerContainerState.from_api(data)
+            for data in engine.request_json(
+                "GET", "/containers/json", query={"all": "1"}
+            )
+        ]
+    else:
+        result = _docker_query(
+            ["docker", "ps", "-a", "--no-trunc", "--format", "{{json .}}"], cache_ttl
+        )
+        containers = [
+            DockerContainerState.from_cli(json.loads(line))
+            for line in result.stdout.splitlines()
+            if line.strip()
+        ]
+    return {container.name: container for container in containers}
+
+
+async def docker_containers_snapshot_async(
+    cache_ttl: float | None = None,
+) -> dict[str, DockerContainerState]:
+    """List every container at once, see docker_containers_snapshot()."""
+    return await asyncio.to_thread(docker_containers_snapshot, cache_ttl)
 
 
 def docker_exec(
@@ -72,28 +218,136 @@ def docker_exec(
         command: Command to execute
         user: Optional user specification (e.g., "1000:1000" or "username")
     """
-    cmd = ["docker", "exec"]
-    if user:
-        cmd += ["--user", user]
-    cmd += [container_name] + command
+    cmd = _docker_exec_cmd(container_name, command, user)
+    if _docker_engine_client is not None:
+        return _docker_engine_exec(
+            _docker_engine_client, cmd, container_name, command, user
+        )
+
     result = shell_run(cmd=cmd, capture=True)
     return result.stdout
 
 
-def docker_image_exists(image_name: str) -> bool:
-    """Return True if the Docker image already exists."""
-    result = shell_run(cmd=["docker", "images", "-q", image_name], capture=True)
+async def docker_exec_async(
+    container_name: str, command: list[str], user: str | None = None
+) -> str:
+    """Execute a command inside a running Docker container, see docker_exec()."""
+    if _docker_engine_client is not None:
+        return await asyncio.to_thread(docker_exec, container_name, command, user)
+
+    result = await shell_run_async(_docker_exec_cmd(container_name, command, user))
+    return result.stdout
+
+
+def docker_exec_many(
+    container_name: str, commands: Iterable[list[str]], user: str | None = None
+) -> list[str]:
+    """Execute commands one after the other inside a running container, in one session.
+
+    A single docker exec starts a shell running every command, see DockerExecSession,
+    instead of one docker exec each. Returns their outputs; a failing command raises
+    CalledProcessError and the next ones are not run. Uses the docker CLI whatever the
+    backend.
+    """
+    from wexample_helpers.classes.docker_exec_session import DockerExecSession
+
+    with DockerExecSession(container_name, user=user) as session:
+        return [session.run(command).stdout for command in commands]
+
+
+def docker_image_exists(
+    image_name: str,
+    cache_ttl: float | None = None,
+    labels: Mapping[str, str] | None = None,
+) -> bool:
+    """Return True if the Docker image already exists, carrying these labels if any.
+
+    With cache_ttl, the answer is reused for that many seconds, or until an image is
+    built or removed through these helpers.
+    """
+    label_filters = [f"{key}={value}" for key, value in (labels or {}).items()]
+
+    engine = _docker_engine_client
+    if engine is not None:
+        filters = {"reference": [image_name]}
+        if label_filters:
+            filters["label"] = label_filters
+        return bool(
+            engine.request_json("GET", "/images/json", query={"filters": filters})
+        )
+
+    cmd = ["docker", "images", "-q"]
+    for label_filter in label_filters:
+        cmd += ["--filter", f"label={label_filter}"]
+    result = _docker_query([*cmd, image_name], cache_ttl)
     return bool(result.stdout.strip())
 
 
+async def docker_image_exists_async(
+    image_name: str,
+    cache_ttl: float | None = None,
+    labels: Mapping[str, str] | None = None,
+) -> bool:
+    """Return True if the Docker image already exists, see docker_image_exists()."""
+    return await asyncio.to_thread(docker_image_exists, image_name, cache_ttl, labels)
+
+
 def docker_remove_container(container_name: str) -> None:
     """Remove a Docker container."""
-    shell_run(cmd=["docker", "rm", container_name], inherit_stdio=True)
+    if _docker_engine_client is not None:
+        _docker_engine_client.request(
+            "DELETE", f"/containers/{_docker_quote(container_name)}"
+        )
+    else:
+        shell_run(cmd=["docker", "rm", container_name], inherit_stdio=True)
+    shell_run_cache_invalidate(["docker", "ps"])
+
+
+async def docker_remove_container_async(container_name: str) -> None:
+    """Remove a Docker container, see docker_remove_container()."""
+    await _docker_change_async(
+        docker_remove_container,
+        (container_name,),
+        ["docker", "rm", container_name],
+        ["docker", "ps"],
+    )
+
+
+def docker_remove_containers(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Remove containers concurrently, see docker_stop_containers_async()."""
+    asyncio.run(docker_remove_containers_async(container_names, max_concurrency))
+
+
+async def docker_remove_containers_async(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Remove containers concurrently, see docker_stop_containers_async()."""
+    await _docker_batch_async(
+        "remove", docker_remove_container_async, container_names, max_concurrency
+    )
 
 
 def docker_remove_image(image_name: str) -> None:
     """Remove a Docker image."""
-    shell_run(cmd=["docker", "rmi", image_name], inherit_stdio=True)
+    if _docker_engine_client is not None:
+        _docker_engine_client.request(
+            "DELETE", f"/images/{_docker_quote(image_name)}"
+        )
+    else:
+        shell_run(cmd=["docker", "rmi", image_name], inherit_stdio=True)
+    shell_run_cache_invalidate(["docker", "images"])
+
+
+async def docker_remove_image_async(image_name: str) -> None:
+    """Remove a Docker image, see docker_remove_image()."""
+    await _docker_change_async(
+        docker_remove_image,
+        (image_name,),
+        ["docker", "rmi", image_name],
+        ["docker", "images"],
+    )
 
 
 def docker_run_container(
@@ -110,6 +364,373 @@ def docker_run_container(
         volumes: Dictionary of host:container volume mappings
         user: Optional user specification (e.g., "1000:1000" or "username")
     """
+    if _docker_engine_client is not None:
+        _docker_engine_run(
+            _docker_engine_client, container_name, image_name, volumes, user
+        )
+    else:
+        shell_run(
+            _docker_run_cmd(container_name, image_name, volumes, user),
+            inherit_stdio=True,
+        )
+    shell_run_cache_invalidate(["docker", "ps"])
+
+
+async def docker_run_container_async(
+    container_name: str,
+    image_name: str,
+    volumes: dict[str, str],
+    user: str | None = None,
+) -> None:
+    """Run a new container, see docker_run_container()."""
+    await _docker_change_async(
+        docker_run_container,
+        (container_name, image_name, volumes, user),
+        _docker_run_cmd(container_name, image_name, volumes, user),
+        ["docker", "ps"],
+    )
+
+
+def docker_set_default_backend(
+    backend: DockerBackend | None,
+    socket_path: str | None = None,
+    timeout: float | None = None,
+) -> None:
+    """Choose how the helpers talk to Docker, None for the default docker CLI.
+
+    ENGINE_API sends HTTP requests to the daemon socket over kept-alive connections,
+    instead of starting a docker process per call. socket_path defaults to the
+    unix:// DOCKER_HOST, or /var/run/docker.sock. The functions signatures do not
+    change, but cache_ttl is ignored as requests are cheap, and images are still
+    built with the CLI. Errors are raised as DockerEngineException, except a failing
+    docker_exec command which raises CalledProcessError like with the CLI. timeout
+    limits each read from the socket, by default requests wait like the CLI does.
+    """
+    import os
+
+    from wexample_helpers.enums.docker_backend import DockerBackend
+
+    global _docker_engine_client
+
+    if _docker_engine_client is not None:
+        _docker_engine_client.close()
+        _docker_engine_client = None
+
+    if backend is not DockerBackend.ENGINE_API:
+        return
+
+    from wexample_helpers.classes.docker_engine_client import DockerEngineClient
+
+    if socket_path is None:
+        docker_host = os.environ.get("DOCKER_HOST", "unix:///var/run/docker.sock")
+        if not docker_host.startswith("unix://"):
+            raise ValueError(
+                f"The Docker Engine API backend needs a unix socket, not {docker_host}"
+            )
+        socket_path = docker_host[len("unix://") :]
+    _docker_engine_client = DockerEngineClient(socket_path, timeout=timeout)
+
+
+def docker_start_container(container_name: str) -> None:
+    """Start an existing stopped container."""
+    if _docker_engine_client is not None:
+        _docker_engine_client.request(
+            "POST", f"/containers/{_docker_quote(container_name)}/start"
+        )
+    else:
+        shell_run(cmd=["docker", "start", container_name], inherit_stdio=True)
+    shell_run_cache_invalidate(["docker", "ps"])
+
+
+async def docker_start_container_async(container_name: str) -> None:
+    """Start an existing stopped container, see docker_start_container()."""
+    await _docker_change_async(
+        docker_start_container,
+        (container_name,),
+        ["docker", "start", container_name],
+        ["docker", "ps"],
+    )
+
+
+def docker_start_containers(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Start containers concurrently, see docker_stop_containers_async()."""
+    asyncio.run(docker_start_containers_async(container_names, max_concurrency))
+
+
+async def docker_start_containers_async(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Start containers concurrently, see docker_stop_containers_async()."""
+    await _docker_batch_async(
+        "start", docker_start_container_async, container_names, max_concurrency
+    )
+
+
+def docker_stop_container(container_name: str) -> None:
+    """Stop a running Docker container."""
+    if _docker_engine_client is not None:
+        _docker_engine_client.request(
+            "POST", f"/containers/{_docker_quote(container_name)}/stop"
+        )
+    else:
+        shell_run(cmd=["docker", "stop", container_name], inherit_stdio=True)
+    shell_run_cache_invalidate(["docker", "ps"])
+
+
+async def docker_stop_container_async(container_name: str) -> None:
+    """Stop a running Docker container, see docker_stop_container()."""
+    await _docker_change_async(
+        docker_stop_container,
+        (container_name,),
+        ["docker", "stop", container_name],
+        ["docker", "ps"],
+    )
+
+
+def docker_stop_containers(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Stop containers concurrently, see docker_stop_containers_async()."""
+    asyncio.run(docker_stop_containers_async(container_names, max_concurrency))
+
+
+async def docker_stop_containers_async(
+    container_names: Iterable[str], max_concurrency: int = 8
+) -> None:
+    """Stop containers concurrently, at most max_concurrency at once.
+
+    Stop grace periods then overlap instead of adding up. Every container is attempted
+    even when some fail; failures are raised afterwards together as a
+    DockerBatchException mapping each container name to its error.
+    """
+    await _docker_batch_async(
+        "stop", docker_stop_container_async, container_names, max_concurrency
+    )
+
+
+async def _docker_batch_async(
+    action: str,
+    helper: Callable[[str], Any],
+    container_names: Iterable[str],
+    max_concurrency: int,
+) -> None:
+    from wexample_helpers.exception.docker_batch_exception import (
+        DockerBatchException,
+    )
+
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _apply(container_name: str) -> None:
+        async with semaphore:
+            await helper(container_name)
+
+    names = list(dict.fromkeys(container_names))
+    outcomes = await asyncio.gather(
+        *(_apply(name) for name in names), return_exceptions=True
+    )
+
+    errors = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            errors[name] = outcome
+        elif isinstance(outcome, BaseException):
+            # Cancellation or interruption is not a container failure
+            raise outcome
+    if errors:
+        raise DockerBatchException(action, errors)
+
+
+def _docker_build_cmd(
+    image_name: str, dockerfile_path: Path, labels: Mapping[str, str]
+) -> list[str]:
+    cmd = ["docker", "build", "-t", image_name, "-f", str(dockerfile_path)]
+    for key, value in labels.items():
+        cmd += ["--label", f"{key}={value}"]
+    return [*cmd, str(dockerfile_path.parent)]
+
+
+async def _docker_change_async(
+    helper: Callable[..., Any],
+    args: tuple[Any, ...],
+    cmd: list[str],
+    changed: list[str],
+) -> None:
+    # The Engine API client blocks, its requests run in a worker thread
+    if _docker_engine_client is not None:
+        await asyncio.to_thread(helper, *args)
+        return
+
+    await shell_run_async(cmd)
+    shell_run_cache_invalidate(changed)
+
+
+def _docker_container_listed(
+    container_name: str, *, include_stopped: bool, cache_ttl: float | None
+) -> bool:
+    # The name filter matches substrings, so the names found are compared as well
+    engine = _docker_engine_client
+    if engine is not None:
+        query = {"filters": {"name": [container_name]}}
+        if include_stopped:
+            query["all"] = "1"
+        return any(
+            f"/{container_name}" in data["Names"]
+            for data in engine.request_json("GET", "/containers/json", query=query)
+        )
+
+    result = _docker_query(
+        [
+            "docker",
+            "ps",
+            *(["-a"] if include_stopped else []),
+            "-f",
+            f"name={container_name}",
+            "--format",
+            "{{.Names}}",
+        ],
+        cache_ttl,
+    )
+    return any(
+        container_name in line.split(",") for line in result.stdout.splitlines()
+    )
+
+
+def _docker_engine_exec(
+    engine: DockerEngineClient,
+    cmd: list[str],
+    container_name: str,
+    command: list[str],
+    user: str | None,
+) -> str:
+    import struct
+    import subprocess
+
+    exec_id = engine.request_json(
+        "POST",
+        f"/containers/{_docker_quote(container_name)}/exec",
+        body={
+            "AttachStderr": True,
+            "AttachStdout": True,
+            "Cmd": command,
+            "User": user or "",
+        },
+    )["Id"]
+    _, data = engine.request(
+        "POST", f"/exec/{exec_id}/start", body={"Detach": False, "Tty": False}
+    )
+
+    # Without a TTY, output is multiplexed in frames: stream, 3 padding bytes, size
+    outputs = {1: bytearray(), 2: bytearray()}
+    view = memoryview(data)
+    position = 0
+    while position + 8 <= len(view):
+        stream, size = struct.unpack_from(">BxxxI", view, position)
+        position += 8
+        outputs.get(stream, bytearray()).extend(view[position : position + size])
+        position += size
+    stdout = outputs[1].decode(errors="replace")
+
+    returncode = engine.request_json("GET", f"/exec/{exec_id}/json")["ExitCode"]
+    if returncode:
+        raise subprocess.CalledProcessError(
+            returncode,
+            cmd,
+            output=stdout,
+            stderr=outputs[2].decode(errors="replace"),
+        )
+    return stdout
+
+
+def _docker_engine_run(
+    engine: DockerEngineClient,
+    container_name: str,
+    image_name: str,
+    volumes: dict[str, str],
+    user: str | None,
+) -> None:
+    import json
+
+    from wexample_helpers.exception.docker_engine_exception import (
+        DockerEngineException,
+    )
+
+    body = {
+        "HostConfig": {
+            "Binds": [f"{host}:{container}" for host, container in volumes.items()]
+        },
+        "Image": image_name,
+        "User": user or "",
+    }
+    query = {"name": container_name}
+    try:
+        created = engine.request_json(
+            "POST", "/containers/create", query=query, body=body
+        )
+    except DockerEngineException as e:
+        if e.status != 404:
+            raise
+        # Pulled first like docker run does, progress and errors are streamed as JSON;
+        # without a tag, every tag of the repository would be pulled
+        repository, tag = _docker_image_reference(image_name)
+        _, data = engine.request(
+            "POST", "/images/create", query={"fromImage": repository, "tag": tag}
+        )
+        for line in data.splitlines():
+            error = json.loads(line).get("error") if line.strip() else None
+            if error:
+                raise DockerEngineException("POST", "/images/create", 500, error)
+        created = engine.request_json(
+            "POST", "/containers/create", query=query, body=body
+        )
+
+    engine.request("POST", f"/containers/{created['Id']}/start")
+
+
+def _docker_exec_cmd(
+    container_name: str, command: list[str], user: str | None
+) -> list[str]:
+    cmd = ["docker", "exec"]
+    if user:
+        cmd += ["--user", user]
+    return cmd + [container_name] + command
+
+
+def _docker_image_reference(image_name: str) -> tuple[str, str]:
+    """Split an image reference into its repository and tag or digest, latest by default."""
+    if "@" in image_name:
+        repository, digest = image_name.split("@", 1)
+        return repository, digest
+
+    # A colon before the last slash separates a registry host from its port
+    registry, slash, name = image_name.rpartition("/")
+    name, colon, tag = name.partition(":")
+    return f"{registry}{slash}{name}", tag if colon else "latest"
+
+
+def _docker_quote(name: str) -> str:
+    """Quote a container or image name as an API path segment."""
+    from urllib.parse import quote
+
+    return quote(name, safe="")
+
+
+def _docker_query(cmd: list[str], cache_ttl: float | None) -> ShellResult:
+    if cache_ttl is None:
+        return shell_run(cmd=cmd, capture=True)
+    return shell_run_cached(cmd, ttl=cache_ttl, env_keys=("DOCKER_HOST",))
+
+
+def _docker_run_cmd(
+    container_name: str,
+    image_name: str,
+    volumes: dict[str, str],
+    user: str | None,
+) -> list[str]:
     cmd = [
         "docker",
         "run",
@@ -125,15 +746,4 @@ def docker_run_container(
         cmd += ["-v", f"{host}:{container}"]
 
     cmd.append(image_name)
-
-    shell_run(cmd, inherit_stdio=True)
-
-
-def docker_start_container(container_name: str) -> None:
-    """Start an existing stopped container."""
-    shell_run(cmd=["docker", "start", container_name], inherit_stdio=True)
-
-
-def docker_stop_container(container_name: str) -> None:
-    """Stop a running Docker container."""
-    shell_run(cmd=["docker", "stop", container_name], inherit_stdio=True)
+    return cmd
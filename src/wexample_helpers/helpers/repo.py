@@ -1,24 +1,37 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from wexample_helpers.const.types import PathOrString
 
+if TYPE_CHECKING:
+    from wexample_helpers.classes.shell_result import ShellResult
+
 STATE_FILE = Path(".last_git_state")
 
 
-def repo_get_state(cwd: PathOrString | None = None) -> str:
+def repo_get_state(
+    cwd: PathOrString | None = None, cache_ttl: float | None = None
+) -> str:
     """Return a unique hash representing the current git state (HEAD + changes).
 
     Args:
         cwd: Optional path to the git repository. If None, uses current directory.
+        cache_ttl: Reuse the git outputs for that many seconds, through shell_run_cached.
+            Call shell_run_cache_invalidate(["git"]) after changing the repository.
     """
-    from wexample_helpers.helpers.shell import shell_run
+    from wexample_helpers.helpers.shell import shell_run, shell_run_cached
+
+    def _git(cmd: list[str]) -> ShellResult:
+        if cache_ttl is None:
+            return shell_run(cmd, cwd=cwd)
+        return shell_run_cached(cmd, cwd=cwd, ttl=cache_ttl)
 
-    head_result = shell_run(["git", "rev-parse", "HEAD"], cwd=cwd)
+    head_result = _git(["git", "rev-parse", "HEAD"])
     head_hash = head_result.stdout.strip() if head_result.stdout else ""
 
-    diff_result = shell_run(["git", "diff"], cwd=cwd)
+    diff_result = _git(["git", "diff"])
     diff_hash = diff_result.stdout if diff_result.stdout else ""
 
     return f"{head_hash}-{hash(diff_hash)}"
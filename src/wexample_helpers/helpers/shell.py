@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import shlex
 import shutil
+import signal
 import subprocess
 import sys
+import threading
 import time
 from collections.abc import Mapping, Sequence
 from typing import TYPE_CHECKING, Any
@@ -12,10 +15,281 @@ from typing import TYPE_CHECKING, Any
 from wexample_helpers.const.types import PathOrString
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Mapping, Sequence
+    from collections.abc import AsyncIterator, Callable, Iterable, Mapping, Sequence
 
+    from typing import IO, BinaryIO
+
+    from wexample_helpers.classes.shell_command import ShellCommand
+    from wexample_helpers.classes.shell_output_capture import ShellOutputCapture
     from wexample_helpers.classes.shell_result import ShellResult
+    from wexample_helpers.classes.shell_result_cache import ShellResultCache
     from wexample_helpers.const.types import PathOrString
+    from wexample_helpers.enums.shell_backend import ShellBackend
+    from wexample_helpers.enums.shell_stream_framing import ShellStreamFraming
+
+# Seconds a timed out or cancelled command is given to exit after SIGTERM, before SIGKILL
+SHELL_KILL_GRACE = 2.0
+# Bytes read from a pipe at once when capturing output
+SHELL_READ_CHUNK_SIZE = 256 * 1024
+
+# Asynchronous runs and synchronous reaps in progress and started so far, guarded by
+# the lock, to tell when an asynchronous run usage may include other children
+_shell_reaping = 0
+_shell_reaping_lock = threading.Lock()
+_shell_reaping_started = 0
+# Backend used by shell_run when none is given
+_shell_default_backend: ShellBackend | None = None
+# Results of shell_run_cached calls not given a cache
+_shell_result_cache: ShellResultCache | None = None
+
+
+def shell_pipeline(
+    cmds: Sequence[str | Sequence[str]],
+    *,
+    cwd: PathOrString | None = None,
+    env: Mapping[str, str] | None = None,
+    check: bool = True,
+    text: bool = True,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+    timeout: float | None = None,
+    stdout: int | IO[Any] | None = None,
+) -> list[ShellResult]:
+    """Run commands piped into each other, like cmd1 | cmd2 | cmd3 without a shell.
+
+    Stages are connected by OS pipes, so intermediate data never goes through Python.
+    Returns one ShellResult per stage, each with its stderr and resource usage; only the
+    last one has a stdout, unless stdout is given a file or descriptor receiving it
+    directly.
+
+    With check=True, CalledProcessError is raised for the last failing stage, like the
+    shell pipefail option, except for stages stopped by SIGPIPE because a later one
+    exited without reading everything (e.g. head).
+    """
+    argvs = [shell_split_cmd(cmd) for cmd in cmds]
+    if not argvs:
+        raise ValueError("A pipeline needs at least one command")
+
+    procs: list[subprocess.Popen] = []
+    starts: list[float] = []
+    try:
+        for index, argv in enumerate(argvs):
+            last = index == len(argvs) - 1
+            starts.append(time.monotonic())
+            procs.append(
+                subprocess.Popen(
+                    argv,
+                    stdin=procs[-1].stdout if procs else None,
+                    stdout=stdout if last and stdout is not None else subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=cwd,
+                    env=env,
+                )
+            )
+            if index:
+                # Only the next stage reads the pipe, so that SIGPIPE reaches writers
+                procs[-2].stdout.close()
+    except BaseException:
+        for proc in procs:
+            _shell_kill(proc.pid)
+            proc.returncode = -signal.SIGKILL
+            _shell_pipeline_close(proc)
+        raise
+
+    deadline = None if timeout is None else starts[0] + timeout
+    captured = procs[-1].stdout is not None
+    fds = [proc.stderr.fileno() for proc in procs]
+    if captured:
+        fds.append(procs[-1].stdout.fileno())
+
+    outcomes: list[tuple[int, Any, float]] = []
+    try:
+        # Only the last stage output goes with a TimeoutExpired, like its command
+        outputs = _shell_read_fds(
+            fds,
+            deadline=deadline,
+            used_cmd=argvs[-1],
+            timeout=timeout,
+            stdout_fd=fds[-1] if captured else None,
+            stderr_fd=fds[len(procs) - 1],
+        )
+        for proc, argv in zip(procs, argvs):
+            try:
+                status, rusage = _shell_reap(
+                    proc.pid, deadline=deadline, used_cmd=argv, timeout=timeout
+                )
+            except BaseException:
+                # Killed and reaped by _shell_reap, its pid may already be reused
+                proc.returncode = -signal.SIGKILL
+                raise
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            outcomes.append((proc.returncode, rusage, time.monotonic()))
+    except BaseException:
+        for proc in procs[len(outcomes) :]:
+            if proc.returncode is None:
+                _shell_kill(proc.pid)
+                proc.returncode = -signal.SIGKILL
+        raise
+    finally:
+        for proc in procs:
+            _shell_pipeline_close(proc)
+
+    results = [
+        _shell_result(
+            argv,
+            outputs=[
+                outputs[-1] if captured and index == len(argvs) - 1 else None,
+                outputs[index],
+            ],
+            returncode=returncode,
+            rusage=rusage,
+            check=False,
+            cwd=cwd,
+            text=text,
+            encoding=encoding,
+            errors=errors,
+            start=start,
+            end=end,
+        )
+        for index, (argv, start, (returncode, rusage, end)) in enumerate(
+            zip(argvs, starts, outcomes)
+        )
+    ]
+    if check:
+        _shell_pipeline_check(results)
+    return results
+
+
+async def shell_pipeline_async(
+    cmds: Sequence[str | Sequence[str]],
+    *,
+    cwd: PathOrString | None = None,
+    env: Mapping[str, str] | None = None,
+    check: bool = True,
+    text: bool = True,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+    timeout: float | None = None,
+    stdout: int | IO[Any] | None = None,
+    on_stdout: Callable[[str], Any] | Callable[[memoryview], Any] | None = None,
+    framing: ShellStreamFraming | None = None,
+    kill_grace: float = SHELL_KILL_GRACE,
+) -> list[ShellResult]:
+    """Run commands piped into each other with asyncio, see shell_pipeline.
+
+    - on_stdout: Receives the last stage output as it comes, framed and decoded like
+      with shell_stream_async; the last result then has no stdout.
+    - Each stage runs in its own session. On timeout or cancellation every stage process
+      group is stopped, SIGTERM then SIGKILL after kill_grace seconds.
+
+    Stage results have no resource usage, the event loop reaps the processes.
+    """
+    from wexample_helpers.enums.shell_stream_framing import ShellStreamFraming
+
+    argvs = [shell_split_cmd(cmd) for cmd in cmds]
+    if not argvs:
+        raise ValueError("A pipeline needs at least one command")
+
+    # Tracked to tell overlapping shell_run_async calls, its usage is not kept
+    usage_state = _shell_async_usage_begin()
+    try:
+        procs: list[asyncio.subprocess.Process] = []
+        starts: list[float] = []
+        read_fd: int | None = None
+        try:
+            for index, argv in enumerate(argvs):
+                last = index == len(argvs) - 1
+                next_read_fd, write_fd = (None, None) if last else os.pipe()
+                if last:
+                    stage_stdout = (
+                        stdout if stdout is not None else asyncio.subprocess.PIPE
+                    )
+                else:
+                    stage_stdout = write_fd
+                try:
+                    starts.append(time.monotonic())
+                    procs.append(
+                        await asyncio.create_subprocess_exec(
+                            *argv,
+                            stdin=read_fd,
+                            stdout=stage_stdout,
+                            stderr=asyncio.subprocess.PIPE,
+                            cwd=cwd,
+                            env=dict(env) if env is not None else None,
+                            start_new_session=True,
+                        )
+                    )
+                finally:
+                    # Children hold their own copies, only the next stage read end
+                    # is kept
+                    for fd in (read_fd, write_fd):
+                        if fd is not None:
+                            os.close(fd)
+                    read_fd = next_read_fd
+        except BaseException:
+            if read_fd is not None:
+                os.close(read_fd)
+            await asyncio.gather(
+                *(_shell_terminate(proc, kill_grace, group=True) for proc in procs)
+            )
+            raise
+
+        last_stdout = procs[-1].stdout
+        if on_stdout is not None and last_stdout is not None:
+            stdout_read = _shell_pump_frames(
+                last_stdout,
+                on_stdout,
+                framing=framing or ShellStreamFraming.LINE,
+                encoding=encoding if text else None,
+                errors=errors,
+            )
+        else:
+            stdout_read = _shell_read_stream(last_stdout, None)
+
+        try:
+            # A single deadline covers every stage
+            stdout_output, *stages = await asyncio.wait_for(
+                asyncio.gather(
+                    stdout_read,
+                    *(_shell_pipeline_wait(proc) for proc in procs),
+                ),
+                timeout,
+            )
+        except BaseException:
+            await asyncio.gather(
+                *(_shell_terminate(proc, kill_grace, group=True) for proc in procs)
+            )
+            raise
+    finally:
+        _shell_async_usage_end(usage_state)
+
+    last_output = stdout_output[0] if isinstance(stdout_output, tuple) else None
+    results = [
+        _shell_result(
+            argv,
+            outputs=[
+                bytes(last_output)
+                if index == len(argvs) - 1 and last_output is not None
+                else None,
+                bytes(stderr_output),
+            ],
+            returncode=returncode,
+            rusage=None,
+            check=False,
+            cwd=cwd,
+            text=text,
+            encoding=encoding,
+            errors=errors,
+            start=start,
+            end=end,
+        )
+        for index, (argv, start, (stderr_output, returncode, end)) in enumerate(
+            zip(argvs, starts, stages)
+        )
+    ]
+    if check:
+        _shell_pipeline_check(results)
+    return results
 
 
 def shell_run(
@@ -33,6 +307,9 @@ def shell_run(
     inherit_stdio: bool = False,
     sudo_user: str | None = None,
     elevate: bool = False,
+    tail_bytes: int | None = None,
+    spool_bytes: int | None = None,
+    backend: ShellBackend | None = None,
 ) -> ShellResult:
     """Run a command synchronously with a modern, explicit API.
 
@@ -46,10 +323,16 @@ def shell_run(
     - shell: Execute through the shell (be explicit; default False).
     - inherit_stdio: If True, inherit parent's stdio (overrides capture).
     - sudo_user/elevate: Optional sudo prefixing; never enabled by default.
-    """
-    from pathlib import Path
+    - tail_bytes/spool_bytes: Bounded memory capture, see ShellOutputCapture. Output is
+      then read with the result stdout_tail, stdout_path and iter_stdout_lines().
+    - backend: How to start the process, defaults to shell_set_default_backend() choice.
+      POSIX_SPAWN uses os.posix_spawnp, whose cost does not depend on the parent memory
+      size; it falls back to subprocess for cwd or bounded capture, which it cannot do.
 
-    from wexample_helpers.classes.shell_result import ShellResult
+    The result usage holds the CPU time and peak memory of the command, see
+    ShellResourceUsage; it is None where os.wait4 is not available, e.g. on Windows.
+    """
+    from wexample_helpers.enums.shell_backend import ShellBackend
 
     used_cmd: str | list[str]
 
@@ -84,38 +367,84 @@ def shell_run(
             stdout = None
             stderr = None
 
-    start = time.monotonic()
-    try:
-        completed = subprocess.run(
-            used_cmd,  # type: ignore[arg-type]
-            stdout=stdout,
-            stderr=stderr,
-            text=text if capture else False,
-            encoding=encoding if (capture and text) else None,
-            errors=errors if (capture and text) else None,
-            timeout=timeout,
+    if capture and not inherit_stdio and (
+        tail_bytes is not None or spool_bytes is not None
+    ):
+        return _shell_run_bounded(
+            used_cmd,
+            popen_kwargs=popen_kwargs,
             check=check,
-            **popen_kwargs,
+            encoding=encoding,
+            errors=errors,
+            timeout=timeout,
+            spool_bytes=spool_bytes,
+            tail_bytes=tail_bytes,
         )
-        end = time.monotonic()
-        return ShellResult(
-            args=used_cmd,
-            returncode=completed.returncode,
-            stdout=completed.stdout if capture else None,
-            stderr=completed.stderr if capture else None,
-            cwd=Path(cwd) if cwd else None,
-            duration=end - start,
-            start_time=start,
-            end_time=end,
+
+    if (
+        (backend or _shell_default_backend) is ShellBackend.POSIX_SPAWN
+        and cwd is None
+        and hasattr(os, "posix_spawnp")
+    ):
+        return _shell_run_spawn(
+            used_cmd,
+            env=env,
+            shell=shell,
+            capture=capture and not inherit_stdio,
+            check=check,
+            text=text,
+            encoding=encoding,
+            errors=errors,
+            timeout=timeout,
         )
-    except subprocess.CalledProcessError as e:
-        end = time.monotonic()
-        # Re-raise to keep default semantics when check=True
-        e.stdout = getattr(e, "stdout", None)
-        e.stderr = getattr(e, "stderr", None)
-        # Attach timing for debugging/observability
-        e.duration = end - start  # type: ignore[attr-defined]
+
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        used_cmd,  # type: ignore[arg-type]
+        stdout=stdout,
+        stderr=stderr,
+        **popen_kwargs,
+    )
+    streams = [stream for stream in (proc.stdout, proc.stderr) if stream is not None]
+    try:
+        if hasattr(os, "wait4"):
+            # Reaped with os.wait4 to read the child resource usage
+            outputs, status, rusage = _shell_collect(
+                proc.pid,
+                [stream.fileno() for stream in streams],
+                deadline=None if timeout is None else start + timeout,
+                used_cmd=used_cmd,
+                timeout=timeout,
+            )
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            # No resource usage without os.wait4, e.g. on Windows
+            outputs, rusage = _shell_communicate(proc, timeout), None
+    except BaseException as e:
+        if proc.returncode is None:
+            # Killed and reaped by _shell_collect
+            proc.returncode = -signal.SIGKILL
+        if isinstance(e, subprocess.TimeoutExpired) and text:
+            _shell_timeout_text(e, encoding, errors)
         raise
+    finally:
+        for stream in streams:
+            stream.close()
+    end = time.monotonic()
+
+    return _shell_result(
+        used_cmd,
+        outputs=outputs if capture else None,
+        returncode=proc.returncode,
+        rusage=rusage,
+        check=check,
+        cwd=cwd,
+        text=text,
+        encoding=encoding,
+        errors=errors,
+        start=start,
+        end=end,
+    )
 
 
 async def shell_run_async(
@@ -133,10 +462,26 @@ async def shell_run_async(
     inherit_stdio: bool = False,
     sudo_user: str | None = None,
     elevate: bool = False,
+    max_output_bytes: int | None = None,
+    kill_grace: float = SHELL_KILL_GRACE,
+    new_session: bool | None = None,
 ) -> ShellResult:
     """Run a command asynchronously using asyncio and return a ShellResult.
 
     If check=True and the return code is non-zero, raises CalledProcessError.
+    With max_output_bytes, only the first bytes of stdout and stderr are kept each, the rest
+    is read and dropped so the child is never blocked, and the result is flagged truncated.
+
+    With new_session, the command runs in its own session: on timeout or cancellation its
+    whole process group receives SIGTERM, then SIGKILL after kill_grace seconds, so that
+    no grandchild keeps running or holding the pipes. Only the command itself is signaled
+    otherwise. A new session has no controlling terminal, so prompts reading /dev/tty
+    (sudo or ssh passwords) fail; by default it is used unless inherit_stdio, sudo_user or
+    elevate is set, pass new_session=False for other interactive commands.
+
+    The result usage is None when other runs of these helpers, from any thread, reaped
+    children meanwhile, as their usage could not be told apart, or where os.wait4 is not
+    available. Children reaped meanwhile by other code are still counted in it.
     """
     from pathlib import Path
 
@@ -163,41 +508,50 @@ async def shell_run_async(
         stdout_opt = asyncio.subprocess.PIPE if capture else None
         stderr_opt = asyncio.subprocess.PIPE if capture else None
 
-    start = time.monotonic()
-
-    if shell:
-        proc = await asyncio.create_subprocess_shell(
-            used_cmd if isinstance(used_cmd, str) else " ".join(used_cmd),
-            stdout=stdout_opt,
-            stderr=stderr_opt,
-            cwd=cwd,
-            env=dict(env) if env is not None else None,
-        )
-    else:
-        assert isinstance(used_cmd, list)
-        proc = await asyncio.create_subprocess_exec(
-            *used_cmd,
-            stdout=stdout_opt,
-            stderr=stderr_opt,
-            cwd=cwd,
-            env=dict(env) if env is not None else None,
+    if new_session is None:
+        new_session = _shell_new_session(
+            inherit_stdio=inherit_stdio, sudo_user=sudo_user, elevate=elevate
         )
-
+    start = time.monotonic()
+    usage_state = _shell_async_usage_begin()
     try:
-        if timeout is not None:
-            await asyncio.wait_for(proc.wait(), timeout)
-            rc = proc.returncode
-            out: bytes | None = None
-            err: bytes | None = None
-            if capture:
-                out, err = await proc.communicate()
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                used_cmd if isinstance(used_cmd, str) else " ".join(used_cmd),
+                stdout=stdout_opt,
+                stderr=stderr_opt,
+                cwd=cwd,
+                env=dict(env) if env is not None else None,
+                start_new_session=new_session,
+            )
         else:
-            out, err = await proc.communicate() if capture else (None, None)
-            rc = proc.returncode
-    except TimeoutError:
-        proc.kill()
-        await proc.wait()
-        raise
+            assert isinstance(used_cmd, list)
+            proc = await asyncio.create_subprocess_exec(
+                *used_cmd,
+                stdout=stdout_opt,
+                stderr=stderr_opt,
+                cwd=cwd,
+                env=dict(env) if env is not None else None,
+                start_new_session=new_session,
+            )
+
+        # Pipes are drained while waiting, so a child filling them never blocks
+        reads = [
+            _shell_read_stream(stream, max_output_bytes)
+            for stream in (proc.stdout, proc.stderr)
+        ]
+        try:
+            # A single deadline covers both streams and the exit
+            (out, out_truncated), (err, err_truncated), rc = await asyncio.wait_for(
+                asyncio.gather(*reads, proc.wait()), timeout
+            )
+        except BaseException:
+            # Do not leave the process tree running when timed out, cancelled or
+            # interrupted
+            await _shell_terminate(proc, kill_grace, group=new_session)
+            raise
+    finally:
+        usage = _shell_async_usage_end(usage_state)
 
     end = time.monotonic()
 
@@ -210,7 +564,7 @@ async def shell_run_async(
 
     if check and rc != 0:
         exc = subprocess.CalledProcessError(
-            rc, used_cmd, stdout=stdout_text, stderr=stderr_text
+            rc, used_cmd, output=stdout_text, stderr=stderr_text
         )
         raise exc
 
@@ -219,13 +573,222 @@ async def shell_run_async(
         returncode=rc,
         stdout=stdout_text,
         stderr=stderr_text,
-        cwd=Path(cwd),
+        cwd=Path(cwd) if cwd else None,
         duration=end - start,
         start_time=start,
         end_time=end,
+        truncated=out_truncated or err_truncated,
+        usage=usage,
     )
 
 
+def shell_run_cache_clear() -> None:
+    """Drop every result stored by shell_run_cached in the default cache."""
+    _shell_result_cache_get().clear()
+
+
+def shell_run_cache_info() -> dict[str, Any]:
+    """Return the hit/miss statistics of the default shell_run_cached cache."""
+    return _shell_result_cache_get().info()
+
+
+def shell_run_cache_invalidate(prefix: Sequence[str] = ()) -> int:
+    """Drop cached results of commands starting with these arguments, e.g. ["docker", "ps"]."""
+    return _shell_result_cache_get().invalidate(prefix)
+
+
+def shell_run_cached(
+    cmd: str | Sequence[str],
+    *,
+    ttl: float = 60.0,
+    env_keys: Sequence[str] = (),
+    cache: ShellResultCache | None = None,
+    cwd: PathOrString | None = None,
+    env: Mapping[str, str] | None = None,
+    check: bool = True,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+    timeout: float | None = None,
+    shell: bool = False,
+) -> ShellResult:
+    """Run a read-only command through shell_run, reusing its result for ttl seconds.
+
+    Results are keyed by the command, the resolved cwd and the values of the env_keys
+    variables (from env, or the process environment), which must list every variable
+    the output depends on. Commands changing what a cached command reports should be
+    followed by shell_run_cache_invalidate(). Only captured text output is cached, and
+    every call gets its own copy of the result.
+    """
+    import json
+    import os
+    from pathlib import Path
+
+    cache = cache or _shell_result_cache_get()
+    source_env = os.environ if env is None else env
+    key = json.dumps(
+        [
+            # The same arguments as shell_run, however they are given
+            (cmd if isinstance(cmd, str) else shlex.join(cmd))
+            if shell
+            else shell_split_cmd(cmd),
+            shell,
+            # The process cwd may change between calls
+            str(Path(cwd or ".").resolve()),
+            [[name, source_env.get(name)] for name in sorted(env_keys)],
+            encoding,
+            errors,
+        ]
+    )
+
+    result = cache.get(key)
+    if result is None:
+        result = shell_run(
+            cmd,
+            cwd=cwd,
+            env=env,
+            check=check,
+            encoding=encoding,
+            errors=errors,
+            timeout=timeout,
+            shell=shell,
+        )
+        cache.set(key, result, ttl)
+    elif check and result.returncode != 0:
+        # Stored by a call that did not check it
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, output=result.stdout, stderr=result.stderr
+        )
+
+    return result
+
+
+def shell_run_many(
+    cmds: Iterable[str | Sequence[str] | ShellCommand],
+    *,
+    max_concurrency: int = 8,
+    timeout: float | None = None,
+    fail_fast: bool = False,
+    cwd: PathOrString | None = None,
+    env: Mapping[str, str] | None = None,
+    shell: bool = False,
+    text: bool = True,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+) -> list[ShellResult]:
+    """Run commands concurrently and return their results in completion order.
+
+    Synchronous wrapper of shell_run_many_async, see it for the parameters.
+    """
+
+    async def _collect() -> list[ShellResult]:
+        return [
+            result
+            async for result in shell_run_many_async(
+                cmds,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                fail_fast=fail_fast,
+                cwd=cwd,
+                env=env,
+                shell=shell,
+                text=text,
+                encoding=encoding,
+                errors=errors,
+            )
+        ]
+
+    return asyncio.run(_collect())
+
+
+async def shell_run_many_async(
+    cmds: Iterable[str | Sequence[str] | ShellCommand],
+    *,
+    max_concurrency: int = 8,
+    timeout: float | None = None,
+    fail_fast: bool = False,
+    cwd: PathOrString | None = None,
+    env: Mapping[str, str] | None = None,
+    shell: bool = False,
+    text: bool = True,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+) -> AsyncIterator[ShellResult]:
+    """Run commands with at most max_concurrency at once, yielding results as they complete.
+
+    Parameters:
+    - cmds: Commands as accepted by shell_run_async, or ShellCommand items to override
+      cwd/env per command. Consumed lazily, so generators are fine.
+    - timeout: Seconds before timing out, per command.
+    - fail_fast: Raise CalledProcessError at the first non-zero exit; otherwise failed
+      commands are yielded like the others and their returncode must be checked.
+    - cwd/env/shell/text/encoding/errors: Defaults for every command, see shell_run_async.
+
+    Errors raised by a command (timeout, missing executable) are propagated. Commands not
+    finished yet are cancelled when the iteration stops, for any reason.
+    """
+    from itertools import islice
+
+    from wexample_helpers.classes.shell_command import ShellCommand
+
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    async def _run(command: str | Sequence[str] | ShellCommand) -> ShellResult:
+        if not isinstance(command, ShellCommand):
+            command = ShellCommand(cmd=command)  # type: ignore[arg-type]
+        return await shell_run_async(
+            command.cmd,
+            cwd=command.cwd if command.cwd is not None else cwd,  # type: ignore[arg-type]
+            env=command.env if command.env is not None else env,
+            check=False,
+            text=text,
+            encoding=encoding,
+            errors=errors,
+            timeout=timeout,
+            shell=shell,
+        )
+
+    commands = iter(cmds)
+    # Only max_concurrency tasks exist at once, next commands are started as slots free up
+    pending = {asyncio.ensure_future(_run(c)) for c in islice(commands, max_concurrency)}
+
+    done: set[asyncio.Future] = set()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            while done:
+                task = done.pop()
+                result = task.result()
+                if fail_fast and result.returncode != 0:
+                    raise subprocess.CalledProcessError(
+                        result.returncode,
+                        result.args,
+                        output=result.stdout,
+                        stderr=result.stderr,
+                    )
+                yield result
+
+            pending |= {
+                asyncio.ensure_future(_run(c))
+                for c in islice(commands, max_concurrency - len(pending))
+            }
+    finally:
+        for task in pending:
+            task.cancel()
+        # Finished tasks not consumed yet are retrieved too, so no error goes unnoticed
+        if pending or done:
+            await asyncio.gather(*pending, *done, return_exceptions=True)
+
+
+def shell_set_default_backend(backend: ShellBackend | None) -> None:
+    """Choose the backend used by shell_run calls not giving one, None for subprocess."""
+    global _shell_default_backend
+
+    _shell_default_backend = backend
+
+
 def shell_split_cmd(cmd: str | Sequence[str]) -> list[str]:
     """Split a command if provided as a string using shlex; pass lists through."""
 
@@ -239,8 +802,8 @@ async def shell_stream_async(
     *,
     cwd: str | None = None,
     env: Mapping[str, str] | None = None,
-    on_stdout: Callable[[str], Any] | None = None,
-    on_stderr: Callable[[str], Any] | None = None,
+    on_stdout: Callable[[str], Any] | Callable[[memoryview], Any] | None = None,
+    on_stderr: Callable[[str], Any] | Callable[[memoryview], Any] | None = None,
     text: bool = True,
     encoding: str = "utf-8",
     errors: str = "replace",
@@ -248,12 +811,28 @@ async def shell_stream_async(
     sudo_user: str | None = None,
     elevate: bool = False,
     check: bool = True,
+    framing: ShellStreamFraming | None = None,
+    kill_grace: float = SHELL_KILL_GRACE,
+    new_session: bool | None = None,
 ) -> int:
     """Run a command asynchronously and stream stdout/stderr line-by-line.
 
-    - If callbacks are None, default to writing to sys.stdout/sys.stderr.
+    - If callbacks are None, default to writing to sys.stdout/sys.stderr, one write and
+      flush per chunk read rather than per line.
+    - text=False hands memoryview frames to callbacks, without decoding anything. The
+      default writers then use the binary buffer of sys.stdout/sys.stderr, and decode
+      only for replacement streams without one.
+    - framing LINE (default) calls back once per line, whatever its length, CHUNK once
+      per chunk read from the pipe.
     - Returns the process return code (and raises if check=True and rc!=0).
+    - new_session: Run the command in its own session, so that when cancelled, e.g. by
+      asyncio.wait_for(), its process group is stopped like with shell_run_async and
+      kill_grace. By default unless sudo_user or elevate is set, as a new session cannot
+      prompt for a password on the terminal.
     """
+    from wexample_helpers.enums.shell_stream_framing import ShellStreamFraming
+
+    framing = framing or ShellStreamFraming.LINE
     used_cmd: str | list[str]
 
     if shell:
@@ -267,68 +846,130 @@ async def shell_stream_async(
     used_cmd = _shell_apply_sudo(
         used_cmd, sudo_user=sudo_user, elevate=elevate, shell=shell
     )
-
-    if shell:
-        proc = await asyncio.create_subprocess_shell(
-            used_cmd if isinstance(used_cmd, str) else " ".join(used_cmd),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=dict(env) if env is not None else None,
-        )
-    else:
-        assert isinstance(used_cmd, list)
-        proc = await asyncio.create_subprocess_exec(
-            *used_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=dict(env) if env is not None else None,
+    if new_session is None:
+        new_session = _shell_new_session(
+            inherit_stdio=False, sudo_user=sudo_user, elevate=elevate
         )
 
-    async def _pump(
-        stream: asyncio.StreamReader, writer: Callable[[str], Any], name: str
-    ) -> None:
-        while True:
-            line = await stream.readline()
-            if not line:
-                break
-            if text:
-                s = line.decode(encoding, errors)
-            else:
-                # Represent raw bytes in a safe way if text=False
-                s = line.decode(encoding, errors)
-            writer(s)
+    def _terminal_writer(sink: Any) -> Callable[[Any], None]:
+        import codecs
 
-    def _stdout_writer(s: str) -> None:
-        if on_stdout is not None:
-            on_stdout(s)
-        else:
-            sys.stdout.write(s)
-            sys.stdout.flush()
+        # Bytes go to the binary buffer under text streams, when there is one
+        target = sink if text else getattr(sink, "buffer", None)
+        # Replacement streams without one, e.g. StringIO, get them decoded
+        decoder = None
+        if target is None:
+            target = sink
+            decoder = codecs.getincrementaldecoder(encoding)(errors)
 
-    def _stderr_writer(s: str) -> None:
-        if on_stderr is not None:
-            on_stderr(s)
+        def _write(frame: Any) -> None:
+            target.write(frame if decoder is None else decoder.decode(frame))
+            target.flush()
+
+        return _write
+
+    # Tracked to tell overlapping shell_run_async calls, its usage is not kept
+    usage_state = _shell_async_usage_begin()
+    try:
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                used_cmd if isinstance(used_cmd, str) else " ".join(used_cmd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=dict(env) if env is not None else None,
+                start_new_session=new_session,
+            )
         else:
-            sys.stderr.write(s)
-            sys.stderr.flush()
+            assert isinstance(used_cmd, list)
+            proc = await asyncio.create_subprocess_exec(
+                *used_cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=dict(env) if env is not None else None,
+                start_new_session=new_session,
+            )
 
-    tasks = []
-    if proc.stdout is not None:
-        tasks.append(asyncio.create_task(_pump(proc.stdout, _stdout_writer, "stdout")))
-    if proc.stderr is not None:
-        tasks.append(asyncio.create_task(_pump(proc.stderr, _stderr_writer, "stderr")))
+        tasks = []
+        for stream, callback, sink in (
+            (proc.stdout, on_stdout, sys.stdout),
+            (proc.stderr, on_stderr, sys.stderr),
+        ):
+            if stream is None:
+                continue
+            # The terminal does not need lines, write whole chunks to save syscalls
+            tasks.append(
+                asyncio.create_task(
+                    _shell_pump_frames(
+                        stream,
+                        callback if callback is not None else _terminal_writer(sink),
+                        framing=(
+                            framing
+                            if callback is not None
+                            else ShellStreamFraming.CHUNK
+                        ),
+                        encoding=encoding if text else None,
+                        errors=errors,
+                    )
+                )
+            )
 
-    rc = await proc.wait()
-    if tasks:
-        await asyncio.gather(*tasks)
+        try:
+            rc = await proc.wait()
+            if tasks:
+                await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await _shell_terminate(proc, kill_grace, group=new_session)
+            raise
+    finally:
+        _shell_async_usage_end(usage_state)
 
     if check and rc != 0:
         raise subprocess.CalledProcessError(rc, used_cmd)
     return rc
 
 
+def shell_usage_summary(results: Iterable[ShellResult]) -> dict[str, Any]:
+    """Sum the duration, CPU time and context switches of a batch of results.
+
+    max_rss_bytes is the highest peak of a single command, None when unknown. Results
+    without usage, e.g. loaded from a disk cache or from overlapping asynchronous runs,
+    only count in commands and duration; measured tells how many had one.
+    """
+    summary: dict[str, Any] = {
+        "commands": 0,
+        "cpu_system": 0.0,
+        "cpu_user": 0.0,
+        "duration": 0.0,
+        "involuntary_context_switches": 0,
+        "max_rss_bytes": None,
+        "measured": 0,
+        "voluntary_context_switches": 0,
+    }
+
+    for result in results:
+        summary["commands"] += 1
+        summary["duration"] += result.duration
+        usage = result.usage
+        if usage is None:
+            continue
+
+        summary["measured"] += 1
+        summary["cpu_system"] += usage.cpu_system
+        summary["cpu_user"] += usage.cpu_user
+        summary["involuntary_context_switches"] += usage.involuntary_context_switches
+        summary["voluntary_context_switches"] += usage.voluntary_context_switches
+        if usage.max_rss_bytes is not None:
+            summary["max_rss_bytes"] = max(
+                summary["max_rss_bytes"] or 0, usage.max_rss_bytes
+            )
+
+    return summary
+
+
 def shell_which(cmd: str) -> str | None:
     """Return full path to executable or None if not found (shutil.which wrapper)."""
     return shutil.which(cmd)
@@ -363,3 +1004,626 @@ def _shell_apply_sudo(
         elif elevate:
             prefix += ["--"]
         return prefix + (shell_split_cmd(cmd) if isinstance(cmd, str) else list(cmd))
+
+
+def _shell_async_usage_begin() -> tuple[Any, tuple[int, bool]] | None:
+    """Register an asynchronous run, returning what _shell_async_usage_end needs.
+
+    The event loop reaps the children, so only the RUSAGE_CHILDREN difference around a
+    run is available. None when it cannot be measured, without os.wait4.
+    """
+    if not hasattr(os, "wait4"):
+        return None
+    import resource
+
+    token = _shell_reaping_begin()
+    return resource.getrusage(resource.RUSAGE_CHILDREN), token
+
+
+def _shell_async_usage_end(
+    state: tuple[Any, tuple[int, bool]] | None,
+) -> Any | None:
+    """Unregister an asynchronous run, returning its usage unless others overlapped it."""
+    if state is None:
+        return None
+    import resource
+
+    from wexample_helpers.classes.shell_resource_usage import ShellResourceUsage
+
+    rusage_before, token = state
+    rusage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if not _shell_reaping_end(token):
+        return None
+    return ShellResourceUsage.from_rusage_delta(rusage_before, rusage_after)
+
+
+def _shell_collect(
+    pid: int,
+    fds: list[int],
+    *,
+    deadline: float | None,
+    used_cmd: str | list[str],
+    timeout: float | None,
+) -> tuple[list[bytes], int, Any]:
+    """Read the fds until they close, then reap the process with its resource usage.
+
+    fds are the stdout and stderr pipes, or none when not captured. The process is
+    killed on timeout or interruption, TimeoutExpired carrying the output read so far.
+    """
+    stdout_fd, stderr_fd = fds if fds else (None, None)
+    try:
+        outputs = _shell_read_fds(
+            fds,
+            deadline=deadline,
+            used_cmd=used_cmd,
+            timeout=timeout,
+            stdout_fd=stdout_fd,
+            stderr_fd=stderr_fd,
+        )
+    except BaseException:
+        _shell_kill(pid)
+        raise
+
+    # Output is closed, the child is usually gone or about to be
+    status, rusage = _shell_reap(
+        pid, deadline=deadline, used_cmd=used_cmd, timeout=timeout
+    )
+    return outputs, status, rusage
+
+
+def _shell_communicate(proc: subprocess.Popen, timeout: float | None) -> list[Any]:
+    """Read the output with Popen.communicate, where os.wait4 is not available.
+
+    The process is killed on timeout or interruption, like subprocess.run does.
+    """
+    try:
+        return list(proc.communicate(timeout=timeout))
+    except subprocess.TimeoutExpired as e:
+        proc.kill()
+        e.output, e.stderr = proc.communicate()
+        raise
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+
+
+def _shell_kill(pid: int) -> None:
+    """Kill a child process and reap it, unless already gone."""
+    token = _shell_reaping_begin()
+    try:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    except (ChildProcessError, ProcessLookupError):
+        pass
+    finally:
+        _shell_reaping_end(token)
+
+
+def _shell_new_session(
+    *, inherit_stdio: bool, sudo_user: str | None, elevate: bool
+) -> bool:
+    """Tell if an asynchronous command runs in its own session by default.
+
+    A new session detaches it from the terminal, where it could not prompt.
+    """
+    return not (inherit_stdio or sudo_user or elevate)
+
+
+def _shell_pipeline_check(results: list[ShellResult]) -> None:
+    """Raise CalledProcessError for the last failing stage of a pipeline, if any."""
+    for index in reversed(range(len(results))):
+        result = results[index]
+        if result.returncode == 0 or (
+            index < len(results) - 1 and result.returncode == -signal.SIGPIPE
+        ):
+            continue
+        e = subprocess.CalledProcessError(
+            result.returncode, result.args, output=result.stdout, stderr=result.stderr
+        )
+        e.duration = result.duration  # type: ignore[attr-defined]
+        raise e
+
+
+def _shell_pipeline_close(proc: subprocess.Popen) -> None:
+    for stream in (proc.stdout, proc.stderr):
+        if stream is not None:
+            stream.close()
+
+
+async def _shell_pipeline_wait(
+    proc: asyncio.subprocess.Process,
+) -> tuple[bytearray, int, float]:
+    """Read a stage stderr and wait for it, returning the output, return code and end."""
+    stderr_output, _ = await _shell_read_stream(proc.stderr, None)
+    returncode = await proc.wait()
+    return stderr_output, returncode, time.monotonic()
+
+
+def _shell_pump(stream: BinaryIO, capture: ShellOutputCapture) -> None:
+    with stream:
+        for chunk in iter(lambda: stream.read1(SHELL_READ_CHUNK_SIZE), b""):
+            capture.write(chunk)
+    capture.finish()
+
+
+async def _shell_pump_frames(
+    stream: asyncio.StreamReader,
+    writer: Callable[[Any], Any],
+    *,
+    framing: ShellStreamFraming,
+    encoding: str | None,
+    errors: str,
+) -> None:
+    """Read a stream by chunks and hand them to the writer as lines or chunks.
+
+    Frames are memoryviews over the chunks read, or str decoded incrementally when an
+    encoding is given, so multibyte characters split across chunks are kept whole.
+    """
+    import codecs
+
+    from wexample_helpers.enums.shell_stream_framing import ShellStreamFraming
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors) if encoding else None
+
+    def _emit(frame: memoryview) -> None:
+        if decoder is None:
+            writer(frame)
+            return
+        decoded = decoder.decode(frame)
+        if decoded:
+            writer(decoded)
+
+    # Start of the current line, when it spans several chunks
+    pending: list[bytes] = []
+    while True:
+        chunk = await stream.read(SHELL_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        if framing is ShellStreamFraming.CHUNK:
+            _emit(memoryview(chunk))
+            continue
+
+        view = memoryview(chunk)
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            if pending:
+                pending.append(chunk[start : end + 1])
+                _emit(memoryview(b"".join(pending)))
+                pending = []
+            else:
+                _emit(view[start : end + 1])
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            pending.append(chunk[start:])
+
+    if pending:
+        _emit(memoryview(b"".join(pending)))
+    if decoder is not None:
+        rest = decoder.decode(b"", final=True)
+        if rest:
+            writer(rest)
+
+
+async def _shell_read_stream(
+    stream: asyncio.StreamReader | None, max_bytes: int | None
+) -> tuple[bytearray | None, bool]:
+    """Read a stream until EOF, keeping at most max_bytes; tell if anything was dropped."""
+    if stream is None:
+        return None, False
+
+    buffer = bytearray()
+    truncated = False
+    while True:
+        chunk = await stream.read(SHELL_READ_CHUNK_SIZE)
+        if not chunk:
+            return buffer, truncated
+        if max_bytes is None:
+            buffer += chunk
+            continue
+        room = max_bytes - len(buffer)
+        if len(chunk) > room:
+            truncated = True
+            chunk = chunk[:room]
+        if chunk:
+            buffer += chunk
+
+
+def _shell_read_fds(
+    fds: list[int],
+    *,
+    deadline: float | None,
+    used_cmd: str | list[str],
+    timeout: float | None,
+    stdout_fd: int | None = None,
+    stderr_fd: int | None = None,
+) -> list[bytes]:
+    """Read the fds at once until they all close, TimeoutExpired past the deadline.
+
+    The TimeoutExpired carries the output read so far from stdout_fd and stderr_fd.
+    """
+    import selectors
+
+    buffers = {fd: bytearray() for fd in fds}
+    with selectors.DefaultSelector() as selector:
+        for fd in buffers:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(
+                    used_cmd,  # type: ignore[arg-type]
+                    timeout,  # type: ignore[arg-type]
+                    output=None if stdout_fd is None else bytes(buffers[stdout_fd]),
+                    stderr=None if stderr_fd is None else bytes(buffers[stderr_fd]),
+                )
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, SHELL_READ_CHUNK_SIZE)
+                if chunk:
+                    buffers[key.fd] += chunk
+                else:
+                    selector.unregister(key.fd)
+
+    return [bytes(buffer) for buffer in buffers.values()]
+
+
+def _shell_reap(
+    pid: int,
+    *,
+    deadline: float | None,
+    used_cmd: str | list[str],
+    timeout: float | None,
+) -> tuple[int, Any]:
+    """Wait for a child with os.wait4, returning its wait status and resource usage.
+
+    The process is killed on timeout or interruption.
+    """
+    token = _shell_reaping_begin()
+    try:
+        if deadline is None:
+            _, status, rusage = os.wait4(pid, 0)
+            return status, rusage
+
+        delay = 0.0005
+        while True:
+            waited_pid, status, rusage = os.wait4(pid, os.WNOHANG)
+            if waited_pid:
+                return status, rusage
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(used_cmd, timeout)  # type: ignore[arg-type]
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+    except BaseException:
+        _shell_kill(pid)
+        raise
+    finally:
+        _shell_reaping_end(token)
+
+
+def _shell_reaping_begin() -> tuple[int, bool]:
+    """Register a run or reap adding to RUSAGE_CHILDREN, see _shell_reaping_end."""
+    global _shell_reaping, _shell_reaping_started
+
+    with _shell_reaping_lock:
+        overlapped = _shell_reaping > 0
+        _shell_reaping += 1
+        _shell_reaping_started += 1
+        return _shell_reaping_started, overlapped
+
+
+def _shell_reaping_end(token: tuple[int, bool]) -> bool:
+    """Unregister a run or reap, telling if no other one ran meanwhile."""
+    global _shell_reaping
+
+    started, overlapped = token
+    with _shell_reaping_lock:
+        _shell_reaping -= 1
+        return not overlapped and _shell_reaping_started == started
+
+
+def _shell_result(
+    used_cmd: str | list[str],
+    *,
+    outputs: list[bytes | None] | None,
+    returncode: int,
+    rusage: Any | None,
+    check: bool,
+    cwd: PathOrString | None,
+    text: bool,
+    encoding: str,
+    errors: str,
+    start: float,
+    end: float,
+) -> ShellResult:
+    """Build the ShellResult of a reaped command, raising CalledProcessError if checked."""
+    from pathlib import Path
+
+    from wexample_helpers.classes.shell_resource_usage import ShellResourceUsage
+    from wexample_helpers.classes.shell_result import ShellResult
+
+    stdout: bytes | str | None = None
+    stderr: bytes | str | None = None
+    if outputs:
+        stdout, stderr = (
+            _shell_text(output, encoding, errors)
+            if text and output is not None
+            else output
+            for output in outputs
+        )
+
+    if check and returncode != 0:
+        e = subprocess.CalledProcessError(
+            returncode, used_cmd, output=stdout, stderr=stderr
+        )
+        # Attach timing for debugging/observability
+        e.duration = end - start  # type: ignore[attr-defined]
+        raise e
+
+    return ShellResult(
+        args=used_cmd,
+        returncode=returncode,
+        stdout=stdout,  # type: ignore[arg-type]
+        stderr=stderr,  # type: ignore[arg-type]
+        cwd=Path(cwd) if cwd else None,
+        duration=end - start,
+        start_time=start,
+        end_time=end,
+        usage=ShellResourceUsage.from_rusage(rusage) if rusage is not None else None,
+    )
+
+
+def _shell_result_cache_get() -> ShellResultCache:
+    global _shell_result_cache
+
+    if _shell_result_cache is None:
+        from wexample_helpers.classes.shell_result_cache import ShellResultCache
+
+        _shell_result_cache = ShellResultCache()
+    return _shell_result_cache
+
+
+def _shell_run_bounded(
+    used_cmd: str | list[str],
+    *,
+    popen_kwargs: dict[str, Any],
+    check: bool,
+    encoding: str,
+    errors: str,
+    timeout: float | None,
+    spool_bytes: int | None,
+    tail_bytes: int | None,
+) -> ShellResult:
+    """Run a command feeding its output to ShellOutputCapture sinks instead of strings."""
+    import threading
+    from pathlib import Path
+
+    from wexample_helpers.classes.shell_output_capture import ShellOutputCapture
+    from wexample_helpers.classes.shell_resource_usage import ShellResourceUsage
+    from wexample_helpers.classes.shell_result import ShellResult
+
+    captures = [
+        ShellOutputCapture(
+            encoding=encoding,
+            errors=errors,
+            spool_bytes=spool_bytes,
+            tail_bytes=tail_bytes,
+        )
+        for _ in range(2)
+    ]
+
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        used_cmd,  # type: ignore[arg-type]
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **popen_kwargs,
+    )
+    # Both pipes are drained at once so that neither one fills up and blocks the child
+    readers = [
+        threading.Thread(target=_shell_pump, args=(stream, capture), daemon=True)
+        for stream, capture in zip((proc.stdout, proc.stderr), captures)
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        if hasattr(os, "wait4"):
+            status, rusage = _shell_reap(
+                proc.pid,
+                deadline=None if timeout is None else start + timeout,
+                used_cmd=used_cmd,
+                timeout=timeout,
+            )
+            returncode = proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            # No resource usage without os.wait4, e.g. on Windows
+            rusage = None
+            returncode = proc.wait(timeout)
+        for reader in readers:
+            reader.join(
+                None if timeout is None else max(timeout - (time.monotonic() - start), 0)
+            )
+            if reader.is_alive():
+                raise subprocess.TimeoutExpired(used_cmd, timeout)  # type: ignore[arg-type]
+    except BaseException:
+        if proc.returncode is None and hasattr(os, "wait4"):
+            # Killed and reaped by _shell_reap
+            proc.returncode = -signal.SIGKILL
+        elif proc.returncode is None:
+            proc.kill()
+            proc.wait()
+        # Pipes may still be held open by grandchildren, do not wait for them too long
+        for reader in readers:
+            reader.join(1)
+        for capture in captures:
+            capture.close()
+        raise
+
+    end = time.monotonic()
+    stdout_capture, stderr_capture = captures
+
+    if check and returncode != 0:
+        e = subprocess.CalledProcessError(
+            returncode,
+            used_cmd,
+            output=stdout_capture.tail_text(),
+            stderr=stderr_capture.tail_text(),
+        )
+        e.duration = end - start  # type: ignore[attr-defined]
+        for capture in captures:
+            capture.close()
+        raise e
+
+    cwd = popen_kwargs.get("cwd")
+    return ShellResult(
+        args=used_cmd,
+        returncode=returncode,
+        stdout=None,
+        stderr=None,
+        cwd=Path(cwd) if cwd else None,
+        duration=end - start,
+        start_time=start,
+        end_time=end,
+        stderr_capture=stderr_capture,
+        stdout_capture=stdout_capture,
+        truncated=stdout_capture.truncated or stderr_capture.truncated,
+        usage=ShellResourceUsage.from_rusage(rusage) if rusage is not None else None,
+    )
+
+
+def _shell_run_spawn(
+    used_cmd: str | list[str],
+    *,
+    env: Mapping[str, str] | None,
+    shell: bool,
+    capture: bool,
+    check: bool,
+    text: bool,
+    encoding: str,
+    errors: str,
+    timeout: float | None,
+) -> ShellResult:
+    """Run a command started with os.posix_spawnp, reading both pipes until it exits."""
+    argv = ["/bin/sh", "-c", used_cmd] if shell else list(used_cmd)
+    read_fds = []
+    file_actions = []
+    child_fds = []
+    if capture:
+        for target in (1, 2):
+            read_fd, write_fd = os.pipe()
+            read_fds.append(read_fd)
+            # Pipe ends are not inheritable, only the duplicated one reaches the child
+            file_actions.append((os.POSIX_SPAWN_DUP2, write_fd, target))
+            child_fds.append(write_fd)
+
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    try:
+        pid = os.posix_spawnp(
+            argv[0],
+            argv,
+            os.environ if env is None else env,
+            file_actions=file_actions,
+            # Python ignores these, restore them like subprocess restore_signals does
+            setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+        )
+    except BaseException:
+        for fd in [*read_fds, *child_fds]:
+            os.close(fd)
+        raise
+    for fd in child_fds:
+        os.close(fd)
+
+    try:
+        outputs, status, rusage = _shell_collect(
+            pid,
+            read_fds,
+            deadline=deadline,
+            used_cmd=used_cmd,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired as e:
+        if text:
+            _shell_timeout_text(e, encoding, errors)
+        raise
+    finally:
+        for fd in read_fds:
+            os.close(fd)
+    end = time.monotonic()
+
+    return _shell_result(
+        used_cmd,
+        outputs=outputs if capture else None,
+        returncode=os.waitstatus_to_exitcode(status),
+        rusage=rusage,
+        check=check,
+        cwd=None,
+        text=text,
+        encoding=encoding,
+        errors=errors,
+        start=start,
+        end=end,
+    )
+
+
+def _shell_signal(pid: int, sig: int, *, group: bool) -> bool:
+    """Send a signal to a process or its process group, tell if it still existed."""
+    try:
+        if group:
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, sig)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+async def _shell_terminate(
+    proc: asyncio.subprocess.Process, grace: float, *, group: bool
+) -> None:
+    """Stop a process, with its whole process group if it leads one.
+
+    SIGTERM first, then SIGKILL once the process exited or outlived grace seconds, or at
+    once when interrupted meanwhile. Pipes are closed even if a process that left the group still
+    holds them open.
+    """
+    # Without a group, an exited process pid may already belong to another one
+    running = group or proc.returncode is None
+    try:
+        delay = 0.001
+        deadline = time.monotonic() + grace
+        if running:
+            _shell_signal(proc.pid, signal.SIGTERM, group=group)
+        # Processes left in the group once the command exited are not waited for
+        while proc.returncode is None and time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+    finally:
+        if running:
+            _shell_signal(proc.pid, signal.SIGKILL, group=group)
+        try:
+            await proc.wait()
+        finally:
+            # No public API closes the pipes of an asyncio process
+            transport = getattr(proc, "_transport", None)
+            if transport is not None:
+                transport.close()
+
+
+def _shell_text(data: bytes, encoding: str, errors: str) -> str:
+    """Decode output translating newlines, like subprocess does in text mode."""
+    return data.decode(encoding, errors).replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _shell_timeout_text(
+    e: subprocess.TimeoutExpired, encoding: str, errors: str
+) -> None:
+    """Decode the output carried by a TimeoutExpired, for text mode callers."""
+    if e.output is not None:
+        e.output = _shell_text(e.output, encoding, errors)
+    if e.stderr is not None:
+        e.stderr = _shell_text(e.stderr, encoding, errors)
@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from itertools import islice
+from types import UnionType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Literal,
     Union,
     cast,
     get_args,
@@ -11,13 +19,434 @@ from typing import (
 )
 
 if TYPE_CHECKING:
-    from types import UnionType
+    from wexample_helpers.classes.type_validation_policy import TypeValidationPolicy
+    from wexample_helpers.classes.type_validation_report import TypeValidationReport
+    from wexample_helpers.classes.typed_dict_schema import TypedDictSchema
+
+# Maximum number of compiled validation plans kept in memory
+TYPE_VALIDATOR_CACHE_SIZE: int = 1024
+# Maximum number of validated values remembered by memoized validations
+TYPE_VALIDATOR_MEMO_SIZE: int = 4096
+
+# Immutable classes whose instances can be remembered as valid, subclasses are excluded
+_TYPE_MEMO_SCALARS: frozenset[type] = frozenset(
+    {bool, bytes, complex, float, int, str, type(None)}
+)
+# Scalar classes whose instances may be equal across classes, like True == 1 == 1.0
+_TYPE_MEMO_NUMBERS: frozenset[type] = frozenset({bool, complex, float, int})
+
+# Resolved hints and parameters of callables, dropped with the function
+_type_callables: weakref.WeakKeyDictionary[Any, dict[str, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+# Location of the last failed container item, per thread
+_type_failure = threading.local()
+# Compiled plans by annotation identity and policy
+_type_plans_by_id: dict[tuple[int, Any], tuple[Any, Callable[[Any], None]]] = {}
+# Values known to be valid by annotation, in least recently used order
+_type_memo: OrderedDict[tuple[Any, ...], None] = OrderedDict()
+_type_memo_by_id: dict[tuple[int, int, Any], tuple[Any, Any]] = {}
+_type_memo_lock = threading.Lock()
+_type_memo_stats = {"hits": 0, "misses": 0}
+
+
+def type_callable_is_compatible(value: Any, allowed_type: Any) -> bool:
+    """Tell if a callable can stand for a Callable[[...], R] annotation.
+
+    Unlike validation, which only compares the annotated return type, this also checks that
+    the callable accepts the annotated number of positional arguments and requires no
+    keyword-only one. Hints and parameters are resolved once per function.
+    """
+    if not callable(value):
+        return False
+
+    args = get_args(allowed_type)
+    if not args:
+        return True
+
+    parameters, return_type = args
+    if parameters is not Ellipsis:
+        summary = _type_callable_parameters(value)
+        if summary is not None:
+            positional, required, var_positional, required_keywords = summary
+            count = len(parameters)
+            if required_keywords or count < required:
+                return False
+            if count > positional and not var_positional:
+                return False
+
+    return _type_callable_return_is_valid(value, return_type)
+
+
+def type_compile_validator(
+    allowed_type: Any, policy: TypeValidationPolicy | None = None
+) -> Callable[[Any], None]:
+    """Return a cached checker raising like type_validate_or_fail for the given annotation.
+
+    The annotation is analysed once: every branch of the validation ladder that only depends
+    on the annotation is resolved at compile time, leaving a small closure tree that only
+    inspects the value. Plans are kept in a bounded LRU keyed by the annotation and policy.
+    """
+    # Hashing wide annotations costs more than the check itself, try identity first
+    key = (id(allowed_type), policy)
+    entry = _type_plans_by_id.get(key)
+    if entry is not None and entry[0] is allowed_type:
+        return entry[1]
+
+    normalized_policy = _type_policy_normalize(policy)
+    try:
+        plan = _type_compile_plan_cached(
+            type(allowed_type), allowed_type, normalized_policy
+        )
+    except TypeError:
+        # Unhashable annotation, compile without caching
+        return _type_compile_plan(allowed_type, normalized_policy)
+
+    if len(_type_plans_by_id) >= TYPE_VALIDATOR_CACHE_SIZE:
+        _type_plans_by_id.clear()
+    # Keeping the annotation alive guarantees its id is not reused
+    _type_plans_by_id[key] = (allowed_type, plan)
+
+    return plan
+
+
+def type_generic_value_is_valid(
+    value: Any,
+    allowed_type: type | UnionType,
+    policy: TypeValidationPolicy | None = None,
+) -> bool:
+    """Helper to recursively validate parameter types for generics like Dict, List, Set, Tuple, and Union.
+
+    The policy allows checking only the first or a random sample of container items,
+    or to stop descending past a given depth; by default every item is checked.
+    """
+    if _type_compile_check_for(allowed_type, _type_policy_normalize(policy))(value):
+        return True
+    # Nobody will report the failed item location
+    _type_failure_path_pop()
+    return False
+
+
+def type_is_compatible(actual_type: type, allowed_type: type) -> bool:
+    """Check if actual_type is compatible with allowed_type for generics like Dict, List, Tuple, and Union.
+
+    Classes match their subclasses, generic containers match their arguments covariantly
+    through the collections ABCs (list[int] matches Sequence[int]), and unions, including
+    Optional and PEP 604 ones, match member by member. Results are kept in an LRU keyed
+    by the pair of annotations.
+    """
+    try:
+        return _type_is_compatible_cached(
+            type(actual_type), actual_type, type(allowed_type), allowed_type
+        )
+    except TypeError:
+        # Unhashable annotation
+        return _type_is_compatible(actual_type, allowed_type)
+
+
+def type_is_generic(type_value: Any) -> bool:
+    """Detects if a given type is a generic type like List, Dict, Union"""
+    # Set of known generic types for quick membership testing
+    generic_types = {list, dict, tuple, Union}
+
+    # Extract the base type of type_value using get_origin, or use type_value itself if get_origin is None
+    type_value = get_origin(type_value) or type_value
+
+    # Check if type_value is a known generic type
+    return type_value in generic_types
+
+
+def type_is_isinstance(value: Any, allowed_type: Any) -> bool:
+    """Like isinstance but never raises TypeError; returns False instead."""
+    try:
+        return isinstance(value, allowed_type)
+    except TypeError:
+        return False
+
+
+def type_is_valid(
+    value: Any,
+    allowed_type: type | UnionType,
+    policy: TypeValidationPolicy | None = None,
+) -> bool:
+    """Same check as type_validate_or_fail, returning a bool without building any exception."""
+    return _type_compile_test_for(allowed_type, _type_policy_normalize(policy))(value)
+
+
+def type_to_name(t: Any) -> str:
+    # Accept python types, strings, and mypy UnionType
+    if isinstance(t, str):
+        return t
+    if isinstance(t, type):
+        return t.__name__
+    if isinstance(t, UnionType):
+        # Convert "A | B" style if possible
+        try:
+            return " | ".join(type_to_name(it) for it in t.items)
+        except Exception:
+            return str(t)
+    return str(t)
+
+
+def type_validate_or_fail(
+    value: Any,
+    allowed_type: type | UnionType,
+    policy: TypeValidationPolicy | None = None,
+    *,
+    memoize: bool = False,
+) -> None:
+    """Raise NotAllowedVariableTypeException if the value does not match the annotation.
+
+    With memoize, values built only from immutable builtins (str, int, float, bytes, None,
+    and tuples or frozensets of them) are remembered once valid, so validating an equal
+    value again against the same annotation is a lookup. Mutable values are never remembered.
+    """
+    if not memoize:
+        type_compile_validator(allowed_type, policy)(value)
+        return
+
+    # The same object is usually validated again, skip building its structural key
+    id_key = (id(value), id(allowed_type), policy)
+    entry = _type_memo_by_id.get(id_key)
+    if entry is not None and entry[0] is value and entry[1] is allowed_type:
+        with _type_memo_lock:
+            _type_memo_stats["hits"] += 1
+        return
+
+    key = _type_memo_key(value, allowed_type, policy)
+    if key is None:
+        type_compile_validator(allowed_type, policy)(value)
+        return
+
+    with _type_memo_lock:
+        hit = key in _type_memo
+        if hit:
+            _type_memo.move_to_end(key)
+            _type_memo_stats["hits"] += 1
+        else:
+            _type_memo_stats["misses"] += 1
+
+    if not hit:
+        type_compile_validator(allowed_type, policy)(value)
+
+    with _type_memo_lock:
+        _type_memo[key] = None
+        if len(_type_memo) > TYPE_VALIDATOR_MEMO_SIZE:
+            _type_memo.popitem(last=False)
+        if len(_type_memo_by_id) >= TYPE_VALIDATOR_MEMO_SIZE:
+            _type_memo_by_id.clear()
+        # Keeping both objects alive guarantees their ids are not reused
+        _type_memo_by_id[id_key] = (value, allowed_type)
+
+
+def type_validate_many(
+    values: Iterable[Any],
+    allowed_type: type | UnionType,
+    *,
+    fail_fast: bool = True,
+    policy: TypeValidationPolicy | None = None,
+) -> TypeValidationReport:
+    """Validate every value of an iterable against one annotation, compiled once.
+
+    Values are consumed lazily, so generators are streamed. Failures are collected as
+    (index, reason) pairs in the returned report, without building one exception per
+    invalid value; with fail_fast the iteration stops at the first one.
+    """
+    from wexample_helpers.classes.type_validation_report import (
+        TypeValidationReport,
+    )
+
+    report = TypeValidationReport(allowed_type=allowed_type)
+    if allowed_type is Any:
+        report.checked = sum(1 for _ in values)
+        return report
+
+    test = _type_compile_test_for(allowed_type, _type_policy_normalize(policy))
+    failures = report.failures
+    index = -1
+
+    for index, value in enumerate(values):
+        try:
+            if test(value):
+                continue
+            reason = f"invalid type '{type(value).__name__}'"
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+
+        failures.append((index, reason))
+        if fail_fast:
+            break
+
+    report.checked = index + 1
+    return report
+
+
+def type_validator_cache_clear() -> None:
+    """Drop every compiled validation plan, memoized valid value and resolved callable hint."""
+    with _type_memo_lock:
+        _type_memo.clear()
+        _type_memo_by_id.clear()
+        _type_memo_stats.update(hits=0, misses=0)
+    _type_callables.clear()
+    _type_plans_by_id.clear()
+    _type_compile_check_cached.cache_clear()
+    _type_compile_plan_cached.cache_clear()
+    _type_compile_test_cached.cache_clear()
+    _type_is_compatible_cached.cache_clear()
+    _type_typed_dict_schema.cache_clear()
+
+
+def type_validator_cache_info() -> dict[str, Any]:
+    """Return the LRU statistics of compiled validation plans and memoized values."""
+    with _type_memo_lock:
+        values = {
+            **_type_memo_stats,
+            "maxsize": TYPE_VALIDATOR_MEMO_SIZE,
+            "currsize": len(_type_memo),
+        }
+
+    return {
+        "checks": _type_compile_check_cached.cache_info(),
+        "compatibility": _type_is_compatible_cached.cache_info(),
+        "plans": _type_compile_plan_cached.cache_info(),
+        "tests": _type_compile_test_cached.cache_info(),
+        "typed_dicts": _type_typed_dict_schema.cache_info(),
+        "values": values,
+    }
 
 
-def type_generic_value_is_valid(value: Any, allowed_type: type | UnionType) -> bool:
-    """Helper to recursively validate parameter types for generics like Dict, List, Set, Tuple, and Union."""
-    from types import UnionType
+def _is_typed_dict(type_hint: Any) -> bool:
+    """Check if a type hint is a TypedDict."""
 
+    # Check module and class name for TypedDict
+    if hasattr(type_hint, "__module__") and hasattr(type_hint, "__name__"):
+        # Direct check for typing module TypedDict classes
+        if hasattr(type_hint, "__annotations__") and hasattr(type_hint, "__total__"):
+            return True
+
+    # Check for typing_extensions.TypedDict or typing.TypedDict metaclass
+    if isinstance(type_hint, _typed_dict_metaclasses()):
+        return True
+
+    # Fallback check for standard attributes
+    result = (
+        hasattr(type_hint, "__annotations__")
+        and hasattr(type_hint, "__total__")
+        and hasattr(type_hint, "__required_keys__")
+        and hasattr(type_hint, "__optional_keys__")
+    )
+    return result
+
+
+def _safe_issubclass(a: Any, b: Any) -> bool:
+    """Like issubclass but never raises TypeError; returns False instead."""
+    try:
+        return issubclass(a, b)
+    except TypeError:
+        return False
+
+
+def _type_accept(value: Any) -> bool:
+    return True
+
+
+def _type_callable_entry(value: Any) -> dict[str, Any]:
+    # Bound methods are created on each access, cache their function instead
+    function = getattr(value, "__func__", value)
+    try:
+        entry = _type_callables.get(function)
+        if entry is None:
+            entry = _type_callables[function] = {}
+        return entry
+    except TypeError:
+        # Not weak referenceable or unhashable, resolve on each call
+        return {}
+
+
+def _type_callable_parameters(value: Any) -> tuple[int, int, bool, bool] | None:
+    """Count positional and required positional parameters, None if the signature is unknown."""
+    import inspect
+
+    entry = _type_callable_entry(value)
+    if "parameters" not in entry:
+        try:
+            signature = inspect.signature(getattr(value, "__func__", value))
+        except (TypeError, ValueError):
+            entry["parameters"] = None
+        else:
+            kinds = inspect.Parameter
+            positional = required = 0
+            var_positional = required_keywords = False
+            for parameter in signature.parameters.values():
+                if parameter.kind in (kinds.POSITIONAL_ONLY, kinds.POSITIONAL_OR_KEYWORD):
+                    positional += 1
+                    required += parameter.default is kinds.empty
+                elif parameter.kind is kinds.VAR_POSITIONAL:
+                    var_positional = True
+                elif parameter.kind is kinds.KEYWORD_ONLY:
+                    required_keywords |= parameter.default is kinds.empty
+            entry["parameters"] = (positional, required, var_positional, required_keywords)
+
+    summary = entry["parameters"]
+    if summary is None or not hasattr(value, "__func__") or not summary[0]:
+        return summary
+
+    # The bound instance or class fills the first positional parameter
+    positional, required, var_positional, required_keywords = summary
+    return positional - 1, max(required - 1, 0), var_positional, required_keywords
+
+
+def _type_callable_return_hint(value: Any) -> Any:
+    entry = _type_callable_entry(value)
+    if "return" not in entry:
+        try:
+            type_hints = get_type_hints(getattr(value, "__func__", value))
+        except NameError:
+            # Might resolve once the missing name is defined, do not cache
+            return None
+        entry["return"] = type_hints.get("return", None)
+    return entry["return"]
+
+
+def _type_callable_return_is_valid(value: Any, return_type: Any) -> bool:
+    """Tell if the annotated return type of a callable matches Callable[..., return_type]."""
+    actual_return_type_hint = _type_callable_return_hint(value)
+    if actual_return_type_hint is None:
+        return True
+
+    # Handle generic types
+    return type_is_compatible(
+        actual_type=cast(type, actual_return_type_hint),
+        allowed_type=return_type,
+    )
+
+
+def _type_classes_are_valid(items: Iterable[Any], allowed_type: type) -> bool:
+    """Check every item class at once, containers usually hold very few distinct classes."""
+    return all(issubclass(item_class, allowed_type) for item_class in set(map(type, items)))
+
+
+def _type_compatible_items(actual_origin: Any, actual_args: tuple[Any, ...]) -> tuple[Any, ...]:
+    """Return the item types of a generic annotation, as seen through a single item ABC."""
+    if not actual_args:
+        return (Any,)
+    if actual_origin is tuple:
+        # tuple[int, ...] holds int items, tuple[int, str] holds both
+        return actual_args[:1] if actual_args[-1] is Ellipsis else actual_args
+    return actual_args[:1]
+
+
+def _type_compile_check(
+    allowed_type: Any,
+    policy: TypeValidationPolicy | None = None,
+    depth: int = 0,
+    explain: bool = True,
+) -> Callable[[Any], bool]:
+    """Compile the boolean checker behind type_generic_value_is_valid.
+
+    Explaining checkers record the location of failed container items, and raise
+    TypedDict errors from Unions; the others never raise validation errors.
+    """
     from wexample_helpers.exception.not_allowed_variable_type_exception import (
         NotAllowedVariableTypeException,
     )
@@ -27,154 +456,611 @@ def type_generic_value_is_valid(value: Any, allowed_type: type | UnionType) -> b
 
     # Validate Union (supports typing.Union and PEP 604 | operator which yields types.UnionType)
     if origin is Union or origin is UnionType:
-        typed_dict_errors = []
-        for arg in args:
-            # Check TypedDict in Union
-            if _is_typed_dict(arg) and isinstance(value, dict):
+        members = [
+            (
+                arg if _is_typed_dict(arg) else None,
+                _type_compile_check_for(arg, policy, depth, explain),
+                # Only nested containers may leave a failure path behind
+                explain and _type_is_container(arg),
+            )
+            for arg in args
+        ]
+        typed_dicts = [typed_dict for typed_dict, _, _ in members if typed_dict]
+        dispatch = (
+            _type_typed_dict_discriminator(typed_dicts)
+            if len(typed_dicts) > 1
+            else None
+        )
+
+        # Members worth running for a given value class, see _type_union_candidates()
+        candidates_by_class: dict[type, tuple[list[Any], bool]] = {}
+
+        def _check_union(value: Any) -> bool:
+            if dispatch is not None and isinstance(value, dict):
+                # Go straight to the TypedDict designated by the discriminator key
+                key, index = dispatch
                 try:
-                    _validate_typed_dict(value, arg)
+                    typed_dict = index.get(value.get(key))
+                except TypeError:
+                    typed_dict = None
+                if typed_dict is not None and _type_typed_dict_is_valid(
+                    value, typed_dict, policy
+                ):
                     return True
-                except NotAllowedVariableTypeException as e:
-                    # Collect TypedDict specific errors
-                    error_msg = getattr(e, "variable_type", str(e))
-                    typed_dict_errors.append(f"{arg.__name__}: {error_msg}")
-                    continue
-                except Exception:
-                    continue
-            # Regular type validation
-            if type_generic_value_is_valid(value, arg):
+                # Otherwise replay every member in order to report errors
+
+            value_class = type(value)
+            candidates = candidates_by_class.get(value_class)
+            if candidates is None:
+                candidates = _type_union_candidates(value_class, args, members)
+                if (
+                    candidates is not None
+                    and len(candidates_by_class) < TYPE_VALIDATOR_CACHE_SIZE
+                ):
+                    candidates_by_class[value_class] = candidates
+                else:
+                    candidates = (members, False)
+
+            candidate_members, matched = candidates
+            typed_dict_errors = []
+            for typed_dict, check, is_container in candidate_members:
+                # Check TypedDict in Union
+                if typed_dict is not None and isinstance(value, dict):
+                    if not explain:
+                        if _type_typed_dict_is_valid(value, typed_dict, policy):
+                            return True
+                        continue
+                    try:
+                        _validate_typed_dict(value, typed_dict, policy)
+                        return True
+                    except NotAllowedVariableTypeException as e:
+                        # Collect TypedDict specific errors
+                        error_msg = getattr(e, "variable_type", str(e))
+                        typed_dict_errors.append(f"{typed_dict.__name__}: {error_msg}")
+                        continue
+                    except Exception:
+                        continue
+                # Regular type validation
+                if check(value):
+                    return True
+                if is_container:
+                    _type_failure_path_pop()
+
+            # A plain class member matched, after every member before it failed
+            if matched:
                 return True
 
-        # If we had TypedDict errors and value is dict, raise specific error
-        if typed_dict_errors and isinstance(value, dict):
-            from wexample_helpers.exception.not_allowed_variable_type_exception import (
-                NotAllowedVariableTypeException,
-            )
+            # If we had TypedDict errors and value is dict, raise specific error
+            if typed_dict_errors and isinstance(value, dict):
+                raise NotAllowedVariableTypeException(
+                    variable_type=f"dict validation failed: {'; '.join(typed_dict_errors)}",
+                    variable_value=value,
+                    allowed_types=[allowed_type],
+                )
 
-            raise NotAllowedVariableTypeException(
-                variable_type=f"dict validation failed: {'; '.join(typed_dict_errors)}",
-                variable_value=value,
-                allowed_types=[allowed_type],
-            )
+            return False
 
-        return False
+        return _check_union
 
     # Handle Type[T] annotations: we expect "value" to be a class, and it must be a subclass of T
     if origin is type:
-        # If no parameter provided, accept any class
-        if not args:
-            return isinstance(value, type)
+        # If no parameter provided, or Type[Any], accept any class
+        if not args or args[0] is Any:
+            return lambda value: isinstance(value, type)
 
         param = args[0]
-
-        # value must be a class object to satisfy Type[...]
-        if not isinstance(value, type):
-            return False
-
-        # Type[Any] accepts any class
-        if param is Any:
-            return True
+        param_origin = get_origin(param) or param
 
         # If param itself is a Union of classes, accept if value is subclass of any
-        param_origin = get_origin(param) or param
         if param_origin is Union or param_origin is UnionType:
-            res = any(_safe_issubclass(value, p) for p in get_args(param))
-            return res
+            classes = get_args(param)
+            return lambda value: isinstance(value, type) and any(
+                _safe_issubclass(value, p) for p in classes
+            )
 
         # Normal Type[SomeClass]
-        res = _safe_issubclass(value, param_origin)
-        return res
+        return lambda value: isinstance(value, type) and _safe_issubclass(
+            value, param_origin
+        )
+
+    if origin in (dict, list, set, tuple) and not (
+        policy is None or policy.max_depth is None or depth < policy.max_depth
+    ):
+        # Too deep for the policy, only check the container itself
+        return lambda value: isinstance(value, origin)
 
     # Validate dictionary type with possible nested generics
     if origin is dict:
-        if not isinstance(value, dict):
-            return False
-        # Accept empty dict
-        if not value:
-            return True
-        # Validate key and value types recursively
         key_type, value_type = args if len(args) == 2 else (Any, Any)
-        return all(
-            type_generic_value_is_valid(k, key_type)
-            and type_generic_value_is_valid(v, value_type)
-            for k, v in value.items()
-        )
-
-    # Validate list type with possible nested generics
-    elif origin is list:
-        if not isinstance(value, list):
-            return False
-        # Accept empty list
-        if not value:
+        check_key = _type_compile_check_for(key_type, policy, depth + 1, explain)
+        check_value = _type_compile_check_for(value_type, policy, depth + 1, explain)
+        pick = _type_compile_picker(dict, policy)
+
+        def _check_dict(value: Any) -> bool:
+            if not isinstance(value, dict):
+                return False
+            for k, v in pick(value):
+                if not check_key(k):
+                    if explain:
+                        _type_failure_path_push(f"<key {k!r}>", policy, value)
+                    return False
+                if not check_value(v):
+                    if explain:
+                        _type_failure_path_push(f"[{k!r}]", policy, value)
+                    return False
             return True
-        # Validate item type recursively
-        item_type = args[0] if args else Any
-        return all(type_generic_value_is_valid(item, item_type) for item in value)
 
-    # Validate set type with possible nested generics
-    elif origin is set:
-        if not isinstance(value, set):
-            return False
-        # Accept empty set
-        if not value:
+        select = _type_compile_selector(policy)
+        leaf_key = _type_is_leaf(key_type)
+        leaf_value = _type_is_leaf(value_type)
+        if select is None or not (leaf_key or key_type is Any):
+            return _check_dict
+        if not (leaf_value or value_type is Any):
+            return _check_dict
+
+        def _check_dict_leaves(value: Any) -> bool:
+            if not isinstance(value, dict):
+                return False
+            # Tight pass over item classes, the item by item check only locates failures
+            if (
+                not leaf_key or _type_classes_are_valid(select(value), key_type)
+            ) and (
+                not leaf_value
+                or _type_classes_are_valid(select(value.values()), value_type)
+            ):
+                return True
+            return _check_dict(value)
+
+        return _check_dict_leaves
+
+    # Validate list and set types with possible nested generics
+    if origin is list or origin is set:
+        check_item = _type_compile_check_for(
+            args[0] if args else Any, policy, depth + 1, explain
+        )
+        pick = _type_compile_picker(origin, policy)
+        location = "[{}]" if origin is list else "{{{!r}}}"
+
+        def _check_items(value: Any) -> bool:
+            if not isinstance(value, origin):
+                return False
+            for key, item in pick(value):
+                if not check_item(item):
+                    if explain:
+                        _type_failure_path_push(location.format(key), policy, value)
+                    return False
             return True
-        # Validate item type recursively
+
+        select = _type_compile_selector(policy)
         item_type = args[0] if args else Any
-        return all(type_generic_value_is_valid(item, item_type) for item in value)
+        if select is None or not _type_is_leaf(item_type):
+            return _check_items
+
+        def _check_leaves(value: Any) -> bool:
+            if not isinstance(value, origin):
+                return False
+            # Tight pass over item classes, the item by item check only locates failures
+            if _type_classes_are_valid(select(value), item_type):
+                return True
+            return _check_items(value)
+
+        return _check_leaves
 
     # Validate tuple type with possible nested generics
-    elif origin is tuple:
-        if not isinstance(value, tuple) or (args and len(value) != len(args)):
+    if origin is tuple:
+        checks = [
+            _type_compile_check_for(arg, policy, depth + 1, explain) for arg in args
+        ]
+        size = len(args)
+
+        def _check_tuple(value: Any) -> bool:
+            if not isinstance(value, tuple) or (size and len(value) != size):
+                return False
+            for index, (check, item) in enumerate(zip(checks, value)):
+                if not check(item):
+                    if explain:
+                        _type_failure_path_push(f"[{index}]", None, value)
+                    return False
+            return True
+
+        return _check_tuple
+
+    if origin is Any:
+        return _type_accept
+
+    if origin is Literal:
+        try:
+            literals = frozenset((type(arg), arg) for arg in args)
+        except TypeError:
+            literals = None
+
+        def _check_literal(value: Any) -> bool:
+            # Literal[1] accepts neither True nor 1.0
+            if literals is not None:
+                try:
+                    return (type(value), value) in literals
+                except TypeError:
+                    return False
+            return any(type(value) is type(arg) and value == arg for arg in args)
+
+        return _check_literal
+
+    # Plain classes with the default metaclass never raise on isinstance
+    if type(origin) is type:
+        return lambda value: isinstance(value, origin)
+
+    # For any other types, fallback to isinstance check
+    return lambda value: type_is_isinstance(value, origin)
+
+
+@lru_cache(maxsize=TYPE_VALIDATOR_CACHE_SIZE)
+def _type_compile_check_cached(
+    annotation_class: type,
+    allowed_type: Any,
+    policy: TypeValidationPolicy | None,
+    depth: int,
+    explain: bool,
+) -> Callable[[Any], bool]:
+    # The annotation class is part of the key, so equal annotations
+    # of different kinds (i.e. Union[A, B] and A | B) never share a plan.
+    return _type_compile_check(allowed_type, policy, depth, explain)
+
+
+def _type_compile_check_for(
+    allowed_type: Any,
+    policy: TypeValidationPolicy | None = None,
+    depth: int = 0,
+    explain: bool = True,
+) -> Callable[[Any], bool]:
+    try:
+        return _type_compile_check_cached(
+            type(allowed_type), allowed_type, policy, depth, explain
+        )
+    except TypeError:
+        # Unhashable annotation, compile without caching
+        return _type_compile_check(allowed_type, policy, depth, explain)
+
+
+def _type_compile_picker(
+    container_type: type, policy: TypeValidationPolicy | None
+) -> Callable[[Any], Iterable[tuple[Any, Any]]]:
+    """Return how to pick the (key or index, item) pairs of a container to check."""
+    from wexample_helpers.enums.type_validation_mode import TypeValidationMode
+
+    if container_type is dict:
+        pairs = dict.items
+    elif container_type is list:
+        pairs = enumerate
+    else:
+
+        def pairs(value: Any) -> Iterable[tuple[Any, Any]]:
+            # Sets are keyed by their own items
+            return zip(value, value)
+
+    if policy is None or policy.mode is TypeValidationMode.FULL:
+        return pairs
+
+    size = policy.size
+
+    if policy.mode is TypeValidationMode.FIRST:
+        return lambda value: islice(pairs(value), size)
+
+    import random
+
+    def _pick_sample(value: Any) -> Iterable[tuple[Any, Any]]:
+        if len(value) <= size:
+            return pairs(value)
+        if container_type is list:
+            return [(i, value[i]) for i in random.sample(range(len(value)), size)]
+        if container_type is dict:
+            return [(k, value[k]) for k in random.sample(list(value), size)]
+        items = random.sample(list(value), size)
+        return zip(items, items)
+
+    return _pick_sample
+
+
+def _type_compile_selector(
+    policy: TypeValidationPolicy | None,
+) -> Callable[[Iterable[Any]], Iterable[Any]] | None:
+    """Return how to select the items a policy checks, None when selection is random."""
+    from wexample_helpers.enums.type_validation_mode import TypeValidationMode
+
+    if policy is None or policy.mode is TypeValidationMode.FULL:
+        return iter
+    if policy.mode is TypeValidationMode.FIRST:
+        size = policy.size
+        return lambda items: islice(items, size)
+    return None
+
+
+def _type_compile_plan(
+    allowed_type: Any, policy: TypeValidationPolicy | None = None
+) -> Callable[[Any], None]:
+    """Compile the raising checker behind type_validate_or_fail.
+
+    The value goes through the boolean test first; errors are only built by the
+    explaining test, once the value is known to be invalid.
+    """
+    from wexample_helpers.enums.type_validation_mode import TypeValidationMode
+    from wexample_helpers.exception.not_allowed_variable_type_exception import (
+        NotAllowedVariableTypeException,
+    )
+
+    if allowed_type is Any:
+        return lambda value: None
+
+    explain = _type_compile_test(allowed_type, policy, explain=True)
+
+    # Random samples would differ between the test and its explanation
+    if policy is not None and policy.mode is TypeValidationMode.SAMPLE:
+        return explain
+
+    test = _type_compile_test_for(allowed_type, policy)
+
+    def _plan(value: Any) -> None:
+        if test(value) or not explain(value):
+            return
+        raise NotAllowedVariableTypeException(
+            variable_type=type(value).__name__,
+            variable_value=value,
+            allowed_types=[allowed_type],
+        )
+
+    return _plan
+
+
+@lru_cache(maxsize=TYPE_VALIDATOR_CACHE_SIZE)
+def _type_compile_plan_cached(
+    annotation_class: type, allowed_type: Any, policy: TypeValidationPolicy | None
+) -> Callable[[Any], None]:
+    return _type_compile_plan(allowed_type, policy)
+
+
+def _type_compile_test(
+    allowed_type: Any, policy: TypeValidationPolicy | None = None, explain: bool = False
+) -> Callable[[Any], bool]:
+    """Compile the type_validate_or_fail ladder into a boolean test.
+
+    Explaining tests raise a detailed NotAllowedVariableTypeException instead of returning False.
+    """
+    from wexample_helpers.exception.not_allowed_variable_type_exception import (
+        NotAllowedVariableTypeException,
+    )
+
+    if allowed_type is Any:
+        return _type_accept
+
+    check = _type_compile_check_for(allowed_type, policy, explain=explain)
+
+    def _fail(
+        value: Any, variable_type: Any = None, allowed_types: list[Any] | None = None
+    ) -> bool:
+        if not explain:
             return False
-        # Validate each item in the tuple recursively
-        return all(
-            type_generic_value_is_valid(item, arg)
-            for item, arg in zip(value, args)
-            if args
+
+        path = _type_failure_path_pop()
+        exception = NotAllowedVariableTypeException(
+            variable_type=variable_type or type(value).__name__,
+            variable_value=value,
+            allowed_types=allowed_types or [allowed_type],
+            message=_type_failure_path_message(path) if path else None,
         )
+        if path:
+            exception.with_data(
+                failure_path=[location for location, _ in path],
+                sampled=any(sampled for _, sampled in path),
+            )
+        raise exception
 
-    elif origin is Any:
-        return True
+    if allowed_type is Callable:
 
-    # For any other types, fallback to isinstance check
-    return type_is_isinstance(value, origin)
+        def _test(value: Any) -> bool:
+            # Not a callable where one was expected
+            return callable(value) or _fail(value, allowed_types=["callable"])
 
+    # Check if the raw value matches any allowed base type
+    elif not type_is_generic(allowed_type):
+        if type_is_isinstance(allowed_type, Callable):
+            if isinstance(allowed_type, type):
+                # Type is probably not a meta type, i.e:
+                #   - allowed_type=Type[MyClass] will match value MyClass
+                #   - allowed_type=MyClass will not match value MyClass
+                instances_are_callable = any(
+                    "__call__" in vars(klass) for klass in allowed_type.__mro__
+                )
 
-def type_is_compatible(actual_type: type, allowed_type: type) -> bool:
-    """Check if actual_type is compatible with allowed_type for generics like Dict, List, Tuple, and Union."""
-    from collections.abc import Callable
+                def _test(value: Any) -> bool:
+                    if type(value) is allowed_type and not instances_are_callable:
+                        return True
+                    if isinstance(value, Callable) or not check(value):
+                        return _fail(value)
+                    return True
+
+            else:
+                args = get_args(allowed_type)
+                return_type = args[-1] if args else None
+
+                def _test(value: Any) -> bool:
+                    if isinstance(value, Callable):
+                        if args and not _type_callable_return_is_valid(
+                            value, return_type
+                        ):
+                            return _fail(
+                                value,
+                                variable_type=str(_type_callable_return_hint(value)),
+                                allowed_types=[return_type],
+                            )
+                        return True
+                    # Handle generic types (includes Union/| and Type[...])
+                    return check(value) or _fail(value)
+
+        elif isinstance(allowed_type, UnionType) and not all(
+            _type_is_leaf(arg) for arg in get_args(allowed_type)
+        ):
+
+            def _test(value: Any) -> bool:
+                # isinstance() would either raise or agree with the Union check
+                return check(value) or _fail(value)
+
+        else:
+
+            def _test(value: Any) -> bool:
+                # Explicit check for simple types without get_origin
+                return (
+                    type_is_isinstance(value, allowed_type)
+                    or check(value)
+                    or _fail(value)
+                )
+
+    else:
+
+        def _test(value: Any) -> bool:
+            # Handle generic types (includes Union/| and Type[...])
+            return check(value) or _fail(value)
+
+    # Check for TypedDict validation
+    if _is_typed_dict(allowed_type):
+        test = _test
+
+        def _test(value: Any) -> bool:
+            if not isinstance(value, dict):
+                return test(value)
+            if explain:
+                _validate_typed_dict(value, allowed_type, policy)
+                return True
+            return _type_typed_dict_is_valid(value, allowed_type, policy)
+
+    return _test
+
+
+@lru_cache(maxsize=TYPE_VALIDATOR_CACHE_SIZE)
+def _type_compile_test_cached(
+    annotation_class: type, allowed_type: Any, policy: TypeValidationPolicy | None
+) -> Callable[[Any], bool]:
+    return _type_compile_test(allowed_type, policy)
+
+
+def _type_compile_test_for(
+    allowed_type: Any, policy: TypeValidationPolicy | None = None
+) -> Callable[[Any], bool]:
+    try:
+        return _type_compile_test_cached(type(allowed_type), allowed_type, policy)
+    except TypeError:
+        # Unhashable annotation, compile without caching
+        return _type_compile_test(allowed_type, policy)
+
+
+def _type_failure_path_message(path: list[tuple[str, bool]]) -> str:
+    from wexample_helpers.helpers.string import string_truncate
+
+    location = string_truncate("".join(location for location, _ in path), 200)
+    sampled = " (sampled check)" if any(sampled for _, sampled in path) else ""
+
+    return f"Invalid item at {location}{sampled}. "
+
+
+def _type_failure_path_pop() -> list[tuple[str, bool]]:
+    """Return and forget the location of the last failed container item, outermost first."""
+    path = getattr(_type_failure, "path", None)
+    if not path:
+        return []
+    _type_failure.path = []
+    return path[::-1]
+
+
+def _type_failure_path_push(
+    location: str, policy: TypeValidationPolicy | None, container: Any
+) -> None:
+    # Called on failure only, from the innermost container to the outermost one
+    path = getattr(_type_failure, "path", None)
+    if path is None:
+        path = _type_failure.path = []
+    path.append(
+        (location, policy is not None and policy.is_sampled(len(container)))
+    )
+
+
+def _type_is_compatible(actual_type: Any, allowed_type: Any) -> bool:
+    from collections.abc import Mapping
+
+    if actual_type is None:
+        actual_type = type(None)
+    if allowed_type is None:
+        allowed_type = type(None)
+
+    # If allowed_type is Any, it is compatible with any actual_type
+    if allowed_type is Any or actual_type == allowed_type:
+        return True
 
     origin = get_origin(allowed_type) or allowed_type
     actual_origin = get_origin(actual_type) or actual_type
     allowed_args = get_args(allowed_type)
     actual_args = get_args(actual_type)
 
-    # If allowed_type is Any, it is compatible with any actual_type
-    if origin is Any:
-        return True
+    # Every member of an actual union must fit
+    if actual_origin is Union or actual_origin is UnionType:
+        return all(type_is_compatible(arg, allowed_type) for arg in actual_args)
 
-    # Handle Union type for allowed_type
-    if origin is Union:
+    # Handle Union type for allowed_type, including Optional and PEP 604
+    if origin is Union or origin is UnionType:
         return any(type_is_compatible(actual_type, arg) for arg in allowed_args)
 
+    if actual_origin is Literal:
+        if origin is Literal:
+            return set(actual_args) <= set(allowed_args)
+        return all(type_is_compatible(type(arg), allowed_type) for arg in actual_args)
+
     # Handle Callable type with possible nested generics
-    if _safe_issubclass(origin, Callable):
+    if _safe_issubclass(origin, Callable) and not _safe_issubclass(origin, type):
         # Check if actual_type is also a Callable
         if not _safe_issubclass(actual_origin, Callable):
             return False
         # If allowed_type is just Callable without specific args, consider it compatible with any Callable
         if not allowed_args:
             return True
-        # If allowed_type has specific args, compare return types (last element in allowed_args)
-        if len(allowed_args) == len(actual_args):
-            return type_is_compatible(actual_args[-1], allowed_args[-1])
+        if len(allowed_args) != len(actual_args):
+            return False
+        parameters, actual_parameters = allowed_args[0], actual_args[0]
+        # Parameters are contravariant, unless one side accepts anything
+        if isinstance(parameters, list) and isinstance(actual_parameters, list):
+            if len(parameters) != len(actual_parameters) or not all(
+                type_is_compatible(allowed, actual)
+                for allowed, actual in zip(parameters, actual_parameters)
+            ):
+                return False
+        return type_is_compatible(actual_args[-1], allowed_args[-1])
+
+    if not isinstance(origin, type) or not isinstance(actual_origin, type):
+        # TypeVar, ForwardRef and other special forms only match themselves
+        return False
+    if not _safe_issubclass(actual_origin, origin):
         return False
 
-    # Handle dictionary type with possible nested generics
-    if origin is dict:
-        if actual_origin is not dict:
+    # Bare classes and containers accept any arguments
+    if not allowed_args:
+        return True
+
+    if origin is type:
+        return actual_origin is type and bool(actual_args) and type_is_compatible(
+            actual_args[0], allowed_args[0]
+        )
+
+    if origin is tuple:
+        if len(allowed_args) == 2 and allowed_args[1] is Ellipsis:
+            return all(
+                type_is_compatible(arg, allowed_args[0])
+                for arg in _type_compatible_items(actual_origin, actual_args)
+            )
+        # Fixed length tuples only match tuples of the same length
+        if len(actual_args) != len(allowed_args) or Ellipsis in actual_args:
             return False
-        # Check compatibility for key and value types recursively
+        return all(
+            type_is_compatible(act, exp) for act, exp in zip(actual_args, allowed_args)
+        )
+
+    # Check compatibility for key and value types recursively
+    if _safe_issubclass(origin, Mapping) and _safe_issubclass(actual_origin, Mapping):
         key_type, value_type = allowed_args if len(allowed_args) == 2 else (Any, Any)
         actual_key_type, actual_value_type = (
             actual_args if len(actual_args) == 2 else (Any, Any)
@@ -183,240 +1069,263 @@ def type_is_compatible(actual_type: type, allowed_type: type) -> bool:
             actual_value_type, value_type
         )
 
-    # Handle list type with possible nested generics
-    elif origin is list:
-        if actual_origin is not list:
-            return False
-        # Validate item type recursively
-        item_type = allowed_args[0] if allowed_args else Any
-        actual_item_type = actual_args[0] if actual_args else Any
-        return type_is_compatible(actual_item_type, item_type)
-
-    # Handle tuple type with possible nested generics
-    elif origin is tuple:
-        if actual_origin is not tuple or len(actual_args) != len(allowed_args):
-            return False
-        # Validate each item type in the tuple recursively
+    # Validate item type recursively for list, set, frozenset, Sequence, Iterable...
+    if len(allowed_args) == 1:
         return all(
-            type_is_compatible(act, exp) for act, exp in zip(actual_args, allowed_args)
+            type_is_compatible(arg, allowed_args[0])
+            for arg in _type_compatible_items(actual_origin, actual_args)
         )
 
-    # For other types, fall back to direct comparison
-    return actual_type == allowed_type
+    # Other generic classes, compare arguments one by one
+    return len(actual_args) == len(allowed_args) and all(
+        type_is_compatible(act, exp) for act, exp in zip(actual_args, allowed_args)
+    )
 
 
-def type_is_generic(type_value: Any) -> bool:
-    """Detects if a given type is a generic type like List, Dict, Union"""
-    # Set of known generic types for quick membership testing
-    generic_types = {list, dict, tuple, Union}
+@lru_cache(maxsize=TYPE_VALIDATOR_CACHE_SIZE)
+def _type_is_compatible_cached(
+    actual_class: type, actual_type: Any, allowed_class: type, allowed_type: Any
+) -> bool:
+    return _type_is_compatible(actual_type, allowed_type)
 
-    # Extract the base type of type_value using get_origin, or use type_value itself if get_origin is None
-    type_value = get_origin(type_value) or type_value
 
-    # Check if type_value is a known generic type
-    return type_value in generic_types
+def _type_is_container(allowed_type: Any) -> bool:
+    """Tell if the compiled checker of this annotation may record a failure path."""
+    origin = get_origin(allowed_type) or allowed_type
+    return origin in (dict, list, set, tuple, Union, UnionType)
 
 
-def type_is_isinstance(value: Any, allowed_type: Any) -> bool:
-    """Like isinstance but never raises TypeError; returns False instead."""
-    try:
-        return isinstance(value, allowed_type)
-    except TypeError:
-        return False
+def _type_is_leaf(allowed_type: Any) -> bool:
+    """Tell if an annotation is a plain class, for which isinstance matches issubclass of the value class."""
+    return type(allowed_type) is type
 
 
-def type_to_name(t: Any) -> str:
-    from types import UnionType
+def _type_memo_key(
+    value: Any, allowed_type: Any, policy: TypeValidationPolicy | None
+) -> tuple[Any, ...] | None:
+    """Build the memo key of a value checked against an annotation, None if it must not be remembered."""
+    from wexample_helpers.enums.type_validation_mode import TypeValidationMode
 
-    # Accept python types, strings, and mypy UnionType
-    if isinstance(t, str):
-        return t
-    if isinstance(t, type):
-        return t.__name__
-    if isinstance(t, UnionType):
-        # Convert "A | B" style if possible
-        try:
-            return " | ".join(type_to_name(it) for it in t.items)
-        except Exception:
-            return str(t)
-    return str(t)
+    # A sampled pass does not prove every item valid
+    if policy is not None and policy.mode is TypeValidationMode.SAMPLE:
+        return None
 
+    value_key = _type_memo_value_key(value)
+    if value_key is None:
+        return None
 
-def type_validate_or_fail(value: Any, allowed_type: type | UnionType) -> None:
-    from collections.abc import Callable
+    key = (type(allowed_type), allowed_type, _type_policy_normalize(policy), value_key)
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable annotation
+        return None
+    return key
+
+
+def _type_memo_value_key(value: Any) -> Any:
+    # Classes are part of the key, as True == 1 but may not match the same annotation
+    value_class = type(value)
+    if value_class in _TYPE_MEMO_SCALARS:
+        return value_class, value
+
+    if value_class is tuple or value_class is frozenset:
+        item_classes = frozenset(map(type, value))
+        # Flat values are their own key when no two item classes can compare equal
+        if item_classes <= _TYPE_MEMO_SCALARS and len(
+            item_classes & _TYPE_MEMO_NUMBERS
+        ) <= 1:
+            return value_class, item_classes, value
+
+        item_keys = []
+        for item in value:
+            item_key = _type_memo_value_key(item)
+            if item_key is None:
+                return None
+            item_keys.append(item_key)
+        return value_class, value_class(item_keys)
+
+    return None
+
+
+def _type_policy_normalize(
+    policy: TypeValidationPolicy | None,
+) -> TypeValidationPolicy | None:
+    # Full checks share the plans compiled without policy
+    return None if policy is None or policy.is_full() else policy
+
+
+def _type_typed_dict_discriminator(
+    typed_dicts: list[Any],
+) -> tuple[str, dict[Any, Any]] | None:
+    """Find a key required by every TypedDict with distinct Literal values, and index them by value."""
+    schemas = [_type_typed_dict_schema(typed_dict) for typed_dict in typed_dicts]
+
+    for key in sorted(schemas[0].required_keys):
+        index: dict[Any, Any] = {}
+        for schema in schemas:
+            annotation = schema.annotations.get(key)
+            if key not in schema.required_keys or get_origin(annotation) is not Literal:
+                break
+            try:
+                if any(tag in index for tag in get_args(annotation)):
+                    break
+                index.update(dict.fromkeys(get_args(annotation), schema.typed_dict_type))
+            except TypeError:
+                break
+        else:
+            return key, index
 
-    from wexample_helpers.exception.not_allowed_variable_type_exception import (
-        NotAllowedVariableTypeException,
-    )
+    return None
 
-    if allowed_type is Any:
-        return
 
-    # Check for TypedDict validation
-    if _is_typed_dict(allowed_type) and isinstance(value, dict):
-        _validate_typed_dict(value, allowed_type)
-        return
+def _type_typed_dict_is_valid(
+    value: dict, typed_dict_type: Any, policy: TypeValidationPolicy | None = None
+) -> bool:
+    """Boolean counterpart of _validate_typed_dict, never building exceptions."""
+    schema = _type_typed_dict_schema(typed_dict_type)
+    keys = value.keys()
 
-    if allowed_type is Callable:
-        if callable(value):
-            return
-        # Not a callable where one was expected
-        raise NotAllowedVariableTypeException(
-            variable_type=type(value).__name__,
-            variable_value=value,
-            allowed_types=["callable"],
+    if not (keys >= schema.required_keys and keys <= schema.allowed_keys):
+        return False
+
+    tests = schema.tests.get(policy)
+    if tests is None:
+        tests = schema.tests[policy] = tuple(
+            (key, _type_compile_test_for(expected_type, policy))
+            for key, expected_type in schema.annotations.items()
         )
 
-    # Check if the raw value matches any allowed base type
-    if not type_is_generic(allowed_type):
-        if type_is_isinstance(allowed_type, Callable):
-            if isinstance(value, Callable):
-                # Type is probably not a meta type, i.e:
-                #   - allowed_type=Type[MyClass] will match value MyClass
-                #   - allowed_type=MyClass will not match value MyClass
-                if isinstance(allowed_type, type):
-                    raise NotAllowedVariableTypeException(
-                        variable_type=type(value).__name__,
-                        variable_value=value,
-                        allowed_types=[allowed_type],
-                    )
+    try:
+        for key, test in tests:
+            if key in value and not test(value[key]):
+                return False
+    except Exception:
+        # Any error is an invalid key, like in _validate_typed_dict
+        return False
 
-                args = get_args(allowed_type)
-                if args:
-                    return_type = args[-1]
+    return True
 
-                    try:
-                        type_hints = get_type_hints(value, localns=locals())
-                        actual_return_type_hint = type_hints.get("return", None)
-                    except NameError:
-                        actual_return_type_hint = None
-
-                    if actual_return_type_hint is None:
-                        return
-
-                    # Handle generic types
-                    if type_is_compatible(
-                        actual_type=cast(type, actual_return_type_hint),
-                        allowed_type=return_type,
-                    ):
-                        return
-
-                    raise NotAllowedVariableTypeException(
-                        variable_type=str(actual_return_type_hint),
-                        variable_value=value,
-                        allowed_types=[return_type],
-                    )
-
-                return
-        # Explicit check for simple types without get_origin
-        elif type_is_isinstance(value, allowed_type):
-            return
 
-    # Handle generic types (includes Union/| and Type[...])
-    if type_generic_value_is_valid(value, allowed_type):
-        return
+@lru_cache(maxsize=TYPE_VALIDATOR_CACHE_SIZE)
+def _type_typed_dict_schema(typed_dict_type: Any) -> TypedDictSchema:
+    from wexample_helpers.classes.typed_dict_schema import TypedDictSchema
 
-    # If none of the checks passed, raise an exception
-    raise NotAllowedVariableTypeException(
-        variable_type=type(value).__name__,
-        variable_value=value,
-        allowed_types=[allowed_type],
+    try:
+        # Resolves forward references, and unwraps Required/NotRequired
+        annotations = get_type_hints(typed_dict_type)
+    except Exception:
+        annotations = {}
+        for key, expected_type in getattr(typed_dict_type, "__annotations__", {}).items():
+            origin = get_origin(expected_type)
+            if getattr(origin, "__name__", None) in ("Required", "NotRequired"):
+                expected_type = get_args(expected_type)[0]
+            annotations[key] = expected_type
+
+    required_keys = frozenset(getattr(typed_dict_type, "__required_keys__", set()))
+    optional_keys = frozenset(getattr(typed_dict_type, "__optional_keys__", set()))
+
+    return TypedDictSchema(
+        allowed_keys=required_keys | optional_keys,
+        annotations=annotations,
+        optional_keys=optional_keys,
+        required_keys=required_keys,
+        total=getattr(typed_dict_type, "__total__", True),
+        typed_dict_type=typed_dict_type,
     )
 
 
-def _is_typed_dict(type_hint: Any) -> bool:
-    """Check if a type hint is a TypedDict."""
-
-    # Check module and class name for TypedDict
-    if hasattr(type_hint, "__module__") and hasattr(type_hint, "__name__"):
-        # Direct check for typing module TypedDict classes
-        if hasattr(type_hint, "__annotations__") and hasattr(type_hint, "__total__"):
-            return True
-
-    # Check for typing_extensions.TypedDict or typing.TypedDict metaclass
+def _type_union_candidates(
+    value_class: type, args: tuple[Any, ...], members: list[Any]
+) -> tuple[list[Any], bool] | None:
+    """Resolve which Union members may accept instances of a class, keeping their order.
+
+    Returns the members that still need to run, and whether a plain class member
+    accepts the value class after them. Classes overriding __class__ may fool
+    isinstance(), so they get no shortcut.
+    """
+    if any("__class__" in vars(klass) for klass in value_class.__mro__[:-1]):
+        return None
+
+    candidates = []
+    for arg, member in zip(args, members):
+        origin = get_origin(arg) or arg
+        if _type_is_leaf(arg) or arg is Any:
+            if arg is Any or issubclass(value_class, arg):
+                return candidates, True
+        elif origin in (dict, list, set, tuple, type):
+            # Those checks start with isinstance(value, origin)
+            if issubclass(value_class, origin):
+                candidates.append(member)
+        elif isinstance(arg, _typed_dict_metaclasses()):
+            # Only dicts can match a TypedDict
+            if issubclass(value_class, dict):
+                candidates.append(member)
+        else:
+            candidates.append(member)
+
+    return candidates, False
+
+
+@lru_cache(maxsize=1)
+def _typed_dict_metaclasses() -> tuple[type, ...]:
+    import typing
+
+    metaclasses = []
     try:
         from typing_extensions import _TypedDictMeta
 
-        if isinstance(type_hint, _TypedDictMeta):
-            return True
+        metaclasses.append(_TypedDictMeta)
     except ImportError:
         pass
 
-    try:
-        import typing
+    if hasattr(typing, "_TypedDictMeta"):
+        metaclasses.append(typing._TypedDictMeta)
 
-        if hasattr(typing, "_TypedDictMeta") and isinstance(
-            type_hint, typing._TypedDictMeta
-        ):
-            return True
-    except (ImportError, AttributeError):
-        pass
-
-    # Fallback check for standard attributes
-    result = (
-        hasattr(type_hint, "__annotations__")
-        and hasattr(type_hint, "__total__")
-        and hasattr(type_hint, "__required_keys__")
-        and hasattr(type_hint, "__optional_keys__")
-    )
-    return result
-
-
-def _safe_issubclass(a: Any, b: Any) -> bool:
-    """Like issubclass but never raises TypeError; returns False instead."""
-    try:
-        return issubclass(a, b)
-    except TypeError:
-        return False
+    return tuple(metaclasses)
 
 
-def _validate_typed_dict(value: dict, typed_dict_type: Any) -> None:
+def _validate_typed_dict(
+    value: dict, typed_dict_type: Any, policy: TypeValidationPolicy | None = None
+) -> None:
     """Validate a dict against a TypedDict type."""
     from wexample_helpers.exception.not_allowed_variable_type_exception import (
         NotAllowedVariableTypeException,
     )
 
-    annotations = getattr(typed_dict_type, "__annotations__", {})
-    required_keys = getattr(typed_dict_type, "__required_keys__", set())
-    optional_keys = getattr(typed_dict_type, "__optional_keys__", set())
+    schema = _type_typed_dict_schema(typed_dict_type)
+    keys = value.keys()
 
-    # Check for missing required keys
-    missing_keys = required_keys - set(value.keys())
-    if missing_keys:
-        raise NotAllowedVariableTypeException(
-            variable_type=f"dict missing keys: {missing_keys}",
-            variable_value=value,
-            allowed_types=[typed_dict_type],
-        )
+    if not (keys >= schema.required_keys and keys <= schema.allowed_keys):
+        # Check for missing required keys
+        missing_keys = schema.required_keys.difference(keys)
+        if missing_keys:
+            raise NotAllowedVariableTypeException(
+                variable_type=f"dict missing keys: {missing_keys}",
+                variable_value=value,
+                allowed_types=[typed_dict_type],
+            )
 
-    # Check for unexpected keys
-    allowed_keys = required_keys | optional_keys
-    unexpected_keys = set(value.keys()) - allowed_keys
-    if unexpected_keys:
+        # Check for unexpected keys
+        unexpected_keys = keys - schema.allowed_keys
         raise NotAllowedVariableTypeException(
             variable_type=f"dict with unexpected keys: {unexpected_keys}",
             variable_value=value,
             allowed_types=[typed_dict_type],
         )
 
+    validators = schema.validators.get(policy)
+    if validators is None:
+        validators = schema.validators[policy] = tuple(
+            (key, type_compile_validator(expected_type, policy))
+            for key, expected_type in schema.annotations.items()
+        )
+
     # Validate types of present keys
-    for key, expected_type in annotations.items():
+    for key, validate in validators:
         if key in value:
-            # Unwrap Required/NotRequired wrappers
-            actual_type = expected_type
-            if hasattr(expected_type, "__origin__"):
-                origin = get_origin(expected_type)
-                if (
-                    origin
-                    and hasattr(origin, "__name__")
-                    and origin.__name__ in ("Required", "NotRequired")
-                ):
-                    args = get_args(expected_type)
-                    if args:
-                        actual_type = args[0]
-
             try:
-                type_validate_or_fail(value[key], actual_type)
+                validate(value[key])
             except Exception as e:
                 # Handle both NotAllowedVariableTypeException and other exceptions
                 error_msg = getattr(e, "variable_type", str(e))
@@ -0,0 +1,625 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingUnixStreamServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+
+class _FakeDockerEngine(ThreadingUnixStreamServer):
+    """Answers the few Engine API requests the docker helpers send, from memory."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str) -> None:
+        super().__init__(socket_path, _FakeDockerEngineHandler)
+        self.connections = 0
+        # Like a daemon closing idle connections without telling
+        self.drop_connections = False
+        self.containers: dict[str, bool] = {
+            "wex-web": True,
+            "wex-web-2": True,
+            "wex-db": False,
+        }
+        self.execs: dict[str, list[str]] = {}
+        self.images = {"alpine:3"}
+        self.pulls: list[tuple[str, str | None]] = []
+        self.requests: list[tuple[str, str]] = []
+
+
+class _FakeDockerEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _FakeDockerEngine
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        engine = self.server
+        engine.requests.append((method, url.path))
+
+        if parts == ["containers", "json"]:
+            filters = json.loads(query.get("filters", "{}"))
+            name = filters.get("name", [""])[0]
+            self._reply(
+                200,
+                [
+                    {
+                        "Id": f"id-{container}",
+                        "Image": "alpine:3",
+                        "Labels": {"com.example.app": container},
+                        "Names": [f"/{container}"],
+                        "State": "running" if running else "exited",
+                    }
+                    for container, running in engine.containers.items()
+                    if name in container and (running or query.get("all") == "1")
+                ],
+            )
+        elif parts == ["images", "json"]:
+            reference = json.loads(query["filters"])["reference"][0]
+            self._reply(200, [{"Id": reference}] if reference in engine.images else [])
+        elif parts == ["images", "create"]:
+            # Without a tag, the daemon would pull every tag of the repository
+            engine.pulls.append((query["fromImage"], query.get("tag")))
+            separator = "@" if query.get("tag", "").startswith("sha256:") else ":"
+            engine.images.add(f"{query['fromImage']}{separator}{query.get('tag')}")
+            self._reply(200, b'{"status":"Pulling"}\r\n{"status":"Done"}\r\n')
+        elif parts == ["containers", "create"]:
+            image = body["Image"]
+            if "@" not in image and ":" not in image.rpartition("/")[2]:
+                image += ":latest"
+            if image not in engine.images:
+                self._reply(404, {"message": f"No such image: {body['Image']}"})
+            else:
+                engine.containers[query["name"]] = False
+                self._reply(201, {"Id": query["name"]})
+        elif parts[0] == "containers" and parts[1] not in engine.containers:
+            self._reply(404, {"message": f"No such container: {parts[1]}"})
+        elif parts[0] == "containers" and method == "DELETE":
+            del engine.containers[parts[1]]
+            self._reply(204)
+        elif parts[0] == "containers" and parts[2] in ("start", "stop"):
+            engine.containers[parts[1]] = parts[2] == "start"
+            self._reply(204)
+        elif parts[0] == "containers" and parts[2] == "exec":
+            engine.execs[str(len(engine.execs))] = body["Cmd"]
+            self._reply(201, {"Id": str(len(engine.execs) - 1)})
+        elif parts[0] == "exec" and parts[2] == "start":
+            # The stream is hijacked: no length, the connection closes at the end
+            cmd = engine.execs[parts[1]]
+            self.send_response(200)
+            self.send_header(
+                "Content-Type", "application/vnd.docker.multiplexed-stream"
+            )
+            self.end_headers()
+            for stream, output in ((1, " ".join(cmd) + "\n"), (2, "warning\n")):
+                self.wfile.write(struct.pack(">BxxxI", stream, len(output)))
+                self.wfile.write(output.encode())
+            self.close_connection = True
+        elif parts[0] == "exec" and parts[2] == "json":
+            failed = engine.execs[parts[1]][0] == "false"
+            self._reply(200, {"ExitCode": 1 if failed else 0})
+        elif parts[0] == "images" and method == "DELETE":
+            engine.images.discard(parts[1])
+            self._reply(200, [{"Deleted": parts[1]}])
+        else:
+            self._reply(404, {"message": "page not found"})
+
+    def _reply(self, status: int, payload: object = None) -> None:
+        if isinstance(payload, bytes):
+            data = payload
+        else:
+            data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        if self.server.drop_connections:
+            self.close_connection = True
+
+
+@pytest.fixture
+def docker_engine(tmp_path):
+    from wexample_helpers.enums.docker_backend import DockerBackend
+    from wexample_helpers.helpers.docker import docker_set_default_backend
+
+    engine = _FakeDockerEngine(str(tmp_path / "docker.sock"))
+    thread = threading.Thread(
+        target=engine.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    docker_set_default_backend(DockerBackend.ENGINE_API, str(tmp_path / "docker.sock"))
+    try:
+        yield engine
+    finally:
+        docker_set_default_backend(None)
+        engine.shutdown()
+        engine.server_close()
+
+
+def test_docker_engine_queries(docker_engine) -> None:
+    from wexample_helpers.helpers.docker import (
+        docker_container_exists,
+        docker_container_is_running,
+        docker_image_exists,
+    )
+
+    for _ in range(20):
+        assert docker_container_exists("wex-web")
+        assert docker_container_exists("wex-db")
+        assert not docker_container_exists("wex-cache")
+        assert docker_container_is_running("wex-web")
+        assert not docker_container_is_running("wex-db", cache_ttl=10)
+        assert docker_image_exists("alpine:3")
+        assert not docker_image_exists("alpine:4")
+
+    # Every request went through the same kept-alive connection
+    assert docker_engine.connections == 1
+    assert len(docker_engine.requests) == 140
+
+
+def test_docker_engine_mutations(docker_engine) -> None:
+    from wexample_helpers.helpers.docker import (
+        docker_container_is_running,
+        docker_exec,
+        docker_image_exists,
+        docker_remove_container,
+        docker_remove_image,
+        docker_run_container,
+        docker_start_container,
+        docker_stop_container,
+    )
+
+    # The missing image is pulled first
+    docker_run_container("wex-app", "debian:12", {"/srv": "/var/www"}, user="1000")
+    assert docker_image_exists("debian:12")
+    assert docker_container_is_running("wex-app")
+
+    assert docker_exec("wex-app", ["echo", "hello world"]) == "echo hello world\n"
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        docker_exec("wex-app", ["false"], user="root")
+    assert error.value.returncode == 1
+    assert error.value.stderr == "warning\n"
+    assert error.value.cmd == ["docker", "exec", "--user", "root", "wex-app", "false"]
+
+    docker_stop_container("wex-app")
+    assert not docker_container_is_running("wex-app")
+    docker_start_container("wex-app")
+    assert docker_container_is_running("wex-app")
+    docker_remove_container("wex-app")
+    assert "wex-app" not in docker_engine.containers
+    docker_remove_image("debian:12")
+    assert not docker_image_exists("debian:12")
+
+    # Untagged images are pulled as latest only, like docker run does
+    docker_run_container("wex-nginx", "nginx", {})
+    docker_run_container("wex-registry", "localhost:5000/team/app", {})
+    docker_run_container("wex-pinned", "alpine@sha256:0123", {})
+    assert docker_engine.pulls == [
+        ("debian", "12"),
+        ("nginx", "latest"),
+        ("localhost:5000/team/app", "latest"),
+        ("alpine", "sha256:0123"),
+    ]
+    assert docker_image_exists("nginx:latest")
+
+
+def test_docker_engine_errors(docker_engine) -> None:
+    from wexample_helpers.exception.docker_engine_exception import (
+        DockerEngineException,
+    )
+    from wexample_helpers.helpers.docker import docker_stop_container
+
+    with pytest.raises(DockerEngineException) as error:
+        docker_stop_container("wex-missing")
+    assert error.value.status == 404
+    assert "No such container: wex-missing" in str(error.value)
+
+
+def test_docker_engine_client_reconnects(docker_engine, tmp_path) -> None:
+    from wexample_helpers.classes.docker_engine_client import DockerEngineClient
+
+    docker_engine.drop_connections = True
+    with DockerEngineClient(str(tmp_path / "docker.sock")) as client:
+        for _ in range(3):
+            images = client.request_json(
+                "GET", "/images/json", query={"filters": {"reference": ["alpine:3"]}}
+            )
+            assert images == [{"Id": "alpine:3"}]
+        assert docker_engine.connections == 3
+
+        # Closed connections are replaced before sending, a request never runs twice
+        time.sleep(0.05)
+        client.request("POST", "/containers/wex-db/start")
+    assert docker_engine.requests.count(("POST", "/containers/wex-db/start")) == 1
+    assert docker_engine.connections == 4
+
+    # Reads wait like the CLI, e.g. for a silent docker exec command
+    assert client.timeout is None and client.connect_timeout == 10.0
+
+
+def test_docker_containers_snapshot(docker_engine) -> None:
+    from wexample_helpers.helpers.docker import (
+        docker_container_exists,
+        docker_container_is_running,
+        docker_containers_snapshot,
+    )
+
+    snapshot = docker_containers_snapshot()
+    assert len(docker_engine.requests) == 1
+    assert sorted(snapshot) == ["wex-db", "wex-web", "wex-web-2"]
+    assert snapshot["wex-web"].labels == {"com.example.app": "wex-web"}
+    assert snapshot["wex-web"].image == "alpine:3"
+
+    assert docker_container_exists("wex-db", snapshot=snapshot)
+    assert not docker_container_is_running("wex-db", snapshot=snapshot)
+    assert docker_container_is_running("wex-web", snapshot=snapshot)
+    assert not docker_container_exists("wex", snapshot=snapshot)
+    assert len(docker_engine.requests) == 1
+
+    # Names are matched exactly, not as the substrings the name filter finds
+    del docker_engine.containers["wex-web"]
+    assert not docker_container_exists("wex-web")
+    assert not docker_container_is_running("wex-web")
+    assert docker_container_is_running("wex-web-2")
+
+
+def test_docker_containers_snapshot_cli(tmp_path, monkeypatch) -> None:
+    import os
+
+    from wexample_helpers.helpers.docker import (
+        docker_container_exists,
+        docker_containers_snapshot,
+    )
+
+    lines = [
+        {
+            "ID": "a1",
+            "Image": "nginx:1",
+            "Labels": "com.example.app=web,com.example.tier=front",
+            "Names": "wex-web",
+            "State": "running",
+        },
+        {
+            "ID": "b2",
+            "Image": "nginx:1",
+            "Labels": "",
+            "Names": "wex-web-2",
+            "State": "exited",
+        },
+    ]
+    (tmp_path / "ps.json").write_text("\n".join(json.dumps(line) for line in lines))
+    docker = tmp_path / "docker"
+    docker.write_text(
+        "#!/bin/sh\n"
+        'case "$*" in\n'
+        f"  *json*) cat {tmp_path / 'ps.json'} ;;\n"
+        "  *) echo wex-web-2 ;;\n"
+        "esac\n"
+    )
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    snapshot = docker_containers_snapshot()
+    assert snapshot["wex-web"].labels == {
+        "com.example.app": "web",
+        "com.example.tier": "front",
+    }
+    assert snapshot["wex-web"].is_running
+    assert not snapshot["wex-web-2"].is_running
+    assert snapshot["wex-web-2"].labels == {}
+
+    # The CLI name filter finds wex-web-2, which is not wex-web
+    assert not docker_container_exists("wex-web")
+    assert docker_container_exists("wex-web-2")
+
+
+def test_docker_set_default_backend(monkeypatch) -> None:
+    from wexample_helpers.enums.docker_backend import DockerBackend
+    from wexample_helpers.helpers.docker import docker_set_default_backend
+
+    monkeypatch.setenv("DOCKER_HOST", "tcp://127.0.0.1:2375")
+    with pytest.raises(ValueError):
+        docker_set_default_backend(DockerBackend.ENGINE_API)
+    docker_set_default_backend(DockerBackend.CLI)
+
+
+def test_docker_batch_cli(tmp_path, monkeypatch) -> None:
+    import asyncio
+    import os
+    import time
+
+    from wexample_helpers.exception.docker_batch_exception import (
+        DockerBatchException,
+    )
+    from wexample_helpers.helpers.docker import (
+        docker_exec_async,
+        docker_stop_containers,
+        docker_stop_containers_async,
+    )
+
+    # Each stop takes a while, wex-broken does not exist
+    docker = tmp_path / "docker"
+    docker.write_text(
+        "#!/bin/sh\n"
+        f'echo "$*" >> {tmp_path / "calls"}\n'
+        'case "$*" in\n'
+        "  exec*) shift; echo \"$@\" ;;\n"
+        "  *wex-broken*) echo 'No such container: wex-broken' >&2; exit 1 ;;\n"
+        "  *) sleep 0.3 ;;\n"
+        "esac\n"
+    )
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    names = [f"wex-{index}" for index in range(8)]
+    start = time.monotonic()
+    docker_stop_containers(names, max_concurrency=8)
+    assert time.monotonic() - start < 1.5
+    assert sorted((tmp_path / "calls").read_text().splitlines()) == sorted(
+        f"stop {name}" for name in names
+    )
+
+    with pytest.raises(DockerBatchException) as error:
+        asyncio.run(
+            docker_stop_containers_async(["wex-0", "wex-broken", "wex-1"], 2)
+        )
+    assert list(error.value.errors) == ["wex-broken"]
+    assert error.value.errors["wex-broken"].stderr == "No such container: wex-broken\n"
+    assert "Could not stop 1 container(s)" in str(error.value)
+
+    assert asyncio.run(docker_exec_async("wex-0", ["ls", "/"])) == "wex-0 ls /\n"
+
+
+def test_docker_async_engine(docker_engine) -> None:
+    import asyncio
+
+    from wexample_helpers.exception.docker_batch_exception import (
+        DockerBatchException,
+    )
+    from wexample_helpers.helpers.docker import (
+        docker_container_exists_async,
+        docker_container_is_running_async,
+        docker_containers_snapshot_async,
+        docker_image_exists_async,
+        docker_remove_containers_async,
+        docker_run_container_async,
+        docker_start_containers,
+    )
+
+    async def _scenario() -> None:
+        await asyncio.gather(
+            *(
+                docker_run_container_async(f"wex-app-{index}", "alpine:3", {})
+                for index in range(5)
+            )
+        )
+        snapshot = await docker_containers_snapshot_async()
+        assert await docker_container_exists_async("wex-app-4", snapshot=snapshot)
+        assert await docker_container_is_running_async("wex-app-4")
+        assert await docker_image_exists_async("alpine:3")
+
+    asyncio.run(_scenario())
+    docker_start_containers([f"wex-app-{index}" for index in range(5)], 2)
+    assert all(docker_engine.containers[f"wex-app-{index}"] for index in range(5))
+
+    with pytest.raises(DockerBatchException) as error:
+        asyncio.run(docker_remove_containers_async(["wex-app-0", "wex-missing"]))
+    assert error.value.errors["wex-missing"].status == 404
+    assert "wex-app-0" not in docker_engine.containers
+
+
+def test_docker_build_context(tmp_path) -> None:
+    from wexample_helpers.classes.docker_build_context import DockerBuildContext
+
+    context = tmp_path / "app"
+    for path in (
+        "Dockerfile",
+        "src/main.py",
+        "src/cache/data.bin",
+        "debug.log",
+        "keep.log",
+        "node_modules/lib/index.js",
+        "secret.txt",
+        "docs/secret.txt",
+    ):
+        (context / path).parent.mkdir(parents=True, exist_ok=True)
+        (context / path).write_text(path)
+    (context / ".dockerignore").write_text(
+        "# comment\n*.log\n!keep.log\nnode_modules\n**/cache\n/secret.txt\n"
+    )
+
+    build_context = DockerBuildContext(
+        context / "Dockerfile", cache_dir=tmp_path / "cache"
+    )
+    assert sorted(path for path, _ in build_context.iter_files()) == [
+        ".dockerignore",
+        "Dockerfile",
+        "docs/secret.txt",
+        "keep.log",
+        "src/main.py",
+    ]
+
+    digest = build_context.digest()
+    assert build_context.files_hashed == 5
+
+    # Ignored files do not change the digest
+    (context / "debug.log").write_text("changed")
+    (context / "src/cache/data.bin").write_text("changed")
+    assert build_context.digest() == digest
+
+    # Hashes older than the mtime granularity are reused from the index
+    (context / "src/main.py").write_text("changed")
+    for path, _ in build_context.iter_files():
+        os.utime(context / path, ns=(1_000_000_000, 1_000_000_000))
+    changed = build_context.digest()
+    assert changed != digest
+    assert build_context.files_hashed == 5
+
+    # Another process finds them on disk
+    build_context = DockerBuildContext(
+        context / "Dockerfile", cache_dir=tmp_path / "cache"
+    )
+    assert build_context.digest() == changed
+    assert build_context.files_hashed == 0
+
+    (context / "src/main.py").chmod(0o755)
+    assert build_context.digest() != changed
+
+
+def test_docker_build_image_skip_unchanged(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from wexample_helpers.helpers.docker import (
+        docker_build_image,
+        docker_build_image_async,
+    )
+
+    # Builds record their labels, images only lists an image carrying them
+    docker = tmp_path / "bin" / "docker"
+    docker.parent.mkdir()
+    docker.write_text(
+        "#!/bin/sh\n"
+        f'echo "$1" >> {tmp_path / "calls"}\n'
+        'case "$1" in\n'
+        f"  build) : > {tmp_path / 'labels'}; while [ $# -gt 0 ]; do\n"
+        f'    [ "$1" = --label ] && echo "$2" > {tmp_path / "labels"}; shift\n'
+        "  done ;;\n"
+        '  images) for arg in "$@"; do case "$arg" in label=*)\n'
+        f'    grep -qx "${{arg#label=}}" {tmp_path / "labels"} 2>/dev/null && echo id\n'
+        "  esac; done ;;\n"
+        "esac\n"
+    )
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{docker.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    dockerfile = tmp_path / "app" / "Dockerfile"
+    dockerfile.parent.mkdir()
+    dockerfile.write_text("FROM alpine:3\n")
+
+    # Without skip_unchanged, no digest is computed and the image is not labelled
+    assert docker_build_image("wex-app", dockerfile, skip_unchanged=False)
+    assert not (tmp_path / "cache").exists()
+    assert docker_build_image("wex-app", dockerfile)
+    assert not docker_build_image("wex-app", dockerfile)
+
+    dockerfile.write_text("FROM alpine:3\nRUN true\n")
+    assert asyncio.run(docker_build_image_async("wex-app", dockerfile))
+    assert not asyncio.run(docker_build_image_async("wex-app", dockerfile))
+    assert (tmp_path / "calls").read_text().split() == [
+        "build",
+        "images",
+        "build",
+        "images",
+        "images",
+        "build",
+        "images",
+    ]
+
+
+def _fake_docker_exec(tmp_path, monkeypatch) -> None:
+    # Runs the exec shell locally, applying the --workdir and --env options
+    docker = tmp_path / "bin" / "docker"
+    docker.parent.mkdir()
+    docker.write_text(
+        "#!/bin/sh\n"
+        f'echo "$*" >> {tmp_path / "calls"}\n'
+        "shift 2\n"
+        "while [ $# -gt 2 ]; do\n"
+        '  case "$1" in\n'
+        '    --workdir) cd "$2" ;;\n'
+        '    --env) export "$2" ;;\n'
+        "  esac\n"
+        "  shift 2\n"
+        "done\n"
+        'exec "$2"\n'
+    )
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{docker.parent}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_docker_exec_session(tmp_path, monkeypatch) -> None:
+    from wexample_helpers.classes.docker_exec_session import DockerExecSession
+    from wexample_helpers.helpers.docker import docker_exec_many
+
+    _fake_docker_exec(tmp_path, monkeypatch)
+
+    with DockerExecSession(
+        "wex-app", user="www-data", cwd=tmp_path, env={"APP_ENV": "test"}
+    ) as session:
+        assert session.run(["sh", "-c", "echo $APP_ENV"]).stdout == "test\n"
+        assert session.run("pwd").stdout == f"{tmp_path}\n"
+        assert session.run("echo fail >&2; exit 3", check=False).returncode == 3
+        assert session.run("pwd", cwd="/").stdout == "/\n"
+
+    assert docker_exec_many("wex-app", [["echo", "a"], ["echo", "b"]]) == [
+        "a\n",
+        "b\n",
+    ]
+    with pytest.raises(subprocess.CalledProcessError):
+        docker_exec_many("wex-app", [["false"], ["echo", "not run"]])
+
+    assert (tmp_path / "calls").read_text().splitlines() == [
+        f"exec -i --user www-data --workdir {tmp_path} --env APP_ENV=test wex-app sh",
+        "exec -i wex-app sh",
+        "exec -i wex-app sh",
+    ]
+
+
+def test_docker_exec_session_pool(tmp_path, monkeypatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from wexample_helpers.classes.docker_exec_session_pool import (
+        DockerExecSessionPool,
+    )
+
+    _fake_docker_exec(tmp_path, monkeypatch)
+
+    with DockerExecSessionPool(size=2) as pool:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(
+                executor.map(
+                    lambda index: pool.run(
+                        f"wex-{index % 2}", ["echo", str(index)]
+                    ).stdout,
+                    range(40),
+                )
+            )
+        assert outputs == [f"{index}\n" for index in range(40)]
+        results = pool.map("wex-0", ["echo 1", "echo 2"])
+        assert [result.stdout for result in results] == ["1\n", "2\n"]
+
+        pool.discard("wex-1")
+        assert pool.run("wex-1", "echo again").stdout == "again\n"
+
+    # At most two sessions per container, one more after the discard
+    calls = (tmp_path / "calls").read_text().splitlines()
+    assert calls.count("exec -i wex-0 sh") <= 2
+    assert 2 <= calls.count("exec -i wex-1 sh") <= 3
@@ -0,0 +1,871 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import shlex
+import signal
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+
+def test_shell_run_async_without_cwd() -> None:
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    result = asyncio.run(shell_run_async([sys.executable, "-c", "print('ok')"]))
+
+    assert result.stdout == "ok\n"
+    assert result.cwd is None
+
+
+def test_shell_run_many_completion_order() -> None:
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    results = shell_run_many(
+        [
+            [sys.executable, "-c", "import time; time.sleep(0.5); print('slow')"],
+            [sys.executable, "-c", "print('fast')"],
+        ],
+        max_concurrency=2,
+    )
+
+    assert [result.stdout for result in results] == ["fast\n", "slow\n"]
+
+
+def test_shell_run_many_max_concurrency(tmp_path) -> None:
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    # Each command records how many commands run along with it
+    script = (
+        "import os, sys, time\n"
+        "path = os.path.join(sys.argv[1], str(os.getpid()))\n"
+        "open(path, 'w').close()\n"
+        "time.sleep(0.2)\n"
+        "print(len(os.listdir(sys.argv[1])))\n"
+        "os.remove(path)\n"
+    )
+    results = shell_run_many(
+        ([sys.executable, "-c", script, str(tmp_path)] for _ in range(6)),
+        max_concurrency=2,
+    )
+
+    assert len(results) == 6
+    assert max(int(result.stdout) for result in results) <= 2
+
+
+def test_shell_run_many_per_command_overrides(tmp_path) -> None:
+    from wexample_helpers.classes.shell_command import ShellCommand
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    script = "import os; print(os.getcwd(), os.environ.get('SHELL_RUN_MANY'))"
+    results = shell_run_many(
+        [
+            ShellCommand(
+                cmd=[sys.executable, "-c", script],
+                cwd=tmp_path,
+                env={"SHELL_RUN_MANY": "command"},
+            ),
+        ],
+        env={"SHELL_RUN_MANY": "default"},
+    )
+
+    assert results[0].stdout.split() == [str(tmp_path), "command"]
+    assert results[0].cwd == tmp_path
+
+
+def test_shell_run_many_fail_fast() -> None:
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    failing = [sys.executable, "-c", "import sys; sys.exit(3)"]
+    slow = [sys.executable, "-c", "import time; time.sleep(10)"]
+
+    # Failed commands are reported as results by default
+    results = shell_run_many([failing])
+    assert results[0].returncode == 3
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        shell_run_many([slow, failing], max_concurrency=2, fail_fast=True)
+    assert error.value.returncode == 3
+
+
+def test_shell_run_many_unconsumed_errors(caplog) -> None:
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    # Both fail in the same wait, only the first error is raised
+    with pytest.raises(FileNotFoundError):
+        shell_run_many(["nonexistent-command-a", "nonexistent-command-b"])
+    gc.collect()
+    assert "never retrieved" not in caplog.text
+
+
+def test_shell_run_many_timeout() -> None:
+    from wexample_helpers.helpers.shell import shell_run_many
+
+    with pytest.raises(asyncio.TimeoutError):
+        shell_run_many(
+            [[sys.executable, "-c", "import time; time.sleep(10)"]], timeout=0.2
+        )
+
+
+def test_shell_run_async_large_output_with_timeout() -> None:
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    # Far over the pipe buffer, on both streams
+    script = (
+        "import sys\n"
+        "sys.stderr.write('e' * 1_000_000)\n"
+        "sys.stdout.write('o' * 50_000_000)\n"
+    )
+    result = asyncio.run(
+        shell_run_async([sys.executable, "-c", script], timeout=60)
+    )
+
+    assert len(result.stdout) == 50_000_000
+    assert len(result.stderr) == 1_000_000
+    assert not result.truncated
+
+
+def test_shell_run_async_max_output_bytes() -> None:
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    script = "import sys; sys.stdout.write('o' * 50_000_000); print('done', file=sys.stderr)"
+    result = asyncio.run(
+        shell_run_async(
+            [sys.executable, "-c", script], timeout=60, max_output_bytes=1024
+        )
+    )
+
+    assert result.stdout == "o" * 1024
+    assert result.stderr == "done\n"
+    assert result.truncated
+
+
+def test_shell_run_tail_bytes() -> None:
+    from wexample_helpers.helpers.shell import shell_run
+
+    script = "for i in range(100_000): print(i)"
+    result = shell_run([sys.executable, "-c", script], tail_bytes=20)
+
+    assert result.stdout is None
+    assert result.stdout_path is None
+    assert result.stdout_tail.endswith("99998\n99999\n")
+    assert len(result.stdout_tail) == 20
+    assert list(result.iter_stdout_lines())[-1] == "99999\n"
+    assert result.truncated
+
+
+def test_shell_run_spool_bytes() -> None:
+    from wexample_helpers.helpers.shell import shell_run
+
+    script = "for i in range(100_000): print(i)"
+    result = shell_run(
+        [sys.executable, "-c", script], spool_bytes=1024, tail_bytes=6
+    )
+
+    path = result.stdout_path
+    assert path is not None and path.stat().st_size == len(
+        "".join(f"{i}\n" for i in range(100_000))
+    )
+    assert result.stdout_tail == "99999\n"
+    assert not result.truncated
+
+    lines = result.iter_stdout_lines()
+    assert next(lines) == "0\n"
+    assert sum(1 for _ in lines) == 99_999
+
+    # Small outputs stay in memory
+    small = shell_run(["echo", "ok"], spool_bytes=1024, tail_bytes=2)
+    assert small.stdout_path is None
+    assert small.stdout_tail == "k\n"
+
+    # The spool file is removed with the result
+    del result, lines
+    assert not path.exists()
+
+
+def test_shell_run_bounded_failure() -> None:
+    from wexample_helpers.helpers.shell import shell_run
+
+    script = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(2)"
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        shell_run([sys.executable, "-c", script], tail_bytes=1024)
+    assert error.value.stdout == "out\n"
+    assert error.value.stderr == "err\n"
+
+    # Only the end of a large spooled output is loaded for the error
+    script = "import sys; sys.stdout.write('o' * 5_000_000 + 'end'); sys.exit(1)"
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        shell_run([sys.executable, "-c", script], spool_bytes=1024)
+    assert len(error.value.output) == 1024
+    assert error.value.output.endswith("oend")
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        shell_run(
+            [sys.executable, "-c", "import time; time.sleep(10)"],
+            tail_bytes=1024,
+            timeout=0.2,
+        )
+
+
+def test_shell_stream_async_lines() -> None:
+    from wexample_helpers.helpers.shell import shell_stream_async
+
+    lines: list[str] = []
+    script = "import sys; sys.stdout.write('a' * 200_000 + '\\né\\nlast')"
+    asyncio.run(
+        shell_stream_async([sys.executable, "-c", script], on_stdout=lines.append)
+    )
+
+    # Longer than the StreamReader line limit
+    assert [len(line) for line in lines] == [200_001, 2, 4]
+    assert lines[1:] == ["é\n", "last"]
+
+
+def test_shell_stream_async_bytes() -> None:
+    from wexample_helpers.enums.shell_stream_framing import ShellStreamFraming
+    from wexample_helpers.helpers.shell import shell_stream_async
+
+    frames: list[memoryview] = []
+    script = "import sys; sys.stdout.buffer.write(b'\\xff\\n' * 3)"
+    asyncio.run(
+        shell_stream_async(
+            [sys.executable, "-c", script], on_stdout=frames.append, text=False
+        )
+    )
+
+    assert all(isinstance(frame, memoryview) for frame in frames)
+    assert [bytes(frame) for frame in frames] == [b"\xff\n"] * 3
+
+    chunks: list[memoryview] = []
+    asyncio.run(
+        shell_stream_async(
+            [sys.executable, "-c", script],
+            on_stdout=chunks.append,
+            text=False,
+            framing=ShellStreamFraming.CHUNK,
+        )
+    )
+    assert b"".join(chunks) == b"\xff\n" * 3
+
+
+def test_shell_stream_async_terminal(capfd) -> None:
+    from wexample_helpers.helpers.shell import shell_stream_async
+
+    script = "import sys; print('out'); print('err', file=sys.stderr)"
+    rc = asyncio.run(shell_stream_async([sys.executable, "-c", script]))
+
+    assert rc == 0
+    assert capfd.readouterr() == ("out\n", "err\n")
+
+
+def test_shell_stream_async_terminal_without_buffer(monkeypatch) -> None:
+    import io
+
+    from wexample_helpers.helpers.shell import shell_stream_async
+
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    script = "import sys; sys.stdout.buffer.write('é'.encode() * 3)"
+    asyncio.run(shell_stream_async([sys.executable, "-c", script], text=False))
+
+    assert stdout.getvalue() == "ééé"
+
+
+def test_shell_session() -> None:
+    from wexample_helpers.classes.shell_session import ShellSession
+
+    with ShellSession() as session:
+        result = session.run("echo out; echo err >&2; printf 'no end'")
+        assert result.stdout == "out\nno end"
+        assert result.stderr == "err\n"
+        assert result.returncode == 0
+
+        assert session.run("exit 3", check=False).returncode == 3
+        with pytest.raises(subprocess.CalledProcessError):
+            session.run(["test", "-f", "/nonexistent/file"])
+
+        # State never leaks from a command to the next one
+        session.run("cd / && export SHELL_SESSION=leak")
+        assert session.run("echo $SHELL_SESSION").stdout == "\n"
+
+        # Large outputs are read while the command runs
+        assert len(session.run("head -c 1000000 /dev/zero").stdout) == 1_000_000
+
+
+def test_shell_session_not_isolated() -> None:
+    from wexample_helpers.classes.shell_session import ShellSession
+
+    with ShellSession(isolated=False) as session:
+        session.run("cd / && SHELL_SESSION=kept")
+        assert session.run("pwd; echo $SHELL_SESSION").stdout == "/\nkept\n"
+
+        with pytest.raises(RuntimeError):
+            session.run("exit 1")
+        assert session.run("echo $SHELL_SESSION").stdout == "\n"
+
+
+def test_shell_session_cwd_env(tmp_path) -> None:
+    from wexample_helpers.classes.shell_session import ShellSession
+
+    with ShellSession() as session:
+        result = session.run(
+            "pwd; echo $SHELL_SESSION", cwd=tmp_path, env={"SHELL_SESSION": "a b"}
+        )
+        assert result.stdout.split("\n") == [str(tmp_path), "a b", ""]
+        assert result.cwd == tmp_path
+
+        # Names are never run as shell code
+        for name in ("A B", "A;touch x", "$(touch x)", "1A"):
+            with pytest.raises(ValueError):
+                session.run("true", env={name: "value"})
+        assert session.run("echo ok").stdout == "ok\n"
+
+
+def test_shell_session_timeout() -> None:
+    from wexample_helpers.classes.shell_session import ShellSession
+
+    with ShellSession() as session:
+        with pytest.raises(subprocess.TimeoutExpired):
+            session.run("sleep 10", timeout=0.2)
+        assert not session.is_running
+
+        # The co-process is started again
+        assert session.run("echo back").stdout == "back\n"
+
+
+def test_shell_session_recovers(monkeypatch) -> None:
+    from wexample_helpers.classes.shell_session import ShellSession
+
+    with ShellSession() as session:
+        # Syntax errors fail the command instead of waiting forever
+        result = session.run('echo "abc', check=False, timeout=5)
+        assert result.returncode == 2
+        assert "unexpected EOF" in result.stderr
+        assert session.run("echo 'a\"b'; cat <<EOF\nhere\nEOF", timeout=5).stdout == (
+            'a"b\nhere\n'
+        )
+
+        def _interrupted(*args: object) -> None:
+            raise KeyboardInterrupt
+
+        with monkeypatch.context() as patch:
+            patch.setattr(session, "_read_until_sentinels", _interrupted)
+            with pytest.raises(KeyboardInterrupt):
+                session.run("echo first")
+        assert not session.is_running
+
+        # The interrupted command output is not read as this one
+        assert session.run("echo second", timeout=5).stdout == "second\n"
+
+
+def test_shell_session_pool() -> None:
+    from wexample_helpers.classes.shell_session_pool import ShellSessionPool
+
+    with ShellSessionPool(size=3) as pool:
+        results = pool.map(f"echo {index}" for index in range(30))
+
+        assert [result.stdout for result in results] == [
+            f"{index}\n" for index in range(30)
+        ]
+        assert sum(session.is_running for session in pool.sessions) >= 1
+
+
+def test_shell_run_posix_spawn_backend() -> None:
+    from wexample_helpers.enums.shell_backend import ShellBackend
+    from wexample_helpers.helpers.shell import shell_run
+
+    script = "import os, sys; print(os.environ['SHELL_BACKEND']); print('err', file=sys.stderr)"
+    result = shell_run(
+        [sys.executable, "-c", script],
+        env={"SHELL_BACKEND": "spawn"},
+        backend=ShellBackend.POSIX_SPAWN,
+    )
+    assert (result.stdout, result.stderr, result.returncode) == ("spawn\n", "err\n", 0)
+
+    result = shell_run(
+        "echo $0 | head -c 2", shell=True, text=False, backend=ShellBackend.POSIX_SPAWN
+    )
+    assert result.stdout == b"/b"
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        shell_run(["sh", "-c", "exit 4"], backend=ShellBackend.POSIX_SPAWN)
+    assert error.value.returncode == 4
+
+    # Decoded in text mode like with subprocess
+    for backend in (None, ShellBackend.POSIX_SPAWN):
+        with pytest.raises(subprocess.TimeoutExpired) as error:
+            shell_run(
+                ["sh", "-c", "echo out; echo err >&2; sleep 10"],
+                timeout=0.3,
+                backend=backend,
+            )
+        assert (error.value.output, error.value.stderr) == ("out\n", "err\n")
+
+    with pytest.raises(FileNotFoundError):
+        shell_run(["nonexistent-command-name"], backend=ShellBackend.POSIX_SPAWN)
+
+    # Ignored signals are restored in the child, like subprocess does
+    results = [
+        shell_run("yes | head -1", shell=True, backend=backend)
+        for backend in (None, ShellBackend.POSIX_SPAWN)
+    ]
+    assert [(result.stdout, result.stderr) for result in results] == [("y\n", "")] * 2
+
+
+def test_shell_set_default_backend(tmp_path) -> None:
+    from wexample_helpers.enums.shell_backend import ShellBackend
+    from wexample_helpers.helpers import shell
+    from wexample_helpers.helpers.shell import shell_run, shell_set_default_backend
+
+    shell_set_default_backend(ShellBackend.POSIX_SPAWN)
+    try:
+        assert shell_run(["echo", "ok"]).stdout == "ok\n"
+        # Unsupported by posix_spawn, falls back to subprocess
+        assert shell_run(["pwd"], cwd=tmp_path).stdout == f"{tmp_path}\n"
+    finally:
+        shell_set_default_backend(None)
+    assert shell._shell_default_backend is None
+
+
+def test_shell_run_cached(tmp_path) -> None:
+    from wexample_helpers.classes.shell_result_cache import ShellResultCache
+    from wexample_helpers.helpers.shell import shell_run_cached
+
+    counter = tmp_path / "counter"
+    script = (
+        "import os, pathlib, sys\n"
+        "path = pathlib.Path(sys.argv[1])\n"
+        "path.write_text(path.read_text() + 'x' if path.exists() else 'x')\n"
+        "print(len(path.read_text()), os.environ.get('SHELL_CACHE'))\n"
+    )
+    cmd = [sys.executable, "-c", script, str(counter)]
+    cache = ShellResultCache(max_entries=2)
+
+    assert shell_run_cached(cmd, cache=cache).stdout == "1 None\n"
+    assert shell_run_cached(cmd, cache=cache).stdout == "1 None\n"
+    assert cache.info()["hits"] == 1
+
+    # Selected variables are part of the key
+    env = {"SHELL_CACHE": "a"}
+    for _ in range(2):
+        result = shell_run_cached(cmd, cache=cache, env=env, env_keys=["SHELL_CACHE"])
+        assert result.stdout == "2 a\n"
+
+    assert cache.invalidate([sys.executable, "-c"]) == 2
+    assert shell_run_cached(cmd, cache=cache).stdout == "3 None\n"
+
+    # The same command given as a string or a list shares its entry
+    assert shell_run_cached(shlex.join(cmd), cache=cache).stdout == "3 None\n"
+    assert shell_run_cached(cmd, cache=cache, errors="strict").stdout == "4 None\n"
+
+    # Hits are copies, changing one does not change the next ones
+    shell_run_cached(cmd, cache=cache).args.append("changed")
+    shell_run_cached(cmd, cache=cache).stdout = "changed"
+    assert shell_run_cached(cmd, cache=cache).args == cmd
+    assert shell_run_cached(cmd, cache=cache).stdout == "3 None\n"
+
+    # Expired entries are run again
+    cache.clear()
+    assert shell_run_cached(cmd, cache=cache, ttl=0).stdout == "5 None\n"
+    assert shell_run_cached(cmd, cache=cache, ttl=0).stdout == "6 None\n"
+    assert cache.info()["misses"] == 2
+
+
+def test_shell_run_cached_disk_store(tmp_path) -> None:
+    from wexample_helpers.classes.shell_result_cache import ShellResultCache
+    from wexample_helpers.helpers.shell import shell_run_cached
+
+    cmd = [sys.executable, "-c", "import time; print(time.time())"]
+    first = shell_run_cached(cmd, cache=ShellResultCache(path=tmp_path / "cache"))
+
+    # Another process would find it on disk
+    cache = ShellResultCache(path=tmp_path / "cache")
+    assert shell_run_cached(cmd, cache=cache).stdout == first.stdout
+    assert cache.info()["disk_hits"] == 1
+
+    cache.invalidate(["docker"])
+    assert list((tmp_path / "cache").iterdir())
+    cache.invalidate()
+    assert not list((tmp_path / "cache").iterdir())
+
+
+def test_shell_run_cached_disk_store_threads(tmp_path) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from wexample_helpers.classes.shell_result import ShellResult
+    from wexample_helpers.classes.shell_result_cache import ShellResultCache
+
+    cache = ShellResultCache(path=tmp_path / "cache")
+    result = ShellResult(
+        args=["echo", "ok"],
+        returncode=0,
+        stdout="ok\n",
+        stderr="",
+        cwd=None,
+        duration=0.0,
+        start_time=0.0,
+        end_time=0.0,
+    )
+
+    # Threads storing the same key never share a temporary file
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: cache.set("key", result, 60), range(400)))
+
+    assert [file.suffix for file in (tmp_path / "cache").iterdir()] == [".json"]
+    assert ShellResultCache(path=tmp_path / "cache").get("key").stdout == "ok\n"
+
+
+def test_shell_run_cached_check() -> None:
+    from wexample_helpers.classes.shell_result_cache import ShellResultCache
+    from wexample_helpers.helpers.shell import (
+        shell_run_cache_info,
+        shell_run_cache_invalidate,
+        shell_run_cached,
+    )
+
+    cmd = ["sh", "-c", "exit 1"]
+    cache = ShellResultCache()
+    assert shell_run_cached(cmd, cache=cache, check=False).returncode == 1
+    with pytest.raises(subprocess.CalledProcessError):
+        shell_run_cached(cmd, cache=cache)
+
+    # Default cache
+    shell_run_cached(["echo", "default"])
+    assert shell_run_cache_info()["currsize"] >= 1
+    assert shell_run_cache_invalidate(["echo", "default"]) == 1
+
+
+def test_shell_run_usage() -> None:
+    from wexample_helpers.enums.shell_backend import ShellBackend
+    from wexample_helpers.helpers.shell import shell_run, shell_usage_summary
+
+    burn = [
+        sys.executable,
+        "-c",
+        "b = bytearray(64 * 1024 * 1024); sum(range(3_000_000))",
+    ]
+    results = [
+        shell_run(burn),
+        shell_run(burn, backend=ShellBackend.POSIX_SPAWN),
+        shell_run(burn, tail_bytes=16),
+    ]
+    for result in results:
+        assert result.usage.cpu_total > 0
+        assert result.usage.max_rss_bytes > 64 * 1024 * 1024
+
+    # Newlines are translated as with subprocess text mode
+    assert shell_run(["printf", "a\\r\\nb"]).stdout == "a\nb"
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with pytest.raises(subprocess.TimeoutExpired) as error:
+            shell_run(["sh", "-c", "echo partial; sleep 5"], timeout=0.5)
+        assert error.value.output == "partial\n"
+        del error
+        gc.collect()
+    # The killed process is known as reaped, not reported still running
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+    summary = shell_usage_summary(results)
+    assert summary["commands"] == summary["measured"] == 3
+    assert summary["cpu_user"] == sum(result.usage.cpu_user for result in results)
+    assert summary["max_rss_bytes"] == max(
+        result.usage.max_rss_bytes for result in results
+    )
+
+
+def test_shell_run_async_usage() -> None:
+    from wexample_helpers.classes.shell_result import ShellResult
+    from wexample_helpers.helpers.shell import (
+        shell_run,
+        shell_run_async,
+        shell_run_many,
+        shell_usage_summary,
+    )
+
+    burn = [sys.executable, "-c", "sum(range(3_000_000))"]
+    result = asyncio.run(shell_run_async(burn))
+    assert result.usage.cpu_total > 0
+
+    # Overlapping runs cannot tell their usage apart
+    results = shell_run_many([burn] * 3, max_concurrency=3)
+    assert [result.usage for result in results] == [None] * 3
+    assert shell_usage_summary(results)["measured"] == 0
+
+    assert asyncio.run(shell_run_async(burn)).usage is not None
+
+    # Synchronous runs from other threads are reaped meanwhile too
+    async def _with_thread() -> ShellResult:
+        thread = asyncio.create_task(asyncio.to_thread(shell_run, burn))
+        result = await shell_run_async(["sleep", "1"])
+        await thread
+        return result
+
+    assert asyncio.run(_with_thread()).usage is None
+
+
+def test_shell_run_without_wait4(monkeypatch) -> None:
+    import os
+
+    from wexample_helpers.helpers.shell import shell_run, shell_run_async
+
+    # Like on Windows
+    monkeypatch.delattr(os, "wait4")
+
+    result = shell_run(["sh", "-c", "echo out; echo err >&2"])
+    assert (result.stdout, result.stderr, result.usage) == ("out\n", "err\n", None)
+    assert shell_run(["echo", "ok"], tail_bytes=16).usage is None
+    assert asyncio.run(shell_run_async(["echo", "ok"])).usage is None
+
+    with pytest.raises(subprocess.TimeoutExpired) as error:
+        shell_run(["sh", "-c", "echo partial; sleep 5"], timeout=0.5)
+    assert error.value.output == "partial\n"
+    with pytest.raises(subprocess.TimeoutExpired):
+        shell_run(["sleep", "5"], tail_bytes=16, timeout=0.2)
+
+
+def _shell_tree_pids(pid_file) -> list[int]:
+    import time
+
+    # Written by the command once its background children are started
+    for _ in range(200):
+        if pid_file.exists() and pid_file.read_text().endswith("\n"):
+            break
+        time.sleep(0.01)
+    return [int(pid) for pid in pid_file.read_text().split()]
+
+
+def _shell_process_alive(pid: int) -> bool:
+    from pathlib import Path
+
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except FileNotFoundError:
+        return False
+    # Orphans may stay zombies when nothing reaps them in containers
+    return stat.rsplit(")", 1)[1].split()[0] != "Z"
+
+
+def _shell_tree_script(pid_file, trap: str = "") -> str:
+    return (
+        f"{trap}sleep 30 & a=$!; sh -c 'sleep 30' & b=$!; "
+        f"echo $a $b > {pid_file}; wait"
+    )
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_shell_run_async_timeout_kills_tree(tmp_path) -> None:
+    import time
+
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    pid_file = tmp_path / "pids"
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            shell_run_async(["sh", "-c", _shell_tree_script(pid_file)], timeout=0.5)
+        )
+    assert time.monotonic() - start < 5
+
+    pids = _shell_tree_pids(pid_file)
+    assert len(pids) == 2
+    assert not any(_shell_process_alive(pid) for pid in pids)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_shell_run_async_sigterm_then_sigkill(tmp_path) -> None:
+    import time
+
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    # SIGTERM is handled: the command cleans up and exits within the grace period
+    pid_file = tmp_path / "pids"
+    trap = f"trap 'echo done > {tmp_path / 'cleanup'}; exit 1' TERM; "
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            shell_run_async(
+                ["sh", "-c", _shell_tree_script(pid_file, trap)], timeout=0.5
+            )
+        )
+    assert (tmp_path / "cleanup").read_text() == "done\n"
+    assert not any(_shell_process_alive(pid) for pid in _shell_tree_pids(pid_file))
+
+    # SIGTERM is ignored by the whole tree: SIGKILL follows after the grace period
+    pid_file = tmp_path / "ignored"
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            shell_run_async(
+                ["sh", "-c", _shell_tree_script(pid_file, "trap '' TERM; ")],
+                timeout=0.3,
+                kill_grace=0.3,
+            )
+        )
+    assert 0.6 <= time.monotonic() - start < 5
+    assert not any(_shell_process_alive(pid) for pid in _shell_tree_pids(pid_file))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_shell_async_cancellation_kills_tree(tmp_path) -> None:
+    from functools import partial
+
+    from wexample_helpers.helpers.shell import shell_run_async, shell_stream_async
+
+    async def _cancel(coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    for index, run in enumerate(
+        (
+            shell_run_async,
+            partial(shell_stream_async, on_stdout=lambda line: None),
+        )
+    ):
+        pid_file = tmp_path / f"pids{index}"
+        asyncio.run(_cancel(run(["sh", "-c", _shell_tree_script(pid_file)])))
+
+        pids = _shell_tree_pids(pid_file)
+        assert len(pids) == 2
+        assert not any(_shell_process_alive(pid) for pid in pids)
+
+
+def test_shell_async_new_session() -> None:
+    import os
+
+    from wexample_helpers.helpers import shell
+    from wexample_helpers.helpers.shell import shell_run_async, shell_stream_async
+
+    cmd = [sys.executable, "-c", "import os; print(os.getsid(0))"]
+    assert asyncio.run(shell_run_async(cmd)).stdout != f"{os.getsid(0)}\n"
+    result = asyncio.run(shell_run_async(cmd, new_session=False))
+    assert result.stdout == f"{os.getsid(0)}\n"
+
+    lines: list[str] = []
+    asyncio.run(shell_stream_async(cmd, on_stdout=lines.append, new_session=False))
+    assert lines == [f"{os.getsid(0)}\n"]
+
+    # Password prompts need the terminal
+    assert shell._shell_new_session(inherit_stdio=False, sudo_user=None, elevate=False)
+    assert not shell._shell_new_session(
+        inherit_stdio=False, sudo_user="www-data", elevate=False
+    )
+    assert not shell._shell_new_session(inherit_stdio=False, sudo_user=None, elevate=True)
+
+
+def test_shell_pipeline(tmp_path) -> None:
+    from wexample_helpers.helpers.shell import shell_pipeline
+
+    results = shell_pipeline(
+        [["printf", "b\\na\\nc\\n"], "sort", ["sh", "-c", "echo sorted >&2; head -n 2"]]
+    )
+    assert [result.stdout for result in results] == [None, None, "a\nb\n"]
+    assert results[-1].stderr == "sorted\n"
+    assert all(result.usage is not None for result in results)
+
+    # Quoting is kept, no shell is involved
+    assert shell_pipeline([["echo", "a  'b' $HOME"], ["cat"]])[-1].stdout == (
+        "a  'b' $HOME\n"
+    )
+
+    # An early exit stops writers with SIGPIPE, which is not a failure
+    results = shell_pipeline([["yes"], ["head", "-n", "2"]])
+    assert results[0].returncode == -signal.SIGPIPE
+    assert results[-1].stdout == "y\ny\n"
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        shell_pipeline([["sh", "-c", "echo boom >&2; exit 3"], ["cat"]])
+    assert error.value.returncode == 3
+    assert error.value.stderr == "boom\n"
+    assert shell_pipeline([["false"], ["cat"]], check=False)[0].returncode == 1
+
+    with open(tmp_path / "out", "w") as file:
+        results = shell_pipeline([["echo", "hi"], ["tr", "a-z", "A-Z"]], stdout=file)
+    assert (tmp_path / "out").read_text() == "HI\n"
+    assert results[-1].stdout is None
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        shell_pipeline([["sleep", "5"], ["cat"]], timeout=0.3)
+    with pytest.raises(FileNotFoundError):
+        shell_pipeline([["echo"], ["shell-pipeline-missing-command"]])
+
+
+def test_shell_pipeline_timeout_output(tmp_path) -> None:
+    from wexample_helpers.helpers.shell import shell_pipeline
+
+    script = "echo OUT; echo ERR >&2; sleep 5"
+    with pytest.raises(subprocess.TimeoutExpired) as error:
+        shell_pipeline([["sh", "-c", script]], timeout=0.5)
+    assert (error.value.output, error.value.stderr) == (b"OUT\n", b"ERR\n")
+
+    # The last stage output, not the first stage errors
+    with open(tmp_path / "out", "wb") as stdout:
+        with pytest.raises(subprocess.TimeoutExpired) as error:
+            shell_pipeline(
+                [["sh", "-c", "echo FIRST >&2"], ["sh", "-c", script]],
+                timeout=0.5,
+                stdout=stdout,
+            )
+    assert (error.value.output, error.value.stderr) == (None, b"ERR\n")
+
+
+def test_shell_pipeline_timeout_kills_once(monkeypatch) -> None:
+    from wexample_helpers.helpers import shell
+    from wexample_helpers.helpers.shell import shell_pipeline
+
+    killed: list[int] = []
+    kill = shell._shell_kill
+
+    def _kill(pid: int) -> None:
+        killed.append(pid)
+        kill(pid)
+
+    monkeypatch.setattr(shell, "_shell_kill", _kill)
+
+    # The last stage closes its output, it times out while being reaped
+    with pytest.raises(subprocess.TimeoutExpired):
+        shell_pipeline(["true", ["sh", "-c", "exec >&- 2>&-; sleep 5"]], timeout=0.3)
+    # A reaped stage pid may belong to another process already
+    assert len(killed) == 1
+
+
+def test_shell_pipeline_async() -> None:
+    from wexample_helpers.helpers.shell import shell_pipeline_async
+
+    # Much more than a pipe buffer goes through the intermediate stage
+    results = asyncio.run(
+        shell_pipeline_async(
+            [["head", "-c", "10000000", "/dev/zero"], ["cat"], ["wc", "-c"]]
+        )
+    )
+    assert int(results[-1].stdout) == 10_000_000
+
+    lines = []
+    results = asyncio.run(
+        shell_pipeline_async(
+            [["printf", "b\\na\\n"], ["sort"]], on_stdout=lines.append
+        )
+    )
+    assert lines == ["a\n", "b\n"]
+    assert results[-1].stdout is None
+
+    results = asyncio.run(shell_pipeline_async([["yes"], ["head", "-n", "1"]]))
+    assert results[-1].stdout == "y\n"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(shell_pipeline_async([["echo"], ["false"]]))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(shell_pipeline_async([["sleep", "5"], ["cat"]], timeout=0.3))
+
+
+def test_shell_run_async_check() -> None:
+    from wexample_helpers.helpers.shell import shell_run_async
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        asyncio.run(shell_run_async(["sh", "-c", "echo out; echo err >&2; exit 2"]))
+    assert error.value.returncode == 2
+    assert (error.value.stdout, error.value.stderr) == ("out\n", "err\n")
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Optional, Union
+from typing import Any, Literal, Optional, TypedDict, Union
 
 import pytest
 
@@ -34,6 +34,69 @@ class TestHelperType(AbstractTestHelpers):
         type_validate_or_fail(no_annotations, Callable)
         type_validate_or_fail(no_annotations, Callable[..., Any])
 
+    def test_callable_is_compatible(self) -> None:
+        from collections.abc import Callable
+
+        from wexample_helpers.helpers.type import (
+            _type_callables,
+            type_callable_is_compatible,
+            type_validate_or_fail,
+        )
+
+        class Service:
+            def handle(self, name: str, retries: int = 0) -> bool:
+                return True
+
+            def strict(self, name: str, *, force: bool) -> bool:
+                return force
+
+        def variadic(*args: Any) -> str:
+            return ""
+
+        service = Service()
+        assert type_callable_is_compatible(service.handle, Callable[[str], bool])
+        assert type_callable_is_compatible(service.handle, Callable[[str, int], bool])
+        assert not type_callable_is_compatible(service.handle, Callable[[], bool])
+        assert not type_callable_is_compatible(
+            service.handle, Callable[[str, int, int], bool]
+        )
+        assert not type_callable_is_compatible(service.handle, Callable[[str], str])
+        assert not type_callable_is_compatible(service.strict, Callable[[str], bool])
+        assert type_callable_is_compatible(variadic, Callable[[int, int, int], str])
+        assert type_callable_is_compatible(variadic, Callable[..., str])
+        assert type_callable_is_compatible(len, Callable[[Any], int])
+        assert not type_callable_is_compatible("handle", Callable)
+
+        # Hints are resolved once per function, not per bound method
+        type_validate_or_fail(service.handle, Callable[..., bool])
+        assert _type_callables[Service.handle]["return"] is bool
+
+    def test_compile_validator(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import (
+            type_compile_validator,
+            type_validator_cache_clear,
+            type_validator_cache_info,
+        )
+
+        type_validator_cache_clear()
+        validator = type_compile_validator(dict[str, list[int]])
+
+        # Plans are compiled once per annotation
+        assert type_compile_validator(dict[str, list[int]]) is validator
+        assert type_validator_cache_info()["plans"].misses == 1
+
+        validator({"a": [1, 2], "b": []})
+        with pytest.raises(NotAllowedVariableTypeException):
+            validator({"a": [1, "2"]})
+
+        # Equal annotations of different kinds keep their own plan
+        assert type_compile_validator(Union[int, str]) is not type_compile_validator(
+            int | str
+        )
+
     def test_empty_generics_are_accepted(self) -> None:
         from wexample_helpers.helpers.type import type_validate_or_fail
 
@@ -42,6 +105,89 @@ class TestHelperType(AbstractTestHelpers):
         type_validate_or_fail(set(), set[int])
         type_validate_or_fail({}, dict[str, int])
 
+    def test_validation_policy(self) -> None:
+        from wexample_helpers.classes.type_validation_policy import (
+            TypeValidationPolicy,
+        )
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import (
+            type_generic_value_is_valid,
+            type_validate_or_fail,
+        )
+
+        values = list(range(1000)) + ["bad"]
+
+        # Partial checks skip the invalid tail item
+        type_validate_or_fail(values, list[int], TypeValidationPolicy.first(10))
+        assert type_generic_value_is_valid(
+            values, list[int], TypeValidationPolicy.first(10)
+        )
+        assert not type_generic_value_is_valid(values, list[int])
+
+        # Depth limited checks only look at the outer container
+        nested = {"key": [1, "bad"]}
+        type_validate_or_fail(
+            nested, dict[str, list[int]], TypeValidationPolicy.bounded_depth(1)
+        )
+        with pytest.raises(NotAllowedVariableTypeException) as info:
+            type_validate_or_fail(nested, dict[str, list[int]])
+        assert "Invalid item at ['key'][1]." in info.value.message
+        assert info.value.data["failure_path"] == ["['key']", "[1]"]
+        assert info.value.data["sampled"] is False
+
+        # Sampled failures are reported as such
+        values[500] = "bad"
+        with pytest.raises(NotAllowedVariableTypeException) as info:
+            type_validate_or_fail(values, list[int], TypeValidationPolicy.sample(1000))
+        assert "(sampled check)" in info.value.message
+        assert info.value.data["sampled"] is True
+
+    def test_homogeneous_containers(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import (
+            type_generic_value_is_valid,
+            type_validate_or_fail,
+        )
+
+        # Subclasses are accepted like with isinstance
+        assert type_generic_value_is_valid([1, True, 2], list[int])
+        assert type_generic_value_is_valid({"a": None}, dict[str, None | int])
+        assert type_generic_value_is_valid({"a": 1, "b": "x"}, dict[str, Any])
+        assert not type_generic_value_is_valid({"a": 1, 2: 1}, dict[str, Any])
+        assert not type_generic_value_is_valid({1, "a"}, set[int])
+
+        # The failing item is still located
+        with pytest.raises(NotAllowedVariableTypeException) as info:
+            type_validate_or_fail(["a", "b", 3, "d"], list[str])
+        assert info.value.data["failure_path"] == ["[2]"]
+
+    def test_wide_union_dispatch(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import (
+            type_generic_value_is_valid,
+            type_validate_or_fail,
+        )
+
+        classes = tuple(type(f"WideClass{index}", (), {}) for index in range(12))
+        wide_child = type("WideChild", (classes[8],), {})
+        allowed_type = Union[classes + (list[int], str)]
+
+        # Same answers on repeated calls, once the dispatch table is filled
+        for _ in range(2):
+            type_validate_or_fail(classes[11](), allowed_type)
+            type_validate_or_fail(wide_child(), allowed_type)
+            type_validate_or_fail([1, 2], allowed_type)
+            type_validate_or_fail("str", allowed_type)
+            assert not type_generic_value_is_valid(["str"], allowed_type)
+            with pytest.raises(NotAllowedVariableTypeException):
+                type_validate_or_fail(1.5, allowed_type)
+
     def test_pep604_union_equivalents(self) -> None:
         from wexample_helpers.exception.not_allowed_variable_type_exception import (
             NotAllowedVariableTypeException,
@@ -72,8 +218,41 @@ class TestHelperType(AbstractTestHelpers):
         with pytest.raises(NotAllowedVariableTypeException):
             type_validate_or_fail((1, 2), tuple[int, int, int])
 
+    def test_typed_dict_validation(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import type_validate_or_fail
+
+        class CatData(TypedDict):
+            kind: Literal["cat"]
+            lives: int
+
+        class DogData(TypedDict, total=False):
+            kind: Literal["dog"]
+            tricks: list[str]
+
+        # Annotations are resolved despite postponed evaluation in this module
+        type_validate_or_fail({"kind": "cat", "lives": 9}, CatData)
+        type_validate_or_fail({"kind": "dog"}, DogData)
+        with pytest.raises(NotAllowedVariableTypeException):
+            type_validate_or_fail({"kind": "cat"}, CatData)
+        with pytest.raises(NotAllowedVariableTypeException):
+            type_validate_or_fail({"kind": "cat", "lives": 9, "extra": 1}, CatData)
+        with pytest.raises(NotAllowedVariableTypeException):
+            type_validate_or_fail({"kind": "dog", "lives": 9}, CatData)
+
+        # Unions are dispatched on the "kind" discriminator
+        type_validate_or_fail({"kind": "dog", "tricks": ["sit"]}, CatData | DogData)
+        type_validate_or_fail({"kind": "cat", "lives": 1}, CatData | DogData | None)
+        with pytest.raises(NotAllowedVariableTypeException) as info:
+            type_validate_or_fail({"kind": "dog", "tricks": [1]}, CatData | DogData)
+        assert "CatData: " in info.value.message
+        assert "DogData: " in info.value.message
+
     def test_type_is_compatibility(self) -> None:
-        from collections.abc import Callable
+        from collections.abc import Callable, Mapping, Sequence
+        from collections.abc import Set as AbstractSet
 
         from wexample_helpers.helpers.type import type_is_compatible
 
@@ -93,6 +272,22 @@ class TestHelperType(AbstractTestHelpers):
             (Callable[..., Any], Callable[..., Any]),
             (Callable[..., bool], Callable[..., bool]),
             (Callable[..., Callable[..., str]], Callable[..., Callable]),
+            (bool, int),
+            (int, int | None),
+            (None, Optional[int]),
+            (int | None, Optional[int]),
+            (Union[int, str], int | str | bytes),
+            (set[int], set[int]),
+            (frozenset[bool], frozenset[int]),
+            (frozenset[int], AbstractSet[int]),
+            (dict[str, list[int]], Mapping[str, Sequence[int]]),
+            (list[bool], Sequence[int]),
+            (tuple[int, ...], Sequence[int]),
+            (tuple[int, bool], tuple[int, ...]),
+            (type[bool], type[int]),
+            (type[int], type),
+            (Literal["a", "b"], str),
+            (Callable[[int], bool], Callable[[bool], int]),
         ]
 
         failure_cases = [
@@ -104,6 +299,17 @@ class TestHelperType(AbstractTestHelpers):
             (dict[str, int], dict[str, str]),
             (int, Union[str, dict[str, Any]]),
             (Callable[..., bool], Callable[..., str]),
+            (int, bool),
+            (int | None, int),
+            (set[int], frozenset[int]),
+            (list[int], Mapping[int, int]),
+            (dict[str, int], Mapping[str, str]),
+            (tuple[int, ...], tuple[int]),
+            (tuple[int, str], tuple[int, ...]),
+            (type[int], type[bool]),
+            (type, type[int]),
+            (Literal["a", 1], str),
+            (Callable[[bool], int], Callable[[int], int]),
         ]
 
         for actual_type, expected_type in success_cases:
@@ -162,6 +368,82 @@ class TestHelperType(AbstractTestHelpers):
         name = type_to_name(int | str)
         assert "int" in name and "str" in name
 
+    def test_is_valid(self) -> None:
+        from wexample_helpers.helpers.type import type_is_valid
+
+        assert type_is_valid({"a": [1, 2]}, dict[str, list[int]])
+        assert not type_is_valid({"a": [1, "2"]}, dict[str, list[int]])
+        assert type_is_valid(None, int | None)
+        assert not type_is_valid(1.5, int | str)
+
+    def test_lazy_exception(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+
+        exception = NotAllowedVariableTypeException(
+            variable_type=list, variable_value=[1] * 1000, allowed_types=[int, str]
+        )
+        assert exception._message is None
+        assert exception._exception_id is None
+
+        assert str(exception).startswith("Invalid variable type 'list' for value '[1, 1")
+        assert str(exception).endswith("...'. Allowed types: int, str.")
+        assert exception.data["allowed_values"] == ["int", "str"]
+        assert exception.exception_id == exception.exception_id
+        # The lazy message is still the first argument
+        assert exception.args == (str(exception),)
+
+    def test_validate_memoize(self) -> None:
+        from wexample_helpers.exception.not_allowed_variable_type_exception import (
+            NotAllowedVariableTypeException,
+        )
+        from wexample_helpers.helpers.type import (
+            type_validate_or_fail,
+            type_validator_cache_clear,
+            type_validator_cache_info,
+        )
+
+        type_validator_cache_clear()
+        value = ("a", (1, 2.5), frozenset({None}))
+        annotation = tuple[str, tuple[int, float], frozenset[None]]
+
+        type_validate_or_fail(value, annotation, memoize=True)
+        type_validate_or_fail(("a", (1, 2.5), frozenset({None})), annotation, memoize=True)
+        assert type_validator_cache_info()["values"]["hits"] == 1
+        assert type_validator_cache_info()["values"]["misses"] == 1
+
+        # Equal values of other classes are not confused
+        type_validate_or_fail((True,), tuple[bool], memoize=True)
+        with pytest.raises(NotAllowedVariableTypeException):
+            type_validate_or_fail((1,), tuple[bool], memoize=True)
+
+        # Mutable values are never remembered
+        type_validate_or_fail([1], list[int], memoize=True)
+        type_validate_or_fail(([1],), tuple[list[int]], memoize=True)
+        assert type_validator_cache_info()["values"]["currsize"] == 2
+
+        type_validator_cache_clear()
+        assert type_validator_cache_info()["values"]["currsize"] == 0
+
+    def test_validate_many(self) -> None:
+        from wexample_helpers.helpers.type import type_validate_many
+
+        rows = [{"a": 1}, {"a": "x"}, {"b": 2}, [], {"c": None}]
+
+        report = type_validate_many(rows, dict[str, int], fail_fast=False)
+        assert not report.is_valid
+        assert report.checked == 5
+        assert report.failed_indexes == [1, 3, 4]
+        assert report.failures[1] == (3, "invalid type 'list'")
+
+        # Stops at the first failure, consuming generators lazily
+        report = type_validate_many((row for row in rows), dict[str, int])
+        assert report.failures == [(1, "invalid type 'dict'")]
+        assert report.checked == 2
+
+        assert type_validate_many(iter(range(100)), int).is_valid
+
     def test_validation(self) -> bool:
         from collections.abc import Callable
         from types import NoneType